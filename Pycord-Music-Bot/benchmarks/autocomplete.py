@@ -0,0 +1,114 @@
+"""Size and lookup latency benchmark for the /play autocomplete prefix index
+
+Fills a PrefixIndex with generated track titles and measures memory per entry,
+lookup latency for partial and misspelled queries and the cost of adding a
+played track. Run it from the Pycord-Music-Bot directory:
+
+    python -m benchmarks.autocomplete --entries 1000000
+"""
+
+import argparse
+import itertools
+import json
+import random
+import string
+import time
+import tracemalloc
+
+from typing import Dict, List
+
+from utils.PrefixIndex import PrefixIndex
+
+
+def vocabulary(size: int, rng: random.Random) -> List[str]:
+    """Returns made up words of 2 to 10 letters"""
+
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(size)
+    ]
+
+
+def title(words: List[str], cum_weights: List[float], rng: random.Random, index: int) -> str:
+    """Returns a title of common and rare words with an artist"""
+
+    name = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(2, 6))).title()
+    return f"{name} - Artist {index % 5000}"
+
+
+def query(text: str, rng: random.Random, misspell: bool) -> str:
+    """Returns what a user might have typed so far for a title"""
+
+    words = text.split(" - ")[0].split()
+    start = rng.randrange(len(words))
+    typed = words[start:start + rng.randint(1, 3)]
+    last = typed[-1]
+    typed[-1] = last[:rng.randint(1, len(last))]
+
+    if misspell and len(last) > 4:
+        i = rng.randrange(1, len(last) - 1)
+        typed[-1] = last[:i] + rng.choice(string.ascii_lowercase) + last[i + 1:]
+    return " ".join(typed).lower()
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Returns latency percentiles in milliseconds"""
+
+    samples = sorted(samples)
+    return {
+        "p50_ms": samples[len(samples) // 2] * 1000,
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+        "max_ms": samples[-1] * 1000,
+    }
+
+
+def main() -> None:
+    """Builds the index and prints size and latency as json"""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(args.vocabulary, rng)
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    titles = [title(words, cum_weights, rng, i) for i in range(args.entries)]
+
+    index = PrefixIndex(args.entries)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    for i, text in enumerate(titles):
+        index.add(text, f"https://benchmark.local/watch?v={i}")
+    build = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    samples = [titles[rng.randrange(len(titles))] for _ in range(args.lookups)]
+    results = {"entries": len(index), "build_s": build, "index_mb": size / (1024 * 1024)}
+    results["bytes_per_entry"] = size / len(index)
+
+    for name, misspell in (("prefix", False), ("misspelled", True)):
+        latencies = []
+        found = 0
+        for text in samples:
+            typed = query(text, rng, misspell)
+            start = time.perf_counter()
+            found += bool(index.search(typed))
+            latencies.append(time.perf_counter() - start)
+        results[name] = dict(percentiles(latencies), hit_ratio=found / len(samples))
+
+    latencies = []
+    for i in range(args.lookups):
+        start = time.perf_counter()
+        index.add(title(words, cum_weights, rng, i), f"https://benchmark.local/played?v={i}")
+        latencies.append(time.perf_counter() - start)
+    results["add"] = percentiles(latencies)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import time
+
+from typing import Dict, List, Optional
+
+from aiohttp import web, WSMsgType
+
+
+class FakeLavalink:
+    """Local stand-in for a Lavalink v4 node, with configurable search and playlist sizes
+
+    Playlists are returned for identifiers containing "playlist-<size>", any other
+    identifier returns search_size search results. Playing a track emits the
+    TrackStart/TrackEnd events and the player update a real node would over the
+    websocket.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        search_size: int = 5,
+        track_length: int = 180_000,
+        load_delay: float = 0.0
+    ):
+        """Initiates the FakeLavalink Class"""
+
+        self.host = host
+        self.port = port
+        self.search_size = search_size
+        self.track_length = track_length
+        self.load_delay = load_delay
+        self.session_id = "benchmark"
+        self.requests = 0
+        self.tracks: Dict[str, Dict] = {}
+        self.players: Dict[str, Dict] = {}
+        # When each guild's player was last given a track to play, from time.perf_counter
+        self.started: Dict[str, float] = {}
+        self._sockets: List[web.WebSocketResponse] = []
+        self._runner: Optional[web.AppRunner] = None
+        self._stats_task: Optional[asyncio.Task] = None
+        self._started = time.time()
+
+    @property
+    def uri(self) -> str:
+        """Returns the uri to give wavelink.Node"""
+
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Starts serving REST and websocket requests"""
+
+        app = web.Application()
+        app.router.add_get("/version", self.version)
+        app.router.add_get("/v4/info", self.info)
+        app.router.add_get("/v4/stats", self.stats)
+        app.router.add_get("/v4/websocket", self.websocket)
+        app.router.add_get("/v4/loadtracks", self.load_tracks)
+        app.router.add_patch("/v4/sessions/{session}", self.update_session)
+        app.router.add_get("/v4/sessions/{session}/players", self.get_players)
+        app.router.add_get("/v4/sessions/{session}/players/{guild}", self.get_player)
+        app.router.add_patch("/v4/sessions/{session}/players/{guild}", self.update_player)
+        app.router.add_delete("/v4/sessions/{session}/players/{guild}", self.destroy_player)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        self._stats_task = asyncio.create_task(self._send_stats())
+
+    async def stop(self) -> None:
+        """Closes all connections and stops the server"""
+
+        if self._stats_task:
+            self._stats_task.cancel()
+        for socket in list(self._sockets):
+            await socket.close()
+        if self._runner:
+            await self._runner.cleanup()
+
+    def make_track(self, identifier: str, index: int) -> Dict:
+        """Creates a track payload and remembers it so it can be played by its encoded form"""
+
+        track_id = hashlib.sha1(f"{identifier}:{index}".encode()).hexdigest()[:11]
+        info = {
+            "identifier": track_id,
+            "isSeekable": True,
+            "author": f"Artist {index % 7}",
+            "length": self.track_length,
+            "isStream": False,
+            "position": 0,
+            "title": f"{identifier} - track {index}",
+            "uri": f"https://benchmark.local/watch?v={track_id}",
+            "artworkUrl": None,
+            "isrc": None,
+            "sourceName": "youtube",
+        }
+        encoded = base64.b64encode(json.dumps(info).encode()).decode()
+        track = {"encoded": encoded, "info": info, "pluginInfo": {}, "userData": {}}
+        self.tracks[encoded] = track
+        return track
+
+    @staticmethod
+    def decode(encoded: str) -> Dict:
+        """Returns the track payload of a track encoded by any FakeLavalink, as Lavalink decodes tracks"""
+
+        info = json.loads(base64.b64decode(encoded))
+        return {"encoded": encoded, "info": info, "pluginInfo": {}, "userData": {}}
+
+    def _player(self, guild_id: str) -> Dict:
+        """Returns the player payload for a guild"""
+
+        return self.players.setdefault(guild_id, {
+            "guildId": guild_id,
+            "track": None,
+            "volume": 100,
+            "paused": False,
+            "state": {"time": int(time.time() * 1000), "position": 0, "connected": True, "ping": 0},
+            "voice": {"token": "", "endpoint": "", "sessionId": ""},
+            "filters": {},
+        })
+
+    async def _broadcast(self, payload: Dict) -> None:
+        """Sends an op to every connected websocket"""
+
+        for socket in list(self._sockets):
+            if not socket.closed:
+                await socket.send_json(payload)
+
+    async def _send_stats(self) -> None:
+        """Sends the stats op periodically like Lavalink does"""
+
+        while True:
+            await asyncio.sleep(60)
+            await self._broadcast(dict(op="stats", **self._stats_payload()))
+
+    def _stats_payload(self) -> Dict:
+        """Returns the stats of the fake node"""
+
+        return {
+            "players": len(self.players),
+            "playingPlayers": sum(1 for player in self.players.values() if player["track"]),
+            "uptime": int((time.time() - self._started) * 1000),
+            "memory": {"free": 0, "used": 0, "allocated": 0, "reservable": 0},
+            "cpu": {"cores": 1, "systemLoad": 0.0, "lavalinkLoad": 0.0},
+            "frameStats": None,
+        }
+
+    async def version(self, request: web.Request) -> web.Response:
+        return web.Response(text="4.0.0")
+
+    async def info(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            "version": {"semver": "4.0.0", "major": 4, "minor": 0, "patch": 0, "preRelease": None, "build": None},
+            "buildTime": 0,
+            "git": {"branch": "benchmark", "commit": "0", "commitTime": 0},
+            "jvm": "0",
+            "lavaplayer": "0",
+            "sourceManagers": ["youtube", "http"],
+            "filters": [],
+            "plugins": [],
+        })
+
+    async def stats(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        return web.json_response(self._stats_payload())
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        socket = web.WebSocketResponse()
+        await socket.prepare(request)
+        self._sockets.append(socket)
+
+        await socket.send_json({"op": "ready", "resumed": False, "sessionId": self.session_id})
+        async for message in socket:
+            if message.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                break
+
+        self._sockets.remove(socket)
+        return socket
+
+    async def load_tracks(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.load_delay:
+            await asyncio.sleep(self.load_delay)
+
+        identifier = request.query.get("identifier", "")
+        playlist = re.search(r"playlist-(\d+)", identifier)
+
+        if playlist:
+            size = int(playlist.group(1))
+            return web.json_response({
+                "loadType": "playlist",
+                "data": {
+                    "info": {"name": f"Playlist {size}", "selectedTrack": -1},
+                    "pluginInfo": {},
+                    "tracks": [self.make_track(identifier, i) for i in range(size)],
+                },
+            })
+
+        if "empty" in identifier:
+            return web.json_response({"loadType": "empty", "data": {}})
+
+        return web.json_response({
+            "loadType": "search",
+            "data": [self.make_track(identifier, i) for i in range(self.search_size)],
+        })
+
+    async def update_session(self, request: web.Request) -> web.Response:
+        data = await request.json()
+        return web.json_response({"resuming": data.get("resuming", False), "timeout": data.get("timeout", 60)})
+
+    async def get_players(self, request: web.Request) -> web.Response:
+        return web.json_response(list(self.players.values()))
+
+    async def get_player(self, request: web.Request) -> web.Response:
+        return web.json_response(self._player(request.match_info["guild"]))
+
+    async def update_player(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        guild_id = request.match_info["guild"]
+        data = await request.json()
+        player = self._player(guild_id)
+
+        for key in ("volume", "paused", "filters"):
+            if key in data:
+                player[key] = data[key]
+
+        encoded = data.get("encodedTrack", ...)
+        if "track" in data:
+            encoded = data["track"].get("encoded", ...)
+
+        if encoded is not ...:
+            previous = player["track"]
+            no_replace = request.query.get("noReplace", "false") == "true"
+
+            if previous and no_replace and encoded:
+                return web.json_response(player)
+
+            if encoded is None:
+                player["track"] = None
+                if previous:
+                    asyncio.create_task(self._track_end(guild_id, previous, "stopped"))
+            else:
+                track = dict(self.tracks.get(encoded) or self.decode(encoded))
+                track["userData"] = data.get("track", {}).get("userData", {})
+                player["track"] = track
+                player["state"]["position"] = data.get("position", 0)
+                self.started[guild_id] = time.perf_counter()
+                if previous:
+                    asyncio.create_task(self._track_end(guild_id, previous, "replaced"))
+                asyncio.create_task(self._track_start(guild_id, track))
+                asyncio.create_task(self._player_update(guild_id))
+
+        return web.json_response(player)
+
+    async def destroy_player(self, request: web.Request) -> web.Response:
+        self.players.pop(request.match_info["guild"], None)
+        return web.Response(status=204)
+
+    async def finish(self, guild_id: int) -> bool:
+        """Ends the playing track of a guild as if it played to the end, returns whether one was playing"""
+
+        player = self.players.get(str(guild_id))
+        if not player or not player["track"]:
+            return False
+
+        track = player["track"]
+        player["track"] = None
+        await self._track_end(str(guild_id), track, "finished")
+        return True
+
+    async def _track_start(self, guild_id: str, track: Dict) -> None:
+        await self._broadcast({"op": "event", "type": "TrackStartEvent", "guildId": guild_id, "track": track})
+
+    async def _player_update(self, guild_id: str) -> None:
+        player = self.players.get(guild_id)
+        if player:
+            player["state"]["time"] = int(time.time() * 1000)
+            await self._broadcast({"op": "playerUpdate", "guildId": guild_id, "state": player["state"]})
+
+    async def _track_end(self, guild_id: str, track: Dict, reason: str) -> None:
+        await self._broadcast({
+            "op": "event", "type": "TrackEndEvent", "guildId": guild_id, "track": track, "reason": reason
+        })
@@ -0,0 +1,301 @@
+import asyncio
+import itertools
+import time
+
+import discord
+
+from collections import Counter, defaultdict, deque
+from typing import Deque, Dict, List, Optional
+
+_ids = itertools.count(10_000)
+
+
+class FakeHTTPResponse:
+    """The parts of an aiohttp response discord.HTTPException reads"""
+
+    def __init__(self, status: int, reason: str):
+        self.status = status
+        self.reason = reason
+
+
+class FakeApi:
+    """Counts the discord REST calls made by the fakes, adds a configurable latency
+
+    With a limit, each kind of call is allowed limit times per window of per
+    seconds. Calls over it fail with a 429 HTTPException carrying retry_after,
+    as discord answers them, and are counted in rate_limited.
+    """
+
+    def __init__(self, latency: float = 0.0, limit: int = 0, per: float = 1.0):
+        self.latency = latency
+        self.limit = limit
+        self.per = per
+        self.calls: Counter = Counter()
+        self.rate_limited: Counter = Counter()
+        self._windows: Dict[str, Deque[float]] = defaultdict(deque)
+
+    async def call(self, name: str) -> None:
+        if self.limit:
+            self._check_limit(name)
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def _check_limit(self, name: str) -> None:
+        window = self._windows[name]
+        now = time.monotonic()
+        while window and window[0] <= now - self.per:
+            window.popleft()
+
+        if len(window) >= self.limit:
+            self.rate_limited[name] += 1
+            retry_after = window[0] + self.per - now
+            error = discord.HTTPException(
+                FakeHTTPResponse(429, "Too Many Requests"),
+                {"message": "You are being rate limited.", "retry_after": retry_after, "global": False}
+            )
+            error.retry_after = retry_after
+            raise error
+        window.append(now)
+
+
+class FakeUser:
+    """Stand-in for discord.User and discord.Member"""
+
+    def __init__(self, name: str, guild: "FakeGuild" = None, bot: bool = False):
+        self.id = next(_ids)
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{self.id}>"
+        self.bot = bot
+        self.guild = guild
+        self.voice: Optional[FakeVoiceState] = None
+
+
+class FakeVoiceState:
+    """Stand-in for discord.VoiceState"""
+
+    def __init__(self, channel: Optional["FakeVoiceChannel"]):
+        self.channel = channel
+
+
+class FakeMessage:
+    """Stand-in for discord.Message and discord.PartialMessage"""
+
+    def __init__(self, api: FakeApi, channel: "FakeTextChannel", message_id: int = None):
+        self.api = api
+        self.channel = channel
+        self.id = message_id or next(_ids)
+
+    async def edit(self, **kwargs) -> "FakeMessage":
+        await self.api.call("message_edit")
+        return self
+
+
+class FakeTextChannel:
+    """Stand-in for discord.TextChannel"""
+
+    def __init__(self, api: FakeApi, guild: "FakeGuild"):
+        self.api = api
+        self.id = next(_ids)
+        self.guild = guild
+        self.mention = f"<#{self.id}>"
+
+    async def send(self, **kwargs) -> FakeMessage:
+        await self.api.call("channel_send")
+        return FakeMessage(self.api, self)
+
+    def get_partial_message(self, message_id: int) -> FakeMessage:
+        return FakeMessage(self.api, self, message_id)
+
+
+class FakeVoiceChannel:
+    """Stand-in for discord.VoiceChannel, connecting creates a wavelink player without voice"""
+
+    def __init__(self, guild: "FakeGuild"):
+        self.id = next(_ids)
+        self.guild = guild
+        self.mention = f"<#{self.id}>"
+        self.members: List[FakeUser] = []
+
+    async def connect(self, *, cls, **kwargs):
+        player = cls(self.guild.client, self)
+        player._guild = self.guild
+        player._connected = True
+        player.node._players[self.guild.id] = player
+
+        self.guild.voice_client = player
+        self.members.append(self.guild.client.user)
+        self.guild.me.voice = FakeVoiceState(self)
+        self.guild.client.dispatch(
+            "voice_state_update", self.guild.me, FakeVoiceState(None), self.guild.me.voice
+        )
+        return player
+
+
+class FakeGuild:
+    """Stand-in for discord.Guild with one text and one voice channel"""
+
+    def __init__(self, client: "FakeClient", api: FakeApi):
+        self.client = client
+        self.id = next(_ids)
+        self.name = f"Guild {self.id}"
+        self.voice_client = None
+        self.me = FakeUser(client.user.name, self, bot=True)
+        self.me.id = client.user.id
+        self.text_channel = FakeTextChannel(api, self)
+        self.voice_channel = FakeVoiceChannel(self)
+
+    async def change_voice_state(self, **kwargs) -> None:
+        if kwargs.get("channel") is not None:
+            return
+
+        self.voice_client = None
+        if self.me.voice:
+            before, self.me.voice = self.me.voice, None
+            before.channel.members.remove(self.client.user)
+            self.client.dispatch("voice_state_update", self.me, before, FakeVoiceState(None))
+
+
+class FakeResponse:
+    """Stand-in for discord.InteractionResponse"""
+
+    def __init__(self, api: FakeApi):
+        self.api = api
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def defer(self, **kwargs) -> None:
+        self._done = True
+        await self.api.call("interaction_defer")
+
+    async def send_message(self, **kwargs) -> None:
+        self._done = True
+        await self.api.call("interaction_response")
+
+    async def edit_message(self, **kwargs) -> None:
+        self._done = True
+        await self.api.call("interaction_edit")
+
+
+class FakeFollowup:
+    """Stand-in for discord.Webhook used for interaction followups"""
+
+    def __init__(self, api: FakeApi):
+        self.api = api
+
+    async def send(self, **kwargs) -> None:
+        await self.api.call("followup_send")
+
+
+class FakeInteraction:
+    """Stand-in for discord.Interaction"""
+
+    def __init__(self):
+        self.id = next(_ids)
+
+
+class FakeContext:
+    """Stand-in for discord.ApplicationContext of one slash command invocation"""
+
+    def __init__(self, api: FakeApi, guild: FakeGuild, user: FakeUser, command: str = None):
+        self.interaction = FakeInteraction()
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.author = user
+        self.channel = guild.text_channel
+        self.channel_id = guild.text_channel.id
+        self.command = command
+        self.response = FakeResponse(api)
+        self.followup = FakeFollowup(api)
+
+    async def respond(self, **kwargs) -> None:
+        if self.response.is_done():
+            return await self.followup.send(**kwargs)
+        return await self.response.send_message(**kwargs)
+
+
+class FakeConnectionState:
+    """The parts of discord's ConnectionState wavelink and discord.VoiceProtocol touch"""
+
+    def __init__(self, client: "FakeClient"):
+        self.client = client
+
+    def _get_client(self) -> "FakeClient":
+        return self.client
+
+    def _remove_voice_client(self, guild_id: int) -> None:
+        guild = self.client.get_guild(guild_id)
+        if guild:
+            guild.voice_client = None
+
+
+class FakeClient:
+    """Stand-in for commands.Bot that dispatches events to registered cogs and times them"""
+
+    def __init__(self, api: FakeApi):
+        self.api = api
+        self.user = FakeUser("Benchmark", bot=True)
+        self.latency = 0.0
+        self.guilds: List[FakeGuild] = []
+        self.cogs: Dict[str, object] = {}
+        self.event_latencies: Dict[str, List[float]] = defaultdict(list)
+        self.pending: List[asyncio.Task] = []
+        self._connection = FakeConnectionState(self)
+        self._channels: Dict[int, object] = {}
+
+    @property
+    def voice_clients(self) -> list:
+        return [guild.voice_client for guild in self.guilds if guild.voice_client]
+
+    def add_guild(self) -> FakeGuild:
+        guild = FakeGuild(self, self.api)
+        self.guilds.append(guild)
+        self._channels[guild.text_channel.id] = guild.text_channel
+        self._channels[guild.voice_channel.id] = guild.voice_channel
+        return guild
+
+    def add_voice_channel(self, guild: FakeGuild) -> FakeVoiceChannel:
+        """Adds another voice channel to a guild"""
+
+        channel = FakeVoiceChannel(guild)
+        self._channels[channel.id] = channel
+        return channel
+
+    def add_cog(self, cog) -> None:
+        self.cogs[type(cog).__name__] = cog
+
+    def get_cog(self, name: str):
+        return self.cogs.get(name)
+
+    def get_guild(self, guild_id: int) -> Optional[FakeGuild]:
+        return next((guild for guild in self.guilds if guild.id == guild_id), None)
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+    def add_view(self, view, message_id: int = None) -> None:
+        pass
+
+    def dispatch(self, event: str, *args) -> None:
+        for cog in self.cogs.values():
+            listener = getattr(cog, f"on_{event}", None)
+            if listener is not None:
+                self.pending.append(asyncio.create_task(self._timed(event, listener(*args))))
+
+    async def _timed(self, event: str, coro) -> None:
+        start = time.perf_counter()
+        try:
+            await coro
+        finally:
+            self.event_latencies[event].append(time.perf_counter() - start)
+
+    async def wait_for_events(self) -> None:
+        """Waits for all dispatched event handlers to finish"""
+
+        while self.pending:
+            pending, self.pending = self.pending, []
+            await asyncio.gather(*pending, return_exceptions=True)
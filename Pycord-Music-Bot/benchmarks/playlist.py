@@ -0,0 +1,193 @@
+"""Playlist benchmark: /play latency, time to first audio and memory by playlist size
+
+Plays a playlist of each size in fresh guilds on a local FakeLavalink node and
+measures how long the playlist takes to load, how long /play takes to return,
+how long until the node is told to play the first track and how long until the
+whole playlist is queued. Loading grows with the playlist, Lavalink sends every
+track and wavelink parses them, the time from the load to the first audio
+should not, only the background queueing should. Run it from the
+Pycord-Music-Bot directory:
+
+    python -m benchmarks.playlist --sizes 10 1000 10000 --output after.json
+    python -m benchmarks.playlist --sizes 10 1000 10000 --compare after.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+
+from typing import Dict, List
+
+import os
+
+from benchmarks.fake_lavalink import FakeLavalink
+from benchmarks.fakes import FakeApi, FakeClient, FakeContext, FakeUser, FakeVoiceState
+from benchmarks.run import commit, percentiles
+from utils.Resources import rss_mb
+
+
+async def play_playlist(
+    client: FakeClient,
+    cog,
+    lavalink: FakeLavalink,
+    loaded: Dict[str, float],
+    size: int,
+    run: int,
+    trace: bool
+) -> Dict:
+    """Plays one playlist in a new guild and returns its timings and allocations"""
+
+    guild = client.add_guild()
+    user = FakeUser("Listener", guild)
+    user.voice = FakeVoiceState(guild.voice_channel)
+    guild.voice_channel.members.append(user)
+    ctx = FakeContext(client.api, guild, user, "play")
+
+    # A new query each run, so the search cache does not hide the load
+    query = f"https://benchmark.local/playlist-{size}-{run}"
+
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+
+    await cog.play(ctx, query)
+    played = time.perf_counter()
+
+    ingest = getattr(guild.voice_client, "ingest", None)
+    if ingest:
+        await ingest
+    queued = time.perf_counter()
+
+    retained, peak = tracemalloc.get_traced_memory() if trace else (0, 0)
+    if trace:
+        tracemalloc.stop()
+
+    load = loaded[query] - start
+    first_audio = lavalink.started[str(guild.id)] - start
+    return {
+        "load": load,
+        "play": played - start,
+        "first_audio": first_audio,
+        "after_load": first_audio - load,
+        "queued": queued - start,
+        "retained_mb": retained / (1024 * 1024),
+        "peak_mb": peak / (1024 * 1024),
+        "queue_length": len(guild.voice_client.queue),
+    }
+
+
+async def benchmark(args: argparse.Namespace) -> Dict:
+    """Plays every playlist size args.runs times and returns the results"""
+
+    lavalink = FakeLavalink(load_delay=args.lavalink_latency)
+    await lavalink.start()
+
+    # The cogs read their configuration when they are imported
+    os.environ["LAVALINK_NODES"] = lavalink.uri
+    os.environ.setdefault("LAVALINK_KEY", "benchmark")
+    os.environ.setdefault("QUEUE_DB", ":memory:")
+    os.environ.setdefault("HISTORY_DB", ":memory:")
+    os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+    os.environ.setdefault("NODE_HEALTH_INTERVAL", "3600")
+    from cogs.MusicPlayer import MusicPlayer
+    from utils.SearchCache import SEARCH_CACHE
+
+    # When each query's search returned, parsed and copied
+    loaded: Dict[str, float] = {}
+    search = SEARCH_CACHE.search
+
+    async def timed_search(query: str):
+        try:
+            return await search(query)
+        finally:
+            loaded[query] = time.perf_counter()
+
+    SEARCH_CACHE.search = timed_search
+
+    client = FakeClient(FakeApi(args.api_latency))
+    cog = MusicPlayer(client)
+    client.add_cog(cog)
+    await cog.on_ready()
+
+    # Warms up the connection and the imports before anything is timed
+    await play_playlist(client, cog, lavalink, loaded, 1, -1, False)
+
+    sizes = {}
+    for size in args.sizes:
+        rss_before = rss_mb()
+        runs: List[Dict] = []
+        for run in range(args.runs):
+            runs.append(await play_playlist(client, cog, lavalink, loaded, size, run, args.tracemalloc))
+        await client.wait_for_events()
+
+        sizes[str(size)] = {
+            name: percentiles([run[name] for run in runs])
+            for name in ("load", "play", "first_audio", "after_load", "queued")
+        }
+        sizes[str(size)].update({
+            "retained_mb": max(run["retained_mb"] for run in runs) if args.tracemalloc else None,
+            "peak_mb": max(run["peak_mb"] for run in runs) if args.tracemalloc else None,
+            "rss_growth_mb": rss_mb() - rss_before,
+            "queue_length": runs[-1]["queue_length"],
+        })
+
+    await asyncio.gather(*cog.now_playing_sends.values())
+    results = {
+        "commit": commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "sizes": sizes,
+        "rss_mb": rss_mb(),
+        "lavalink_requests": lavalink.requests,
+    }
+
+    await lavalink.stop()
+    return results
+
+
+def compare(results: Dict, baseline: Dict) -> None:
+    """Prints the changes per playlist size against an earlier result file"""
+
+    print(f"\n{baseline['commit']} -> {results['commit']}")
+    for size, stats in results["sizes"].items():
+        before = baseline["sizes"].get(size)
+        if not before:
+            continue
+        for name in ("load", "play", "first_audio", "after_load", "queued"):
+            old, new = before[name]["p50_ms"], stats[name]["p50_ms"]
+            change = (new - old) / old * 100 if old else 0.0
+            print(f"{size:>6} {name:12} p50_ms: {old:9.3f} -> {new:9.3f} ({change:+.1f} %)")
+        for name in ("peak_mb", "rss_growth_mb"):
+            if before[name] is not None and stats[name] is not None:
+                print(f"{size:>6} {name:12}       : {before[name]:9.3f} -> {stats[name]:9.3f}")
+
+
+def main() -> None:
+    """Parses arguments, runs the benchmark and prints or stores the results"""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10_000])
+    parser.add_argument("--runs", type=int, default=5, help="playlists played per size")
+    parser.add_argument("--lavalink-latency", type=float, default=0.0, help="seconds per search")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds per discord call")
+    parser.add_argument("--tracemalloc", action="store_true", help="track allocations, slower")
+    parser.add_argument("--output", help="write the results as json to this file")
+    parser.add_argument("--compare", help="compare with an earlier results file")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Memory benchmark for queued tracks, full Playable objects against QueuedTrack records
+
+Builds a queue from a parsed Lavalink playlist response and reports the bytes
+that stay allocated per queued track once the response is dropped. Run it from
+the Pycord-Music-Bot directory:
+
+    python -m benchmarks.queue_memory --tracks 100000
+"""
+
+import argparse
+import gc
+import json
+import tracemalloc
+
+from typing import Callable, Dict
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from utils.MusicQueue import MusicQueue
+
+
+def playables(response: Dict) -> list:
+    """Keeps every track as a full Playable, as the queue did before"""
+
+    tracks = []
+    for data in response["data"]["tracks"]:
+        track = wavelink.Playable(data)
+        track.extras = {"requester_id": 123456789012345678}
+        tracks.append(track)
+    return tracks
+
+
+def records(response: Dict) -> MusicQueue:
+    """Puts the tracks in the queue, stored as QueuedTrack records"""
+
+    queue = MusicQueue()
+    playlist = wavelink.Playlist(response["data"])
+    playlist.track_extras(requester_id=123456789012345678)
+    queue.put(playlist)
+    return queue
+
+
+def measure(blob: str, tracks: int, build: Callable[[Dict], object]) -> Dict:
+    """Returns the bytes still allocated per track after building a queue from a response"""
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    response = json.loads(blob)
+    queue = build(response)
+    del response
+    gc.collect()
+
+    retained = tracemalloc.get_traced_memory()[0] - before
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    del queue
+
+    return {
+        "bytes_per_track": retained / tracks,
+        "retained_mb": retained / (1024 * 1024),
+        "peak_mb": peak / (1024 * 1024),
+    }
+
+
+def main() -> None:
+    """Builds a playlist response and measures both representations"""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, default=100_000)
+    args = parser.parse_args()
+
+    lavalink = FakeLavalink()
+    blob = json.dumps({
+        "loadType": "playlist",
+        "data": {
+            "info": {"name": "benchmark", "selectedTrack": -1},
+            "pluginInfo": {},
+            "tracks": [lavalink.make_track("playlist", index) for index in range(args.tracks)],
+        },
+    })
+    lavalink.tracks.clear()
+
+    results = {
+        "tracks": args.tracks,
+        "playable": measure(blob, args.tracks, playables),
+        "queued_track": measure(blob, args.tracks, records),
+    }
+    results["saving"] = 1 - (
+        results["queued_track"]["bytes_per_track"] / results["playable"]["bytes_per_track"]
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
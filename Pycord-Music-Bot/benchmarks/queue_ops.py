@@ -0,0 +1,129 @@
+"""Microbenchmark for the queue operations on long queues, MusicQueue against wavelink.Queue
+
+Times adding a track and finding its position, removing a range, moving a
+track and shuffling on queues of the given sizes. wavelink.Queue does them
+the way the commands did before MusicQueue: a position is found with index,
+a range is deleted one track at a time and a move is a delete and a put_at.
+Removing repeated tracks and the tracks of one requester are timed for
+MusicQueue only. Run it from the Pycord-Music-Bot directory:
+
+    python -m benchmarks.queue_ops --tracks 10000 100000
+"""
+
+import argparse
+import json
+import time
+
+from typing import Callable, Dict, List
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from benchmarks.run import percentiles
+from utils.MusicQueue import MusicQueue
+
+# Tracks removed by one /queue remove
+REMOVED = 100
+
+
+def tracks(size: int) -> List[wavelink.Playable]:
+    """Returns size tracks from ten requesters, every tenth one queued twice"""
+
+    lavalink = FakeLavalink()
+    result = []
+    for index in range(size):
+        repeated = index % 10 == 9
+        track = wavelink.Playable(lavalink.make_track("queue", index - 9 if repeated else index))
+        track.extras = {"requester_id": index % 10}
+        result.append(track)
+    return result
+
+
+def timed(build: Callable[[], wavelink.Queue], operation: Callable[[wavelink.Queue], object], repeat: int) -> Dict:
+    """Returns the latency of an operation, each run on a freshly built queue"""
+
+    samples = []
+    for _ in range(repeat):
+        queue = build()
+        start = time.perf_counter()
+        operation(queue)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def remove_one_by_one(queue: wavelink.Queue, start: int, end: int) -> None:
+    for _ in range(end - start):
+        queue.delete(start)
+
+
+def move_by_delete(queue: wavelink.Queue, index: int, to: int) -> None:
+    track = queue[index]
+    queue.delete(index)
+    queue.put_at(to, track)
+
+
+def benchmark(size: int, repeat: int) -> Dict:
+    """Times every operation on a queue of size tracks"""
+
+    queued = tracks(size)
+    extra = wavelink.Playable(FakeLavalink().make_track("added", 0))
+    middle = size // 2
+
+    def music_queue() -> MusicQueue:
+        queue = MusicQueue()
+        queue.put(queued)
+        return queue
+
+    def wavelink_queue() -> wavelink.Queue:
+        queue = wavelink.Queue()
+        queue.put(queued)
+        return queue
+
+    def add_indexed(queue: wavelink.Queue) -> int:
+        queue.put(extra)
+        return queue.index(extra) + 1
+
+    def add_counted(queue: MusicQueue) -> int:
+        queue.put(extra)
+        return len(queue)
+
+    operations = {
+        "add": (add_counted, add_indexed),
+        "remove": (
+            lambda queue: queue.remove_range(middle, middle + REMOVED),
+            lambda queue: remove_one_by_one(queue, middle, middle + REMOVED),
+        ),
+        "move": (
+            lambda queue: queue.move(0, size - 1),
+            lambda queue: move_by_delete(queue, 0, size - 1),
+        ),
+        "shuffle": (lambda queue: queue.shuffle(), lambda queue: queue.shuffle()),
+    }
+
+    results = {}
+    for name, (new, old) in operations.items():
+        results[name] = {
+            "music_queue": timed(music_queue, new, repeat),
+            "wavelink_queue": timed(wavelink_queue, old, repeat),
+        }
+    results["dedupe"] = {"music_queue": timed(music_queue, lambda queue: queue.dedupe(), repeat)}
+    results["remove_requester"] = {
+        "music_queue": timed(music_queue, lambda queue: queue.remove_requester(3), repeat)
+    }
+    return results
+
+
+def main() -> None:
+    """Runs the operations on every queue size and prints the latencies as json"""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tracks", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {str(size): benchmark(size, args.repeat) for size in args.tracks}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
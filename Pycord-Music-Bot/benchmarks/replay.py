@@ -0,0 +1,275 @@
+"""Replays a recording of the music cogs' traffic against local stand-ins
+
+Feeds the commands, button presses, autocomplete requests, voice state updates
+and track ends of a recording made with RECORD_FILE to the MusicPlayer cog
+running on a local FakeLavalink node and fake discord objects, at the recorded
+pace or faster. Track starts, replaced and stopped tracks and the leave timers
+follow from the replayed traffic, the timers run faster with the replay. Run it
+from the Pycord-Music-Bot directory:
+
+    python -m benchmarks.replay recording.jsonl.gz --speed 10 --output before.json
+    python -m benchmarks.replay recording.jsonl.gz --speed 10 --compare before.json
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+import os
+
+from benchmarks.fake_lavalink import FakeLavalink
+from benchmarks.fakes import (
+    FakeApi, FakeClient, FakeContext, FakeGuild, FakeUser, FakeVoiceChannel, FakeVoiceState
+)
+from benchmarks.run import commit, compare, percentiles
+from utils.Recorder import read
+from utils.Resources import rss_mb
+
+# Track ends Lavalink sends on its own, the other reasons follow from replayed commands
+REPLAYED_TRACK_ENDS = ("finished", "loadFailed")
+
+
+class Replay:
+    """Feeds the records of a recording to the MusicPlayer cog at their recorded times"""
+
+    def __init__(self, client: FakeClient, cog, lavalink: FakeLavalink, autocomplete, records: List[List]):
+        """Initiates the Replay Class"""
+
+        self.client = client
+        self.cog = cog
+        self.lavalink = lavalink
+        self.autocomplete = autocomplete
+        self.records = records
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.lag: List[float] = []
+        self.errors: Counter = Counter()
+        self.skipped: Counter = Counter()
+        self._guilds: Dict[int, FakeGuild] = {}
+        self._users: Dict[Tuple[int, int], FakeUser] = {}
+        self._channels: Dict[Tuple[int, int], FakeVoiceChannel] = {}
+        self._tasks: List[asyncio.Task] = []
+
+        # What each query loaded, known before the command that loads it is replayed
+        self._loaded = {record[3]: record[4] for record in records if record[1] == "loaded"}
+
+    def guild(self, number: int) -> FakeGuild:
+        """Returns the fake guild of a recorded guild"""
+
+        guild = self._guilds.get(number)
+        if guild is None:
+            guild = self._guilds[number] = self.client.add_guild()
+        return guild
+
+    def user(self, guild: FakeGuild, number: int) -> FakeUser:
+        """Returns the fake member of a recorded user in a guild"""
+
+        user = self._users.get((guild.id, number))
+        if user is None:
+            user = self._users[(guild.id, number)] = FakeUser(f"User {number}", guild)
+        return user
+
+    def channel(self, guild: FakeGuild, number: int) -> FakeVoiceChannel:
+        """Returns the fake voice channel of a recorded channel, the first one is the guild's own"""
+
+        channel = self._channels.get((guild.id, number))
+        if channel is None:
+            used = any(key[0] == guild.id for key in self._channels)
+            channel = self.client.add_voice_channel(guild) if used else guild.voice_channel
+            self._channels[(guild.id, number)] = channel
+        return channel
+
+    def move(self, user: FakeUser, channel) -> None:
+        """Moves a member to a voice channel, or out of voice with None, and dispatches the update"""
+
+        before = user.voice or FakeVoiceState(None)
+        if before.channel:
+            before.channel.members.remove(user)
+
+        user.voice = FakeVoiceState(channel) if channel else None
+        if channel:
+            channel.members.append(user)
+        self.client.dispatch("voice_state_update", user, before, user.voice or FakeVoiceState(None))
+
+    def query(self, token: str) -> str:
+        """Returns a query for FakeLavalink that loads what the recorded query loaded"""
+
+        size = self._loaded.get(token, -1)
+        if size > 0:
+            return f"https://replay.local/playlist-{size}-{token}"
+        if size == 0:
+            return f"empty-{token}"
+        return f"song {token}"
+
+    async def _timed(self, name: str, coro) -> None:
+        start = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            self.errors[f"{name}: {type(e).__name__}"] += 1
+        finally:
+            self.latencies[name].append(time.perf_counter() - start)
+
+    def command(self, guild: FakeGuild, user_number: int, name: str, options: Dict) -> None:
+        """Starts a recorded command or button press"""
+
+        method = getattr(self.cog, name, None)
+        if method is None:
+            self.skipped[name] += 1
+            return
+
+        user = self.user(guild, user_number)
+        if user.voice is None:
+            # Was in voice before the recording started
+            self.move(user, guild.voice_channel)
+
+        arguments = {}
+        for option, value in options.items():
+            if isinstance(value, dict) and "user" in value:
+                value = self.user(guild, value["user"])
+            elif option == "query":
+                value = self.query(value)
+            arguments[option] = value
+
+        ctx = FakeContext(self.client.api, guild, user, name)
+        self._tasks.append(asyncio.create_task(self._timed(name, method(ctx, **arguments))))
+
+    async def feed(self, record: List) -> None:
+        """Replays one record"""
+
+        kind, guild = record[1], self.guild(record[2]) if record[2] is not None else None
+
+        if kind == "command":
+            self.command(guild, *record[3:])
+        elif kind == "voice":
+            user = self.user(guild, record[3])
+            self.move(user, self.channel(guild, record[4]) if record[4] is not None else None)
+        elif kind == "autocomplete":
+            start = time.perf_counter()
+            self.autocomplete.suggest(guild.id, ("song " * 20)[:record[3]])
+            self.latencies["autocomplete"].append(time.perf_counter() - start)
+        elif kind == "track_end" and record[3] in REPLAYED_TRACK_ENDS:
+            if not await self.lavalink.finish(guild.id):
+                self.skipped["track_end"] += 1
+
+    async def run(self, speed: float) -> None:
+        """Replays every record at its time divided by speed and waits for the work it started"""
+
+        start = time.perf_counter()
+        for record in self.records:
+            delay = start + record[0] / 1000 / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.lag.append(max(0.0, -delay))
+            await self.feed(record)
+
+        await asyncio.gather(*self._tasks)
+        await self.client.wait_for_events()
+
+
+async def replay(args: argparse.Namespace) -> Dict:
+    """Replays the recording and returns the results"""
+
+    records = read(args.recording)
+
+    lavalink = FakeLavalink(search_size=args.search_size, load_delay=args.lavalink_latency)
+    await lavalink.start()
+
+    # The cogs read their configuration when they are imported
+    os.environ["LAVALINK_NODES"] = lavalink.uri
+    os.environ["RECORD_FILE"] = ""
+    os.environ.setdefault("LAVALINK_KEY", "benchmark")
+    os.environ.setdefault("QUEUE_DB", ":memory:")
+    os.environ.setdefault("HISTORY_DB", ":memory:")
+    os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+    os.environ.setdefault("NODE_HEALTH_INTERVAL", "3600")
+    from cogs.MusicPlayer import MusicPlayer
+    from utils import Occupancy
+    from utils.Autocomplete import AUTOCOMPLETE
+    from utils.TimerWheel import TIMERS
+    from utils.TrackGap import TRACK_GAPS
+
+    # The leave timers run at the pace of the replay
+    TIMERS.tick /= args.speed
+    Occupancy.EMPTY_CHANNEL_TIMEOUT /= args.speed
+    Occupancy.INACTIVE_PLAYER_TIMEOUT /= args.speed
+
+    client = FakeClient(FakeApi(args.api_latency))
+    cog = MusicPlayer(client)
+    client.add_cog(cog)
+    await cog.on_ready()
+
+    replayer = Replay(client, cog, lavalink, AUTOCOMPLETE, records)
+
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+
+    await replayer.run(args.speed)
+
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_before
+
+    commands = sum(len(samples) for samples in replayer.latencies.values())
+    results = {
+        "commit": commit(),
+        "config": {
+            "recording": args.recording,
+            "speed": args.speed,
+            "records": len(records),
+            "recorded_s": records[-1][0] / 1000 if records else 0.0,
+            "guilds": len(client.guilds),
+        },
+        "commands": {command: percentiles(samples) for command, samples in sorted(replayer.latencies.items())},
+        "events": {event: percentiles(samples) for event, samples in sorted(client.event_latencies.items())},
+        "recorded": dict(Counter(record[1] for record in records)),
+        "schedule_lag": percentiles(replayer.lag),
+        "track_gap": {
+            "count": TRACK_GAPS.gap.count,
+            "mean_ms": TRACK_GAPS.gap.sum / TRACK_GAPS.gap.count * 1000 if TRACK_GAPS.gap.count else 0.0,
+        },
+        "skipped": dict(replayer.skipped),
+        "errors": dict(replayer.errors),
+        "throughput_per_s": commands / wall if wall else 0.0,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_per_command_ms": cpu / commands * 1000 if commands else 0.0,
+        "rss_mb": rss_mb(),
+        "rss_growth_mb": rss_mb() - rss_before,
+        "discord_api_calls": dict(client.api.calls),
+        "lavalink_requests": lavalink.requests,
+    }
+
+    await lavalink.stop()
+    return results
+
+
+def main() -> None:
+    """Parses arguments, replays the recording and prints or stores the results"""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="a file written with RECORD_FILE")
+    parser.add_argument("--speed", type=float, default=1.0, help="how many times faster than recorded")
+    parser.add_argument("--search-size", type=int, default=5)
+    parser.add_argument("--lavalink-latency", type=float, default=0.0, help="seconds per search")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds per discord call")
+    parser.add_argument("--output", help="write the results as json to this file")
+    parser.add_argument("--compare", help="compare with an earlier results file")
+    args = parser.parse_args()
+
+    results = asyncio.run(replay(args))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Restore benchmark: resumes stored players from QueueStore on a local FakeLavalink node
+
+Seeds QueueStore with one row per guild, each with a current track, a
+position and a queue of stored records, then times MusicPlayer.restore_players
+reconnecting and resuming all of them in parallel. Run it from the
+Pycord-Music-Bot directory:
+
+    python -m benchmarks.restore --guilds 1000 --queue-size 50
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from typing import Dict, List
+
+import os
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from benchmarks.fakes import FakeApi, FakeClient
+from benchmarks.run import commit, percentiles
+from utils.MusicQueue import QueuedTrack
+from utils.Resources import rss_mb
+
+
+def seed(store, client: FakeClient, lavalink: FakeLavalink, guilds: int, queue_size: int) -> None:
+    """Writes the stored state of guilds players, each in its own guild"""
+
+    rows = []
+    for _ in range(guilds):
+        guild = client.add_guild()
+        current = wavelink.Playable(lavalink.make_track(f"current-{guild.id}", 0))
+        current.extras = {"requester_id": guild.me.id}
+        queue = [
+            QueuedTrack.from_playable(wavelink.Playable(lavalink.make_track(f"queue-{guild.id}", i)))
+            for i in range(queue_size)
+        ]
+        rows.append((
+            guild.id,
+            guild.voice_channel.id,
+            guild.text_channel.id,
+            store.encode_track(current),
+            60_000,
+            30,
+            wavelink.AutoPlayMode.partial.value,
+            queue,
+            time.time(),
+        ))
+
+    # Written as one flush would write them
+    store._write(rows, [], [])
+
+
+async def benchmark(args: argparse.Namespace) -> Dict:
+    """Seeds the store, restores every player and returns the results"""
+
+    lavalink = FakeLavalink(load_delay=args.lavalink_latency)
+    await lavalink.start()
+
+    # The cogs read their configuration when they are imported
+    os.environ["LAVALINK_NODES"] = lavalink.uri
+    os.environ.setdefault("LAVALINK_KEY", "benchmark")
+    os.environ.setdefault("QUEUE_DB", ":memory:")
+    os.environ.setdefault("HISTORY_DB", ":memory:")
+    os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+    os.environ.setdefault("NODE_HEALTH_INTERVAL", "3600")
+    from cogs.MusicPlayer import MusicPlayer
+    from utils.AudioService import AUDIO
+    from utils.QueueStore import QUEUE_STORE
+
+    client = FakeClient(FakeApi(args.api_latency))
+    cog = MusicPlayer(client)
+    client.add_cog(cog)
+    AUDIO.start(client)
+    await AUDIO.connected()
+
+    seed(QUEUE_STORE, client, lavalink, args.guilds, args.queue_size)
+    requests = lavalink.requests
+
+    latencies: List[float] = []
+    restore_player = cog.restore_player
+
+    async def timed(state) -> bool:
+        start = time.perf_counter()
+        try:
+            return await restore_player(state)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    cog.restore_player = timed
+
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+
+    await cog.restore_players()
+
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_before
+    await client.wait_for_events()
+
+    playing = [
+        player for player in lavalink.players.values()
+        if player["track"] and player["state"]["position"] == 60_000
+    ]
+    queued = sum(len(guild.voice_client.queue) for guild in client.guilds if guild.voice_client)
+
+    results = {
+        "commit": commit(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "restore_s": wall,
+        "players_per_s": args.guilds / wall if wall else 0.0,
+        "player": percentiles(latencies),
+        "resumed": len(playing),
+        "queued_tracks": queued,
+        "cpu_s": cpu,
+        "rss_mb": rss_mb(),
+        "rss_growth_mb": rss_mb() - rss_before,
+        "lavalink_requests": lavalink.requests - requests,
+    }
+
+    await lavalink.stop()
+    return results
+
+
+def main() -> None:
+    """Parses arguments, runs the benchmark and prints or stores the results"""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=1000)
+    parser.add_argument("--queue-size", type=int, default=50)
+    parser.add_argument("--lavalink-latency", type=float, default=0.0, help="seconds per search")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds per discord call")
+    parser.add_argument("--output", help="write the results as json to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
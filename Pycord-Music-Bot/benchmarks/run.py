@@ -0,0 +1,209 @@
+"""Offline benchmark for the /play, /skip, /queue show and track start hot paths
+
+Runs the MusicPlayer cog against a local FakeLavalink node and fake discord
+objects, nothing leaves the machine. Run it from the Pycord-Music-Bot directory:
+
+    python -m benchmarks.run --guilds 50 --playlist-size 1000 --output before.json
+    python -m benchmarks.run --guilds 50 --playlist-size 1000 --compare before.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from collections import defaultdict
+from typing import Dict, List
+
+import os
+
+from benchmarks.fake_lavalink import FakeLavalink
+from benchmarks.fakes import FakeApi, FakeClient, FakeContext, FakeGuild, FakeUser, FakeVoiceState
+from utils.Resources import rss_mb
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Returns count, p50, p99 and mean of latency samples in milliseconds"""
+
+    if not samples:
+        return {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50_ms": ordered[int(len(ordered) * 0.5)] * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+    }
+
+
+def commit() -> str:
+    """Returns the current git commit, used to label results"""
+
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_guild(
+    client: FakeClient,
+    cog,
+    guild: FakeGuild,
+    args: argparse.Namespace,
+    latencies: Dict[str, List[float]]
+) -> None:
+    """Issues /play, /skip and /queue show for one simulated guild"""
+
+    user = FakeUser("Listener", guild)
+    user.voice = FakeVoiceState(guild.voice_channel)
+    guild.voice_channel.members.append(user)
+
+    async def timed(command: str, coro) -> None:
+        start = time.perf_counter()
+        await coro
+        latencies[command].append(time.perf_counter() - start)
+
+    def ctx(command: str) -> FakeContext:
+        return FakeContext(client.api, guild, user, command)
+
+    if args.playlist_size:
+        await timed("play", cog.play(
+            ctx("play"), f"https://benchmark.local/playlist-{args.playlist_size}-{guild.id}"
+        ))
+    for i in range(args.plays):
+        await timed("play", cog.play(ctx("play"), f"song {i % args.unique_queries}"))
+    for _ in range(args.skips):
+        await timed("skip", cog.skip(ctx("skip")))
+        await timed("queue_show", cog.queue_show(ctx("queue_show")))
+
+
+async def benchmark(args: argparse.Namespace) -> Dict:
+    """Runs the benchmark and returns the results"""
+
+    lavalink = FakeLavalink(search_size=args.search_size, load_delay=args.lavalink_latency)
+    await lavalink.start()
+
+    # The cogs read their configuration when they are imported
+    os.environ["LAVALINK_NODES"] = lavalink.uri
+    os.environ.setdefault("LAVALINK_KEY", "benchmark")
+    os.environ.setdefault("QUEUE_DB", ":memory:")
+    os.environ.setdefault("HISTORY_DB", ":memory:")
+    os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+    os.environ.setdefault("NODE_HEALTH_INTERVAL", "3600")
+    from cogs.MusicPlayer import MusicPlayer
+    from utils.EmbedStore import EMBEDS
+    from utils.Outbound import OUTBOUND
+
+    client = FakeClient(FakeApi(args.api_latency))
+    cog = MusicPlayer(client)
+    client.add_cog(cog)
+    await cog.on_ready()
+
+    guilds = [client.add_guild() for _ in range(args.guilds)]
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    rss_before = rss_mb()
+    cpu_before = time.process_time()
+    start = time.perf_counter()
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    await asyncio.gather(*(run_guild(client, cog, guild, args, latencies) for guild in guilds))
+    await client.wait_for_events()
+
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_before
+    allocations_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if args.tracemalloc else None
+    if args.tracemalloc:
+        tracemalloc.stop()
+
+    # The last now playing updates wait out their coalesce window
+    await asyncio.gather(*cog.now_playing_sends.values())
+
+    commands = sum(len(samples) for samples in latencies.values())
+    gc.collect()
+    now_playing = EMBEDS.stats()
+    # Each started track is taken to play to its end
+    now_playing["api_calls_per_playback_hour"] = (
+        now_playing["api_calls_per_track"] * 3600 / (lavalink.track_length / 1000)
+    )
+    results = {
+        "commit": commit(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "commands": {command: percentiles(samples) for command, samples in sorted(latencies.items())},
+        "events": {
+            event: percentiles(samples) for event, samples in sorted(client.event_latencies.items())
+            if event.startswith("wavelink_track")
+        },
+        "throughput_per_s": commands / wall if wall else 0.0,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "rss_mb": rss_mb(),
+        "rss_growth_mb": rss_mb() - rss_before,
+        "allocated_blocks": sys.getallocatedblocks() - blocks,
+        "allocations_peak_mb": allocations_peak,
+        "discord_api_calls": dict(client.api.calls),
+        "outbound": OUTBOUND.stats(),
+        "now_playing": now_playing,
+        "lavalink_requests": lavalink.requests,
+    }
+
+    await lavalink.stop()
+    return results
+
+
+def compare(results: Dict, baseline: Dict) -> None:
+    """Prints the latency changes against an earlier result file"""
+
+    print(f"\n{baseline['commit']} -> {results['commit']}")
+    for section in ("commands", "events"):
+        for name, stats in results[section].items():
+            before = baseline.get(section, {}).get(name)
+            if not before:
+                continue
+            for key in ("p50_ms", "p99_ms"):
+                change = (stats[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+                print(f"{name:28} {key}: {before[key]:9.3f} -> {stats[key]:9.3f} ({change:+.1f} %)")
+
+    for key in ("throughput_per_s", "rss_mb", "cpu_s"):
+        print(f"{key:28}: {baseline[key]:9.3f} -> {results[key]:9.3f}")
+
+
+def main() -> None:
+    """Parses arguments, runs the benchmark and prints or stores the results"""
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--playlist-size", type=int, default=100)
+    parser.add_argument("--plays", type=int, default=10)
+    parser.add_argument("--unique-queries", type=int, default=50)
+    parser.add_argument("--skips", type=int, default=10)
+    parser.add_argument("--search-size", type=int, default=5)
+    parser.add_argument("--lavalink-latency", type=float, default=0.0, help="seconds per search")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="seconds per discord call")
+    parser.add_argument("--tracemalloc", action="store_true", help="track allocation peak, slower")
+    parser.add_argument("--output", help="write the results as json to this file")
+    parser.add_argument("--compare", help="compare with an earlier results file")
+    args = parser.parse_args()
+
+    results = asyncio.run(benchmark(args))
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,18 @@
 import discord
 from discord.ext import commands
 
-from discord.ext.pages import Paginator, Page, PaginatorButton
-
 from random import randrange
 import time
 
+from typing import List, Tuple
+
 import wavelink
 
-EMBEDS = {}
+from utils.EmbedStore import EMBEDS
+from utils.MusicQueue import QueuedTrack
+from utils.Tracing import TRACER
+
+QUEUE_PAGE_SIZE = 10
 
 class CreateEmbed(commands.Cog):
     """Handles creating embeds"""
@@ -24,16 +28,30 @@ class CreateEmbed(commands.Cog):
 
         print("CreateEmbed.py is ready!")
 
-    async def now_playing(
+    @TRACER.traced("embed.now_playing")
+    async def now_playing(self, track: wavelink.Playable, guild_id: int) -> discord.Embed:
+        """Gets the now playing embed, renders it only when the track starts playing"""
+
+        requester_id = getattr(track.extras, "requester_id", None)
+        key = (track.encoded, requester_id)
+
+        now_playing = EMBEDS.get(guild_id, key)
+        if now_playing is None:
+            description = f"Begärd av <@{requester_id}>" if requester_id else None
+            now_playing = self.render_now_playing(track, description)
+            EMBEDS.put(guild_id, key, now_playing)
+        return now_playing
+
+    def render_now_playing(
         self,
         track: wavelink.Playable,
-        member: discord.Member,
-    ):
-        """Creates the now playing embed and stores in a dict"""
-        
+        description: str = None
+    ) -> discord.Embed:
+        """Renders the now playing embed for a track"""
+
         now_playing = discord.Embed(
             title=track.title,
-            description=f"Begärd av {member.mention}",
+            description=description,
             url=track.uri,
             colour=discord.Colour.dark_purple(),
         )
@@ -43,11 +61,7 @@ class CreateEmbed(commands.Cog):
                   f"{time.strftime('%H:%M:%S', time.gmtime(track.length / 1000))} | "
                   f"Spelas nu")
             )
-
-        if track in EMBEDS:
-            EMBEDS[track][1] += 1
-        else:
-            EMBEDS[track] = [now_playing, 1]
+        return now_playing
 
     async def pause_resume(self, player: wavelink.Player):
         if not player.paused:
@@ -70,19 +84,11 @@ class CreateEmbed(commands.Cog):
             )
         return one_line_embed
 
-    async def get_now_playing(self, track: wavelink.Playable) -> discord.Embed:
-        """Gets the now playing embed"""
-
-        if EMBEDS[track][1] == 1:
-            return EMBEDS.pop(track)[0]
-        else:
-            EMBEDS[track][1] -= 1
-            return EMBEDS[track][0]
-
+    @TRACER.traced("embed.song_added")
     async def song_added(
         self,
         track: wavelink.Playable,
-        queue: wavelink.player.Queue,
+        position: int,
         member: discord.Member,
         player: wavelink.Player = None
     ) -> discord.Embed:
@@ -98,7 +104,7 @@ class CreateEmbed(commands.Cog):
 
         queue_text = ""
         if player.playing:
-            queue_text = f"Köplats - {queue.index(track) + 1} |"
+            queue_text = f"Köplats - {position} |"
 
         song_added.set_footer(
             text=(f"{queue_text} Längd: "
@@ -107,33 +113,25 @@ class CreateEmbed(commands.Cog):
         )
         return song_added
 
+    @TRACER.traced("embed.list_added")
     async def list_added(
         self,
         query: str,
-        playlist: wavelink.Playlist,
-        queue: wavelink.player.Queue,
+        name: str,
+        position: int,
         member: discord.Member,
         count: int,
+        playlist_duration: int,
+        authors: str,
         player: wavelink.Player = None
     ) -> discord.Embed:
-        """Creates the list added embed"""
+        """Creates the list added embed from a summary built while queueing"""
 
         # If query is typod but still found, try to remedy and grab link.
         query = max(query.split(), key = len)
 
-        playlist_duration = 0
-        for track in playlist:
-            playlist_duration += track.length
-
-        for i, track in enumerate(playlist):
-            if playlist[i - 1].author != track.author:
-                authors = "Flera artister"
-                break
-            else:
-                authors = track.author
-        
         list_added = discord.Embed(
-            title=playlist.name,
+            title=name,
             description=f"Begärd av {member.mention}",
             url=query,
             colour=discord.Colour.dark_purple(),
@@ -142,7 +140,7 @@ class CreateEmbed(commands.Cog):
 
         queue_text = ""
         if player.playing:
-            queue_text = f"Köplats - {queue.index(track) + 1} |"
+            queue_text = f"Köplats - {position} |"
 
         list_added.set_footer(
             text=(f"{queue_text} Längd: "
@@ -184,75 +182,139 @@ class CreateEmbed(commands.Cog):
         )
         return not_same_channel
 
-    async def queue_show(
-        self,
-        ctx: discord.ApplicationContext,
-        player: wavelink.Player
-    ):
-        """Creates the show queue embed"""
-    
-        track_titles = []
-        for i, track_title in enumerate(player.queue):
-            track_titles.append(track_title)
-
-        tracks = []
-        for i, track in enumerate(player.queue):
-            tracks.append(track)
-        
-        tracks_artists_ids = []
-        embeds = []
-        pages = []
-
-        song_strings = (f"Spelas nu:\n[{player.current.title}]({player.current.uri})"
-                        f" av {player.current.author}\n\nUppkommande:\n"
+    async def history(self, entries: List[Tuple[float, QueuedTrack]]) -> discord.Embed:
+        """Creates the history embed, newest track first"""
+
+        history_strings = [
+            f"**{i + 1}.** [{track.title}]({track.uri}) av {track.author} <t:{int(played_at)}:R>\n\n"
+            for i, (played_at, track) in enumerate(entries)
+        ]
+
+        return discord.Embed(
+            title="Senast spelade",
+            description="".join(history_strings),
+            colour=discord.Colour.dark_purple(),
         )
-        # Adds strings to tracks_artists_ids for use in queue pages
-        for i in range(len(tracks)):
-            tracks_artists_ids.append(
-                f"**{(i + 1)}.** [{track_titles[i]}]({tracks[i].uri})"
-                f" av {tracks[i].author}\n\n"
-            )
-        for i in range(len(tracks_artists_ids)):
-            song_strings += tracks_artists_ids[i]
-
-            # Makes one embed per 10 tracks
-            if (i + 1) % 10 == 0:
-                embeds.append(
-                    discord.Embed(
-                        title=f"Antal låtar i kön: {len(player.queue)}",
-                        description=song_strings,
-                        type="link",
-                        colour=discord.Colour.dark_purple(),
-                    )
-                )
-                song_strings = ""
-        # Adds the last songs if the condition (i + 1) % 10 == 0 isn't met
-        if song_strings != "":
-            embeds.append(
-                discord.Embed(
-                    title=f"Antal låtar i kön: {len(player.queue)}",
-                    description=song_strings,
-                    type="link",
-                    colour=discord.Colour.dark_purple(),
-                )
+
+    def queue_show(self, player: wavelink.Player, user_id: int) -> "QueuePaginator":
+        """Creates the show queue paginator, pages are rendered when they are opened"""
+
+        return QueuePaginator(self, player, user_id)
+
+    def queue_page(self, player: wavelink.Player, page: int) -> discord.Embed:
+        """Renders one page of the queue from a slice of the queue"""
+
+        start = page * QUEUE_PAGE_SIZE
+        tracks = player.queue[start:start + QUEUE_PAGE_SIZE]
+
+        song_strings = [
+            f"**{start + i + 1}.** [{track.title}]({track.uri}) av {track.author}\n\n"
+            for i, track in enumerate(tracks)
+        ]
+        if page == 0 and player.current:
+            song_strings.insert(
+                0,
+                f"Spelas nu:\n[{player.current.title}]({player.current.uri})"
+                f" av {player.current.author}\n\nUppkommande:\n"
             )
-        for page in embeds:
-            pages.append(Page(embeds=[page]))
-        
-        paginator = Paginator(pages=pages, timeout=300)
-
-        paginator.add_button(PaginatorButton("first", label="<<", style=discord.ButtonStyle.gray))
-        paginator.add_button(PaginatorButton("prev", label="<", style=discord.ButtonStyle.gray))
-        paginator.add_button(PaginatorButton("page_indicator", style=discord.ButtonStyle.gray, disabled=True))
-        paginator.add_button(PaginatorButton("next", label=">", style=discord.ButtonStyle.gray))
-        paginator.add_button(PaginatorButton("last", label=">>", style=discord.ButtonStyle.gray))
-
-        return await paginator.respond(ctx)
-    
-    async def reset_embeds(self):
-        """Removes all embeds"""
-
-        EMBEDS = {}
+
+        return discord.Embed(
+            title=f"Antal låtar i kön: {len(player.queue)}",
+            description="".join(song_strings),
+            type="link",
+            colour=discord.Colour.dark_purple(),
+        )
+
+    async def reset_embeds(self, guild_id: int):
+        """Removes all embeds stored for a guild"""
+
+        EMBEDS.clear(guild_id)
+
+
+class QueuePaginator(discord.ui.View):
+    """Paginator for the queue that only renders the page being shown"""
+
+    def __init__(self, create_embed: CreateEmbed, player: wavelink.Player, user_id: int, timeout=300):
+        super().__init__(timeout=timeout)
+        self.create_embed = create_embed
+        self.player = player
+        self.user_id = user_id
+        self.page = 0
+        EMBEDS.views.add(self)
+
+    @property
+    def page_count(self) -> int:
+        """Returns the current amount of pages, follows changes to the queue"""
+
+        return max(1, -(-len(self.player.queue) // QUEUE_PAGE_SIZE))
+
+    def render(self) -> discord.Embed:
+        """Renders the current page and updates the buttons"""
+
+        page_count = self.page_count
+        self.page = max(0, min(self.page, page_count - 1))
+
+        self.first.disabled = self.prev.disabled = self.page == 0
+        self.next.disabled = self.last.disabled = self.page == page_count - 1
+        self.page_indicator.label = f"{self.page + 1}/{page_count}"
+
+        return self.create_embed.queue_page(self.player, self.page)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Only lets the user who showed the queue turn its pages"""
+
+        if interaction.user.id == self.user_id:
+            return True
+
+        await interaction.response.send_message(
+            embed=await self.create_embed.one_line_embed("Bara den som visade kön kan bläddra!"),
+            ephemeral=True
+        )
+        return False
+
+    async def on_timeout(self) -> None:
+        """Disables the buttons once the paginator stops listening"""
+
+        self.disable_all_items()
+        message = self.message or self.parent
+        if not message:
+            return
+
+        try:
+            await message.edit(view=self)
+        except discord.HTTPException as e:
+            print(f"Exception occured when disabling the queue paginator: {e}")
+
+    async def goto(self, interaction: discord.Interaction, page: int) -> None:
+        """Shows the given page"""
+
+        self.page = page
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="<<", style=discord.ButtonStyle.gray)
+    async def first(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+
+        await self.goto(interaction, 0)
+
+    @discord.ui.button(label="<", style=discord.ButtonStyle.gray)
+    async def prev(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+
+        await self.goto(interaction, self.page - 1)
+
+    @discord.ui.button(label="1/1", style=discord.ButtonStyle.gray, disabled=True)
+    async def page_indicator(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+
+        pass
+
+    @discord.ui.button(label=">", style=discord.ButtonStyle.gray)
+    async def next(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+
+        await self.goto(interaction, self.page + 1)
+
+    @discord.ui.button(label=">>", style=discord.ButtonStyle.gray)
+    async def last(self, button: discord.ui.Button, interaction: discord.Interaction) -> None:
+
+        await self.goto(interaction, self.page_count - 1)
 
 
 def setup(client: commands.Bot) -> None:
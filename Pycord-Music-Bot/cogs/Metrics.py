@@ -0,0 +1,205 @@
+import asyncio
+import time
+
+import discord
+from discord.ext import commands
+
+from aiohttp import web
+
+from utils.Autocomplete import AUTOCOMPLETE
+from utils.EmbedStore import EMBEDS
+from utils.GuildExecutor import GUILD_EXECUTOR
+from utils.Metrics import Histogram, MetricsWriter, SIZE_BUCKETS
+from utils.NodePool import NODE_POOL
+from utils.Occupancy import OCCUPANCY
+from utils.Outbound import OUTBOUND
+from utils.SearchCache import SEARCH_CACHE
+from utils.TrackGap import TRACK_GAPS
+from utils.Watchdog import WATCHDOG
+
+from typing import Dict, Optional
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+
+class Metrics(commands.Cog):
+    """Serves Prometheus metrics on METRICS_PORT when it is set"""
+
+    def __init__(self, client: commands.Bot):
+        """Initiates the Metrics Class"""
+
+        self.client = client
+        self.command_latency: Dict[str, Histogram] = {}
+        self.command_errors = 0
+        self._started: Dict[int, float] = {}
+        self._runner: Optional[web.AppRunner] = None
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """Starts the metrics endpoint once"""
+
+        if METRICS_PORT and self._runner is None:
+            app = web.Application()
+            app.router.add_get("/metrics", self.metrics)
+
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            await web.TCPSite(self._runner, METRICS_HOST, int(METRICS_PORT)).start()
+
+            print(f"Metrics are served on http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+
+        print("Metrics.py is ready!")
+
+    def cog_unload(self) -> None:
+        """Stops the metrics endpoint"""
+
+        if self._runner:
+            asyncio.create_task(self._runner.cleanup())
+
+    @commands.Cog.listener()
+    async def on_application_command(self, ctx: discord.ApplicationContext) -> None:
+        """Remembers when a command started"""
+
+        self._started[ctx.interaction.id] = time.perf_counter()
+
+    @commands.Cog.listener()
+    async def on_application_command_completion(self, ctx: discord.ApplicationContext) -> None:
+        """Records the latency of a finished command"""
+
+        self.observe_command(ctx)
+
+    @commands.Cog.listener()
+    async def on_application_command_error(
+        self, ctx: discord.ApplicationContext, error: discord.DiscordException
+    ) -> None:
+        """Records the latency of a failed command"""
+
+        self.command_errors += 1
+        self.observe_command(ctx)
+
+    def observe_command(self, ctx: discord.ApplicationContext) -> None:
+        """Adds the time since a command started to its histogram"""
+
+        started = self._started.pop(ctx.interaction.id, None)
+        if started is None or ctx.command is None:
+            return
+
+        name = ctx.command.qualified_name
+        histogram = self.command_latency.get(name)
+        if histogram is None:
+            histogram = self.command_latency[name] = Histogram()
+        histogram.observe(time.perf_counter() - started)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        """Returns all metrics in Prometheus text format"""
+
+        writer = MetricsWriter()
+
+        writer.histograms(
+            "musicbot_command_latency_seconds", self.command_latency, "command",
+            "Time from invocation to completion of slash commands"
+        )
+        writer.counter("musicbot_command_errors_total", self.command_errors, "Failed slash commands")
+
+        writer.histogram(
+            "musicbot_autocomplete_latency_seconds", AUTOCOMPLETE.latency, "Local /play autocomplete lookups"
+        )
+        writer.histogram(
+            "musicbot_search_latency_seconds", SEARCH_CACHE.latency, "Lavalink search round trips"
+        )
+        search = SEARCH_CACHE.stats()
+        writer.counter("musicbot_search_cache_hits_total", search["hits"], "Searches answered from the cache")
+        writer.counter("musicbot_search_cache_misses_total", search["misses"], "Searches sent to Lavalink")
+        writer.counter(
+            "musicbot_search_cache_coalesced_total", search["coalesced"],
+            "Searches that waited on an identical search in flight"
+        )
+        lookups = search["hits"] + search["misses"] + search["coalesced"]
+        writer.gauge(
+            "musicbot_search_cache_hit_ratio",
+            (search["hits"] + search["coalesced"]) / lookups if lookups else 0.0,
+            "Share of searches not sent to Lavalink"
+        )
+        writer.gauge("musicbot_search_cache_entries", search["size"], "Cached search results")
+
+        writer.labelled_gauge(
+            "musicbot_node_players",
+            {node.identifier: len(node.players) for node in NODE_POOL.nodes},
+            "node", "Active players per Lavalink node"
+        )
+        writer.labelled_gauge(
+            "musicbot_node_penalty",
+            {node.identifier: NODE_POOL.penalties.get(node.identifier, 0.0) for node in NODE_POOL.nodes},
+            "node", "Load penalty per Lavalink node"
+        )
+        writer.labelled_gauge(
+            "musicbot_node_healthy",
+            {
+                node.identifier: int(node.identifier not in NODE_POOL.unhealthy)
+                for node in NODE_POOL.nodes
+            },
+            "node", "Whether a Lavalink node passed its last health check"
+        )
+
+        writer.distribution(
+            "musicbot_queue_length",
+            [len(player.queue) for player in self.client.voice_clients if hasattr(player, "queue")],
+            SIZE_BUCKETS, "Current queue lengths over all players"
+        )
+
+        occupancy = OCCUPANCY.stats()
+        writer.gauge("musicbot_voice_channels", occupancy["channels"], "Voice channels the bot is in")
+        writer.gauge("musicbot_voice_channels_empty", occupancy["empty"], "Voice channels without people")
+        writer.gauge("musicbot_timers", occupancy["timers"], "Scheduled disconnect timers")
+        writer.counter("musicbot_timers_fired_total", occupancy["fired"], "Disconnect timers that fired")
+
+        writer.histogram(
+            "musicbot_track_gap_seconds", TRACK_GAPS.gap,
+            "Time from a track playing to its end until the next track starts"
+        )
+
+        embeds = EMBEDS.stats()
+        writer.gauge("musicbot_embed_store_embeds", embeds["embeds"], "Now playing embeds stored")
+        writer.gauge("musicbot_embed_store_messages", embeds["messages"], "Now playing messages tracked")
+        writer.gauge("musicbot_views", embeds["views"], "Live button and paginator views")
+        writer.counter("musicbot_now_playing_tracks_total", embeds["tracks"], "Tracks shown as now playing")
+        writer.counter("musicbot_now_playing_sent_total", embeds["sent"], "Now playing messages sent")
+        writer.counter("musicbot_now_playing_edited_total", embeds["edited"], "Now playing messages edited")
+        writer.gauge(
+            "musicbot_now_playing_api_calls_per_track", embeds["api_calls_per_track"],
+            "Now playing sends and edits per started track"
+        )
+
+        outbound = OUTBOUND.stats()
+        writer.gauge("musicbot_outbound_queue_depth", outbound["queue_depth"], "Messages waiting to be sent")
+        writer.counter("musicbot_outbound_rate_limited_total", outbound["rate_limited"], "Sends that hit a 429")
+
+        writer.histograms(
+            "musicbot_guild_queue_wait_seconds", GUILD_EXECUTOR.wait, "command",
+            "Time commands and events waited behind earlier ones of the same guild"
+        )
+        executor = GUILD_EXECUTOR.stats()
+        writer.gauge("musicbot_guild_queue_depth", executor["queue_depth"], "Commands waiting in guild mailboxes")
+        writer.counter("musicbot_guild_merged_total", executor["merged"], "Commands merged into a pending one")
+        writer.counter("musicbot_guild_rejected_total", executor["rejected"], "Commands rejected by a full mailbox")
+
+        writer.gauge("musicbot_gateway_latency_seconds", self.client.latency, "Discord gateway heartbeat latency")
+        writer.histogram("musicbot_event_loop_lag_seconds", WATCHDOG.lag, "Event loop wake up delay")
+        writer.gauge("musicbot_event_loop_lag_last_seconds", WATCHDOG.last_lag, "Last event loop wake up delay")
+        writer.counter(
+            "musicbot_event_loop_stalls_total", WATCHDOG.stalls,
+            "Times the event loop was blocked longer than the watchdog threshold"
+        )
+
+        return web.Response(text=writer.render(), content_type="text/plain", charset="utf-8")
+
+
+def setup(client: commands.Bot) -> None:
+    """Setup the cog"""
+
+    client.add_cog(Metrics(client))
@@ -2,6 +2,12 @@ import discord
 from discord.ext import commands
 
 from cogs.MusicPlayer import MusicPlayer
+from utils.Autocomplete import AUTOCOMPLETE
+from utils.Recorder import RECORDER
+from utils.Tracing import TRACER
+from utils.Watchdog import WATCHDOG
+
+from typing import List
 
 import os
 from dotenv import load_dotenv
@@ -10,6 +16,13 @@ load_dotenv()
 LAVALINK_KEY = os.getenv("LAVALINK_KEY")
 
 
+async def query_autocomplete(ctx: discord.AutocompleteContext) -> List[discord.OptionChoice]:
+    """Suggests tracks from the guild's history and recent searches, without asking Lavalink"""
+
+    RECORDER.autocomplete(ctx.interaction.guild_id, ctx.value or "")
+    return AUTOCOMPLETE.suggest(ctx.interaction.guild_id, ctx.value or "")
+
+
 class MusicCommands(commands.Cog):
     """Handles playing music in voice chat"""
 
@@ -17,17 +30,38 @@ class MusicCommands(commands.Cog):
         """Inits the Music Class"""
 
         self.client = client
-        self.music_player = MusicPlayer(self.client)
         self.text = []
 
+    @property
+    def music_player(self) -> MusicPlayer:
+        """Returns the loaded MusicPlayer cog, shared with the player buttons"""
+
+        return self.client.get_cog("MusicPlayer")
+
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         """Runs when the bot is ready and connects to wavelink api"""
 
         print("MusicCommands.py is ready!")
 
+    async def cog_before_invoke(self, ctx: discord.ApplicationContext) -> None:
+        """Names the task of a command for the watchdog, samples it for tracing and records it"""
+
+        WATCHDOG.label(f"/{ctx.command.qualified_name} guild={ctx.guild_id}")
+        TRACER.begin(ctx.interaction.id, ctx.command.qualified_name, ctx.guild_id)
+        RECORDER.command(ctx.command.callback.__name__, ctx.guild_id, ctx.user.id, ctx.selected_options or [])
+
+    async def cog_after_invoke(self, ctx: discord.ApplicationContext) -> None:
+        """Ends the trace of a sampled command"""
+
+        TRACER.end(ctx.interaction.id)
+
     @discord.command(name="play", description="Spelar/köar den angivna låten/länken.")
-    async def play(self, ctx: discord.ApplicationContext, query: str) -> None:
+    async def play(
+        self,
+        ctx: discord.ApplicationContext,
+        query: discord.Option(str, "Låten eller länken att spela.", autocomplete=query_autocomplete)
+    ) -> None:
         """Initiates vc and plays given track"""
 
         await self.music_player.play(ctx, query)
@@ -69,6 +103,42 @@ class MusicCommands(commands.Cog):
         
         await self.music_player.queue_clear(ctx)
 
+    @queue_group.command(name="remove", description="Tar bort låtar från låtkön.")
+    async def queue_remove(self, ctx: discord.ApplicationContext, start: int, end: int = None) -> None:
+        """Removes the tracks between two queue positions"""
+
+        await self.music_player.queue_remove(ctx, start, end)
+
+    @queue_group.command(name="move", description="Flyttar en låt i låtkön.")
+    async def queue_move(self, ctx: discord.ApplicationContext, position: int, to: int) -> None:
+        """Moves a track to another queue position"""
+
+        await self.music_player.queue_move(ctx, position, to)
+
+    @queue_group.command(name="dedupe", description="Tar bort dubbletter från låtkön.")
+    async def queue_dedupe(self, ctx: discord.ApplicationContext) -> None:
+        """Removes repeated tracks from the queue"""
+
+        await self.music_player.queue_dedupe(ctx)
+
+    @queue_group.command(name="removeuser", description="Tar bort en användares låtar från låtkön.")
+    async def queue_remove_user(self, ctx: discord.ApplicationContext, member: discord.Member) -> None:
+        """Removes every track requested by a member from the queue"""
+
+        await self.music_player.queue_remove_user(ctx, member)
+
+    @discord.command(name="history", description="Visar de senast spelade låtarna.")
+    async def history(self, ctx: discord.ApplicationContext) -> None:
+        """Shows the latest played tracks"""
+
+        await self.music_player.history(ctx)
+
+    @discord.command(name="replay", description="Köar en låt från historiken igen.")
+    async def replay(self, ctx: discord.ApplicationContext, position: int = 1) -> None:
+        """Queues a track from the history without searching for it"""
+
+        await self.music_player.replay(ctx, position)
+
     @discord.command(name="disconnect", description="Kopplar bort botten.")
     async def disconnect(self, ctx: discord.ApplicationContext) -> None:
         """Disconnects the player"""
@@ -2,10 +2,29 @@ import discord
 from discord.ext import commands
 
 from cogs.CreateEmbed import CreateEmbed
+from utils.AudioService import AUDIO
+from utils.Autocomplete import AUTOCOMPLETE
+from utils.EmbedStore import EMBEDS
+from utils.GuildExecutor import GUILD_EXECUTOR, GuildBusy, MERGED
+from utils.HistoryStore import HISTORY
+from utils.NodePool import NODE_POOL
+from utils.Occupancy import OCCUPANCY
+from utils.Outbound import OUTBOUND, INTERACTION, NOW_PLAYING, INFO
+from utils.QueueStore import QUEUE_STORE
+from utils.Recorder import RECORDER
+from utils.SearchCache import SEARCH_CACHE
+from utils.Tracing import TRACER
+from utils.TrackGap import TRACK_GAPS
+from utils.Watchdog import WATCHDOG
 
 import wavelink
 
-from typing import Optional, List, cast
+import asyncio
+import functools
+import json
+import time
+
+from typing import Dict, Optional, List, cast
 
 import os
 from dotenv import load_dotenv
@@ -13,6 +32,45 @@ from dotenv import load_dotenv
 load_dotenv()
 LAVALINK_KEY = os.getenv("LAVALINK_KEY")
 
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 200))
+
+
+def serialized(name: str, merge: bool = False):
+    """Runs a command through its guild's executor, after the earlier commands of the guild"""
+
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(self: "MusicPlayer", ctx: discord.ApplicationContext, *args, **kwargs):
+            # Keeps the interaction alive while it waits behind other commands
+            if GUILD_EXECUTOR.pending(ctx.guild_id) and not ctx.response.is_done():
+                await OUTBOUND.send(ctx.channel_id, ctx.response.defer, INTERACTION)
+
+            trace = TRACER.current()
+            enqueued = time.perf_counter()
+            try:
+                result = await GUILD_EXECUTOR.submit(
+                    ctx.guild_id,
+                    name,
+                    lambda: TRACER.run(trace, function(self, ctx, *args, **kwargs), enqueued),
+                    merge=merge
+                )
+            except GuildBusy:
+                return await self.respond(
+                    ctx,
+                    embed=await self.create_embed.one_line_embed(
+                        "Upptagen, försök igen om en stund!"
+                    )
+                )
+
+            if result is MERGED:
+                return await self.respond(
+                    ctx,
+                    embed=await self.create_embed.one_line_embed("Redan på gång!")
+                )
+            return result
+        return wrapper
+    return decorator
+
 
 class MusicPlayer(commands.Cog):
     """Handles playing music in voice chat"""
@@ -22,98 +80,536 @@ class MusicPlayer(commands.Cog):
 
         self.client = client
         self.create_embed = CreateEmbed(self.client)
+        self.button_view: Optional[ButtonView] = None
+        self.now_playing_sends: Dict[int, asyncio.Task] = {}
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
-        """Runs when the bot is ready and connects to wavelink api"""
+        """Runs when the bot is ready and restores the stored players once Lavalink is connected"""
 
-        try:
-            node: wavelink.Node = wavelink.Node(
-                uri="http://localhost:2333", 
-                password=LAVALINK_KEY, 
-                inactive_player_timeout=300
-            )
-            await wavelink.Pool.connect(client=self.client, nodes=[node])
-        except Exception as e:
-            print(f"Exception occured when trying to connect to lavalink: {e}")
+        # Already started by main at login, started here when the cog runs without main
+        AUDIO.start(self.client)
+
+        if not QUEUE_STORE.started:
+            await AUDIO.connected()
+            await self.restore_players()
+            QUEUE_STORE.start()
+            HISTORY.start()
+            TRACER.start()
+            RECORDER.start()
+            await AUTOCOMPLETE.load(await HISTORY.played())
+            AUDIO.mark("players restored")
 
         print("MusicPlayer.py is ready!")
+
+    async def restore_players(self) -> None:
+        """Reconnects and resumes the stored players of this process's guilds in parallel"""
+
+        start = time.perf_counter()
+        states = [
+            state for state in await asyncio.to_thread(QUEUE_STORE.load)
+            if self.client.get_guild(state["guild_id"])
+        ]
+        if not states:
+            return
+
+        restored = await asyncio.gather(
+            *(self.restore_player(state) for state in states), return_exceptions=True
+        )
+        failed = [
+            (state["guild_id"], result) for state, result in zip(states, restored)
+            if result is not True
+        ]
+        for guild_id, result in failed:
+            print(f"Could not restore player in guild {guild_id}: {result}")
+
+        print(
+            f"Restored {len(states) - len(failed)}/{len(states)} players in "
+            f"{time.perf_counter() - start:.2f} s"
+        )
+
+    async def restore_player(self, state) -> bool:
+        """Reconnects one player and resumes its track, position and queue"""
+
+        channel = self.client.get_channel(state["channel_id"])
+        if channel is None:
+            QUEUE_STORE.forget(state["guild_id"])
+            return False
+
+        player: wavelink.Player = await channel.connect(cls=NODE_POOL.create_player)
+        player.home = state["home_id"]
+        player.autoplay = wavelink.AutoPlayMode(state["autoplay"])
+        await self.seed_history(player)
+
+        player.queue.put([QUEUE_STORE.decode_track(data) for data in json.loads(state["queue"])])
+        if state["current"]:
+            await player.play(
+                QUEUE_STORE.decode_track(json.loads(state["current"])),
+                start=state["position"],
+                volume=state["volume"]
+            )
+        elif player.queue:
+            await player.play(player.queue.get(), volume=state["volume"])
+
+        QUEUE_STORE.mark(player)
+        return True
+
+    async def seed_history(self, player: wavelink.Player) -> None:
+        """Puts the guild's latest stored played tracks in the queue history autoplay picks its seeds from"""
+
+        entries = await HISTORY.recent(player.guild.id)
+        player.queue.history.put([record.playable() for _, record in reversed(entries)])
     
     @commands.Cog.listener()
-    async def on_wavelink_inactive_player(self, player: wavelink.Playable) -> None:
+    async def on_wavelink_node_closed(
+        self, node: wavelink.Node, disconnected: List[wavelink.Player]
+    ) -> None:
+        """Reconnects the players of a closed node on a healthy node"""
+
+        # The node disconnects its players before this event, so they cannot be
+        # switched and are reconnected from their queue and the stored position
+        NODE_POOL.unhealthy.add(node.identifier)
+        await self.move_players(node, disconnected, "node_closed")
+
+    @commands.Cog.listener()
+    async def on_node_unhealthy(self, node: wavelink.Node, players: List[wavelink.Player]) -> None:
+        """Moves the players of a node that failed its health check to a healthy node"""
+
+        await self.move_players(node, players, "node_unhealthy")
+
+    async def move_players(self, node: wavelink.Node, players: List[wavelink.Player], name: str) -> None:
+        """Resumes the players of a failed node on a healthy node, each in its guild's mailbox"""
+
+        if not players:
+            return
+
+        states = {state["guild_id"]: state for state in await asyncio.to_thread(QUEUE_STORE.load)}
+        moved = await asyncio.gather(
+            *(
+                GUILD_EXECUTOR.submit(
+                    player.guild.id,
+                    name,
+                    functools.partial(self.resume_player, player, states.get(player.guild.id)),
+                    force=True
+                )
+                for player in players
+            ),
+            return_exceptions=True
+        )
+        for player, result in zip(players, moved):
+            if isinstance(result, Exception):
+                print(f"Could not move player in guild {player.guild.id} from {node.identifier}: {result}")
+
+    async def resume_player(self, old: wavelink.Player, state) -> None:
+        """Moves a player off a failed node, live while it is connected, else by resuming it in a new player"""
+
+        current = old.current
+        channel = old.channel
+        position = 0
+        if old.connected and old.guild.voice_client is old:
+            # Moved already by an earlier check, or its node recovered
+            if old.node.identifier not in NODE_POOL.unhealthy:
+                return
+            position = old.position
+            try:
+                await old.switch_node(NODE_POOL.best_node(exclude=old.node))
+            except wavelink.InvalidNodeException:
+                # No healthy node to move to, it keeps playing where it is
+                return
+            except RuntimeError as e:
+                # A failed switch leaves the player stale, it is reconnected instead
+                print(f"Exception occured when switching node in guild {old.guild.id}: {e}")
+                await old.disconnect()
+            else:
+                QUEUE_STORE.mark(old)
+                return
+        elif old.guild.voice_client:
+            # Someone started a new player while the node was closing
+            return
+        elif current and state and state["current"]:
+            # The stored position is only the current track's if it was stored after the track started
+            stored = QUEUE_STORE.decode_track(json.loads(state["current"]))
+            if stored.identifier == current.identifier:
+                elapsed = 0 if old.paused else (time.time() - state["updated_at"]) * 1000
+                position = min(int(state["position"] + elapsed), current.length)
+
+        player: wavelink.Player = await channel.connect(cls=NODE_POOL.create_player)
+        player.home = getattr(old, "home", None)
+        player.autoplay = old.autoplay
+        player.queue.history.put(list(old.queue.history))
+
+        player.queue.put(list(old.queue))
+        if current:
+            await player.play(current, start=position, volume=old.volume, paused=old.paused)
+        elif player.queue:
+            await player.play(player.queue.get(), volume=old.volume)
+
+        QUEUE_STORE.mark(player)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(
+        self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState
+    ) -> None:
+        """Keeps the count of people in the bot's voice channels up to date"""
+
+        RECORDER.voice(member, before, after)
+        OCCUPANCY.update(member, before, after)
+
+    @commands.Cog.listener()
+    async def on_voice_channel_empty(self, player: wavelink.Player) -> None:
+        RECORDER.add("empty", player.guild.id)
+        await GUILD_EXECUTOR.submit(
+            player.guild.id,
+            "voice_channel_empty",
+            lambda: self.leave(player, empty=True),
+            force=True
+        )
+
+    @commands.Cog.listener()
+    async def on_wavelink_inactive_player(self, player: wavelink.Player) -> None:
+        RECORDER.add("inactive", player.guild.id)
+        await GUILD_EXECUTOR.submit(
+            player.guild.id, "inactive_player", lambda: self.leave(player), force=True
+        )
+
+    async def leave(self, player: wavelink.Player, empty: bool = False) -> None:
+        """Disconnects a player that has been inactive or left alone"""
+
+        # Someone may have joined after the timer fired
+        if empty and OCCUPANCY.humans(player.guild.id):
+            return
+
+        if not player.connected:
+            return
+
         channel = self.client.get_channel(player.home)
 
+        self.cancel_ingest(player)
         await player.disconnect()
-        await self.create_embed.reset_embeds()
-        await channel.send(embed=await self.create_embed.disconnect())
+        QUEUE_STORE.forget(player.guild.id)
+        TRACK_GAPS.forget(player.guild.id)
+        await self.create_embed.reset_embeds(player.guild.id)
+        await self.post(
+            channel,
+            await self.create_embed.one_line_embed(
+                f"{self.client.user.display_name} har bortkopplats!"
+            )
+        )
 
     @commands.Cog.listener()
     async def on_wavelink_track_start(self, payload: wavelink.TrackStartEventPayload) -> None:
-        """Shows current song and checks voice channel activity, disconnects when appropriate"""
+        AUDIO.mark("first track")
+        RECORDER.add("track_start", payload.player.guild.id)
+        OCCUPANCY.active(payload.player.guild.id)
+        TRACK_GAPS.started(payload.player)
+
+        # Continues the trace of the command that started the track, if it was sampled
+        trace = TRACER.track_started(payload.player.guild.id)
+        enqueued = time.perf_counter()
+        await GUILD_EXECUTOR.submit(
+            payload.player.guild.id,
+            "track_start",
+            lambda: TRACER.run(trace, self.track_start(payload), enqueued, "track_start.queue_wait"),
+            force=True
+        )
+
+    async def track_start(self, payload: wavelink.TrackStartEventPayload) -> None:
+        """Shows current song"""
+
+        if not payload.player.connected:
+            return
 
         channel = self.client.get_channel(payload.player.home)
+        QUEUE_STORE.mark(payload.player)
+        guild_id = payload.player.guild.id
+        HISTORY.record(guild_id, payload.track)
+        AUTOCOMPLETE.played(guild_id, payload.track)
+        EMBEDS.tracks += 1
+        embed = await self.create_embed.now_playing(payload.track, guild_id)
+
+        # Sent outside the guild's mailbox so the coalesce window holds up neither
+        # the guild's commands nor the next track start, which replaces this update
+        task = asyncio.create_task(self.send_now_playing(channel, guild_id, embed))
+        self.now_playing_sends[guild_id] = task
+        task.add_done_callback(
+            lambda done: self.now_playing_sends.pop(guild_id, None)
+            if self.now_playing_sends.get(guild_id) is done else None
+        )
 
-        if len(self.client.voice_clients[0].channel.members) <= 1:
-            await self.create_embed.reset_embeds()
-            await payload.player.disconnect()
+    async def send_now_playing(self, channel: discord.TextChannel, guild_id: int, embed: discord.Embed) -> None:
+        """Sends the now playing update through the outbound scheduler"""
 
-            await channel.send(embed=await self.create_embed.disconnect())
-        else:
-            button_view = ButtonView(self.client)
-            await channel.send(
-                embed=await self.create_embed.get_now_playing(payload.track), view=button_view
+        # Now playing updates within the coalesce window replace each other
+        try:
+            with TRACER.span("now_playing.send"):
+                await OUTBOUND.send(
+                    channel.id,
+                    lambda: self.show_now_playing(channel, guild_id, embed),
+                    NOW_PLAYING,
+                    key=("now_playing", guild_id)
+                )
+        except Exception as e:
+            print(f"Exception occured when sending now playing in guild {guild_id}: {e}")
+
+    @commands.Cog.listener()
+    async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload) -> None:
+        """Starts the inactivity timer and the gap timing, both ended when the next track starts"""
+
+        if payload.player:
+            RECORDER.add("track_end", payload.player.guild.id, str(payload.reason))
+            TRACK_GAPS.ended(payload.player.guild.id, str(payload.reason))
+            OCCUPANCY.idle(payload.player.guild.id)
+
+    async def show_now_playing(
+        self, channel: discord.TextChannel, guild_id: int, embed: discord.Embed
+    ) -> None:
+        """Edits the guild's now playing message, sends a new one if there is none"""
+
+        message = EMBEDS.get_message(guild_id)
+        if message and message[0] == channel.id:
+            try:
+                await channel.get_partial_message(message[1]).edit(embed=embed)
+                EMBEDS.edited += 1
+                return
+            except discord.NotFound:
+                pass
+
+        sent = await channel.send(embed=embed, view=self.button_view or ButtonView(self.client))
+        EMBEDS.sent += 1
+        EMBEDS.set_message(guild_id, channel.id, sent.id)
+
+    async def respond(self, ctx: discord.ApplicationContext, embed: discord.Embed, **kwargs):
+        """Responds to an interaction ahead of other messages in the channel"""
+
+        with TRACER.span("respond"):
+            return await OUTBOUND.send(
+                ctx.channel_id, lambda: ctx.respond(embed=embed, **kwargs), INTERACTION
             )
 
+    async def post(self, channel: discord.TextChannel, embed: discord.Embed) -> discord.Message:
+        """Posts an informational message to a channel"""
+
+        return await OUTBOUND.send(channel.id, lambda: channel.send(embed=embed), INFO)
+
+    @serialized("play")
     async def play(self, ctx: discord.ApplicationContext, query: str) -> None:
         """Initiates vc and plays given track"""
         
-        await ctx.response.defer()
-
-        if not ctx.user.voice:
-            await ctx.followup.send(
-                embed=await self.create_embed.user_not_in_channel()
-            )
-        player: wavelink.Player
-        player = cast(wavelink.Player, ctx.guild.voice_client)  # type: ignore
+        if not ctx.response.is_done():
+            with TRACER.span("defer"):
+                await OUTBOUND.send(ctx.channel_id, ctx.response.defer, INTERACTION)
 
+        with TRACER.span("join"):
+            player = await self.join(ctx)
         if not player:
-            player = await ctx.user.voice.channel.connect(cls=wavelink.Player)
-            player.home = ctx.channel.id
-
-        if not await self.check_channel_condition(ctx, player):
             return
-        
-        tracks: wavelink.Search = await wavelink.Playable.search(query)
+
+        with TRACER.span("search"):
+            tracks: wavelink.Search = await SEARCH_CACHE.search(query)
+        RECORDER.loaded(ctx.guild_id, query, tracks)
 
         if not tracks:
-            return await ctx.followup.send(
+            return await self.respond(
+                ctx,
                 embed=await self.create_embed.one_line_embed("Låten hittades inte")
             )
+        AUTOCOMPLETE.searched(ctx.guild_id, query, tracks)
         if isinstance(tracks, wavelink.Playlist):
-            added: int = await player.queue.put_wait(tracks)
-
-            if player.queue:
-                await ctx.followup.send(
-                    embed=await self.create_embed.list_added(
-                        query, tracks, player.queue, ctx.user, added, player
-                    )
-                )
+            previous: Optional[asyncio.Task] = getattr(player, "ingest", None)
+            if previous and previous.done():
+                previous = None
+
+            # Starts the first track right away, the rest is queued in the background
+            played = 0
+            if not player.playing and not player.queue and not previous:
+                tracks.tracks[0].extras = {"requester_id": ctx.user.id}
+                TRACER.expect_track_start(player.guild.id)
+                await player.play(tracks.tracks[0], volume=30)
+                played = 1
+
+            player.ingest = asyncio.create_task(
+                self.ingest_playlist(ctx, query, tracks, played, player, previous)
+            )
         else:
             track: wavelink.Playable = tracks[0]
-            await player.queue.put_wait(track)
+            track.extras = {"requester_id": ctx.user.id}
+            with TRACER.span("enqueue"):
+                await player.queue.put_wait(track)
+            position = len(player.queue)
 
             if player.queue:
-                await ctx.followup.send(
+                await self.respond(
+                    ctx,
                     embed=await self.create_embed.song_added(
-                        track, player.queue, ctx.user, player
+                        track, position, ctx.user, player
                     )
                 )
-        await self.create_embeds(ctx, tracks)
-        if not player.playing:
+        if not player.playing and player.queue:
+            TRACER.expect_track_start(player.guild.id)
+            await player.play(player.queue.get(), volume=30)
+
+        player.autoplay = wavelink.AutoPlayMode.partial
+        QUEUE_STORE.mark(player)
+
+    async def join(self, ctx: discord.ApplicationContext) -> Optional[wavelink.Player]:
+        """Returns the guild's player, connects to the user's channel when there is none"""
+
+        if not ctx.user.voice:
+            await self.respond(
+                ctx,
+                embed=await self.create_embed.user_not_in_channel()
+            )
+            return None
+
+        player: wavelink.Player
+        player = cast(wavelink.Player, ctx.guild.voice_client)  # type: ignore
+
+        if not player:
+            player = await ctx.user.voice.channel.connect(cls=NODE_POOL.create_player)
+            player.home = ctx.channel.id
+
+        if not await self.check_channel_condition(ctx, player):
+            return None
+
+        return player
+
+    @serialized("history")
+    async def history(self, ctx: discord.ApplicationContext) -> None:
+        """Shows the latest played tracks of the guild"""
+
+        entries = await HISTORY.recent(ctx.guild.id)
+        if not entries:
+            return await self.respond(
+                ctx,
+                embed=await self.create_embed.one_line_embed("Inget har spelats än!")
+            )
+
+        await self.respond(ctx, embed=await self.create_embed.history(entries))
+
+    @serialized("replay")
+    async def replay(self, ctx: discord.ApplicationContext, position: int = 1) -> None:
+        """Queues a track from the guild's history without searching for it"""
+
+        entries = await HISTORY.recent(ctx.guild.id, max(position, 1))
+        if not 1 <= position <= len(entries):
+            return await self.respond(
+                ctx,
+                embed=await self.create_embed.one_line_embed("Ogiltig plats i historiken!")
+            )
+
+        player = await self.join(ctx)
+        if not player:
+            return
+
+        track = entries[position - 1][1]
+        track.requester_id = ctx.user.id
+        player.queue.put(track)
+        await self.respond(
+            ctx,
+            embed=await self.create_embed.song_added(track, len(player.queue), ctx.user, player)
+        )
+
+        if not player.playing and player.queue:
+            TRACER.expect_track_start(player.guild.id)
             await player.play(player.queue.get(), volume=30)
 
         player.autoplay = wavelink.AutoPlayMode.partial
+        QUEUE_STORE.mark(player)
+
+    async def ingest_playlist(
+        self,
+        ctx: discord.ApplicationContext,
+        query: str,
+        playlist: wavelink.Playlist,
+        played: int,
+        player: wavelink.Player,
+        previous: Optional[asyncio.Task] = None
+    ) -> None:
+        """Adds a playlist in the background, failures are logged and told to the user"""
+
+        try:
+            await self.queue_playlist(ctx, query, playlist, played, player, previous)
+        except Exception as e:
+            print(f"Exception occured when adding playlist in guild {player.guild.id}: {e}")
+            try:
+                await self.respond(
+                    ctx,
+                    embed=await self.create_embed.one_line_embed("Spellistan kunde inte läggas till!")
+                )
+            except Exception as e:
+                print(f"Exception occured when responding in guild {player.guild.id}: {e}")
+
+    async def queue_playlist(
+        self,
+        ctx: discord.ApplicationContext,
+        query: str,
+        playlist: wavelink.Playlist,
+        played: int,
+        player: wavelink.Player,
+        previous: Optional[asyncio.Task] = None
+    ) -> None:
+        """Queues a playlist in batches and summarizes it for the list added embed"""
+
+        WATCHDOG.label(f"ingest_playlist guild={player.guild.id}")
+        # Waits for an earlier playlist so the tracks keep their order
+        if previous:
+            await asyncio.wait([previous])
+
+        position = len(player.queue) + 1
+        playlist_duration = 0
+        authors = None
+
+        for start in range(0, len(playlist.tracks), INGEST_BATCH_SIZE):
+            batch = playlist.tracks[start:start + INGEST_BATCH_SIZE]
+
+            for track in batch:
+                track.extras = {"requester_id": ctx.user.id}
+                playlist_duration += track.length
+                if authors is None:
+                    authors = track.author
+                elif authors != track.author:
+                    authors = "Flera artister"
+
+            player.queue.put(batch[max(0, played - start):])
+            QUEUE_STORE.mark(player)
+
+            if not player.playing and player.queue:
+                # Behind the guild's commands, which may start, skip or clear meanwhile
+                await GUILD_EXECUTOR.submit(
+                    player.guild.id, "play_queued", lambda: self.play_queued(player), merge=True, force=True
+                )
 
+            # Yields to the event loop between batches
+            await asyncio.sleep(0)
+
+        await self.respond(
+            ctx,
+            embed=await self.create_embed.list_added(
+                query,
+                playlist.name,
+                position,
+                ctx.user,
+                len(playlist.tracks),
+                playlist_duration,
+                authors,
+                player
+            )
+        )
+
+    async def play_queued(self, player: wavelink.Player) -> None:
+        """Plays the next queued track if the player is still connected and idle"""
+
+        if player.connected and not player.playing and player.queue:
+            await player.play(player.queue.get(), volume=30)
+
+    def cancel_ingest(self, player: wavelink.Player) -> None:
+        """Stops queueing a playlist that is still being added"""
+
+        ingest: Optional[asyncio.Task] = getattr(player, "ingest", None)
+        if ingest and not ingest.done():
+            ingest.cancel()
+
+    @serialized("pause", merge=True)
     async def pause(self, ctx: discord.ApplicationContext) -> None:
         """Pauses the player"""
 
@@ -123,15 +619,18 @@ class MusicPlayer(commands.Cog):
             return
         
         if player.paused:
-            return await ctx.response.send_message(
+            return await self.respond(
+                ctx,
                 embed=await self.create_embed.one_line_embed("Redan pausad!")
             )
         else:
             await player.pause(True)
-            await ctx.response.send_message(
+            await self.respond(
+                ctx,
                 embed=await self.create_embed.pause_resume(player)
             )
 
+    @serialized("resume", merge=True)
     async def resume(self, ctx: discord.ApplicationContext) -> None:
         """Resumes the player"""
 
@@ -141,15 +640,18 @@ class MusicPlayer(commands.Cog):
             return
 
         if not player.paused:
-            return await ctx.response.send_message(
+            return await self.respond(
+                ctx,
                 embed=await self.create_embed.one_line_embed("Spelar redan!")
             )
         else:
             await player.pause(False)
-            await ctx.response.send_message(
+            await self.respond(
+                ctx,
                 embed=await self.create_embed.pause_resume(player)
             )
 
+    @serialized("skip", merge=True)
     async def skip(self, ctx: discord.ApplicationContext) -> None:
         """Skips the current song"""
 
@@ -159,20 +661,26 @@ class MusicPlayer(commands.Cog):
             return
 
         await player.skip()
-        await ctx.response.send_message(
+        QUEUE_STORE.mark(player)
+        await self.respond(
+            ctx,
             embed=await self.create_embed.one_line_embed("Låt skippad!")
         )
 
+    @serialized("shuffle")
     async def shuffle(self, ctx: discord.ApplicationContext) -> None:
         """Shuffles the queue"""
 
         player: wavelink.Player = cast(wavelink.Player, ctx.guild.voice_client)
         player.queue.shuffle()
-        
-        return await ctx.response.send_message(
+        QUEUE_STORE.mark(player)
+
+        return await self.respond(
+            ctx,
             embed=await self.create_embed.one_line_embed("Låtkön blandad!")
         )
     
+    @serialized("queue_show")
     async def queue_show(self, ctx: discord.ApplicationContext) -> None:
         """Shows the queue"""
 
@@ -181,11 +689,14 @@ class MusicPlayer(commands.Cog):
             return
 
         if not player.queue:
-            return await ctx.response.send_message(
+            return await self.respond(
+                ctx,
                 embed=await self.create_embed.one_line_embed("Finns ingen låtkö!")
             )
-        await self.create_embed.queue_show(ctx, player)
+        paginator = self.create_embed.queue_show(player, ctx.user.id)
+        await self.respond(ctx, paginator.render(), view=paginator)
 
+    @serialized("queue_clear", merge=True)
     async def queue_clear(self, ctx: discord.ApplicationContext) -> None:
         """Clears the queue"""
         
@@ -194,12 +705,97 @@ class MusicPlayer(commands.Cog):
         if not await self.check_channel_condition(ctx, player):
             return
         
+        self.cancel_ingest(player)
         player.queue.clear()
-        await ctx.response.send_message(
+        QUEUE_STORE.mark(player)
+        await self.respond(
+            ctx,
             embed=await self.create_embed.one_line_embed("Låtkön rensad!")
         )
-        await self.create_embed.reset_embeds()
+        await self.create_embed.reset_embeds(ctx.guild.id)
+
+    @serialized("queue_remove")
+    async def queue_remove(
+        self, ctx: discord.ApplicationContext, start: int, end: Optional[int] = None
+    ) -> None:
+        """Removes the tracks between two queue positions"""
+
+        player: wavelink.Player = cast(wavelink.Player, ctx.guild.voice_client)
 
+        if not await self.check_channel_condition(ctx, player):
+            return
+
+        end = end or start
+        if not 1 <= start <= end <= len(player.queue):
+            return await self.respond(
+                ctx,
+                embed=await self.create_embed.one_line_embed("Ogiltig plats i låtkön!")
+            )
+
+        removed = player.queue.remove_range(start - 1, end)
+        QUEUE_STORE.mark(player)
+        await self.respond(
+            ctx,
+            embed=await self.create_embed.one_line_embed(f"{removed} låtar borttagna!")
+        )
+
+    @serialized("queue_move")
+    async def queue_move(self, ctx: discord.ApplicationContext, position: int, to: int) -> None:
+        """Moves a track to another queue position"""
+
+        player: wavelink.Player = cast(wavelink.Player, ctx.guild.voice_client)
+
+        if not await self.check_channel_condition(ctx, player):
+            return
+
+        if not (1 <= position <= len(player.queue) and 1 <= to <= len(player.queue)):
+            return await self.respond(
+                ctx,
+                embed=await self.create_embed.one_line_embed("Ogiltig plats i låtkön!")
+            )
+
+        track = player.queue.move(position - 1, to - 1)
+        QUEUE_STORE.mark(player)
+        await self.respond(
+            ctx,
+            embed=await self.create_embed.one_line_embed(f"{track.title} flyttad till plats {to}!")
+        )
+
+    @serialized("queue_dedupe")
+    async def queue_dedupe(self, ctx: discord.ApplicationContext) -> None:
+        """Removes repeated tracks from the queue"""
+
+        player: wavelink.Player = cast(wavelink.Player, ctx.guild.voice_client)
+
+        if not await self.check_channel_condition(ctx, player):
+            return
+
+        removed = player.queue.dedupe()
+        QUEUE_STORE.mark(player)
+        await self.respond(
+            ctx,
+            embed=await self.create_embed.one_line_embed(f"{removed} dubbletter borttagna!")
+        )
+
+    @serialized("queue_remove_user")
+    async def queue_remove_user(self, ctx: discord.ApplicationContext, member: discord.Member) -> None:
+        """Removes every track requested by a member from the queue"""
+
+        player: wavelink.Player = cast(wavelink.Player, ctx.guild.voice_client)
+
+        if not await self.check_channel_condition(ctx, player):
+            return
+
+        removed = player.queue.remove_requester(member.id)
+        QUEUE_STORE.mark(player)
+        await self.respond(
+            ctx,
+            embed=await self.create_embed.one_line_embed(
+                f"{removed} låtar från {member.display_name} borttagna!"
+            )
+        )
+
+    @serialized("disconnect", merge=True)
     async def disconnect(self, ctx: discord.ApplicationContext) -> None:
         """Disconnects the player"""
 
@@ -208,13 +804,17 @@ class MusicPlayer(commands.Cog):
         if not await self.check_channel_condition(ctx, player):
             return
         
+        self.cancel_ingest(player)
         await player.disconnect()
-        await ctx.response.send_message(
+        QUEUE_STORE.forget(ctx.guild.id)
+        TRACK_GAPS.forget(ctx.guild.id)
+        await self.respond(
+            ctx,
             embed=await self.create_embed.one_line_embed(
                 f"{self.client.user.display_name} har bortkopplats!"
             )
         )
-        await self.create_embed.reset_embeds()
+        await self.create_embed.reset_embeds(ctx.guild.id)
 
     async def check_channel_condition(
             self, ctx: discord.ApplicationContext, player: wavelink.Player
@@ -222,63 +822,69 @@ class MusicPlayer(commands.Cog):
         """Returns error message if bot not in channel or not in same channel as user"""
 
         if not player:
-            await ctx.response.send_message(
+            await self.respond(
+                ctx,
                 embed=await self.create_embed.not_in_channel()
             )
             return False
         
         if player.channel != ctx.user.voice.channel:
-            await ctx.response.send_message(
+            await self.respond(
+                ctx,
                 embed=await self.create_embed.not_same_channel(player)
             )
             return False
         
         return True
-    
-    async def create_embeds(self, ctx: discord.ApplicationContext, tracks: list) -> None:
-            """Creates embeds to show when playing song"""  
-
-            if isinstance(tracks, wavelink.Playlist):
-                for track in tracks:
-                    await self.create_embed.now_playing(track, ctx.user)
-            else:
-                await self.create_embed.now_playing(tracks[0], ctx.user)
 
 
 class ButtonView(discord.ui.View):
-    """Button view for player functions"""
+    """Persistent button view for player functions, registered once at startup"""
 
-    def __init__(self, client: commands.Cog, timeout=300):
-        super().__init__(timeout=timeout)
+    def __init__(self, client: commands.Bot):
+        super().__init__(timeout=None)
         self.client = client
-        self.music_player = MusicPlayer(self.client)
+        EMBEDS.views.add(self)
+
+    @property
+    def music_player(self) -> MusicPlayer:
+        """Returns the loaded MusicPlayer cog"""
 
-    @discord.ui.button(emoji="▶️")
+        return self.client.get_cog("MusicPlayer")
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Names the task of a button press for the watchdog and records it"""
+
+        WATCHDOG.label(f"button {interaction.custom_id} guild={interaction.guild_id}")
+        RECORDER.command(interaction.custom_id.split(":")[1], interaction.guild_id, interaction.user.id)
+        return True
+
+    @discord.ui.button(emoji="▶️", custom_id="music_player:resume")
     async def resume(self, button: discord.ui.Button, ctx: discord.ApplicationContext) -> None:
         
         await self.music_player.resume(ctx)
 
-    @discord.ui.button(emoji="⏸️")
+    @discord.ui.button(emoji="⏸️", custom_id="music_player:pause")
     async def pause(self, button: discord.ui.Button, ctx: discord.ApplicationContext) -> None:
         
         await self.music_player.pause(ctx)
 
-    @discord.ui.button(emoji="⏭️")
+    @discord.ui.button(emoji="⏭️", custom_id="music_player:skip")
     async def skip(self, button: discord.ui.Button, ctx: discord.ApplicationContext) -> None:
 
         await self.music_player.skip(ctx)
 
-    @discord.ui.button(emoji="⏹️", row=1)
+    @discord.ui.button(emoji="⏹️", row=1, custom_id="music_player:queue_clear")
     async def queue_clear(self, button: discord.ui.Button, ctx: discord.ApplicationContext) -> None:
 
         await self.music_player.queue_clear(ctx)
 
-    @discord.ui.button(emoji="🔀", row=1)
+    @discord.ui.button(emoji="🔀", row=1, custom_id="music_player:shuffle")
     async def shuffle(self, button: discord.ui.Button, ctx: discord.ApplicationContext) -> None:
 
         await self.music_player.shuffle(ctx)
 
-    @discord.ui.button(emoji="🔽", row=1)
+    @discord.ui.button(emoji="🔽", row=1, custom_id="music_player:queue_show")
     async def queue_show(self, button: discord.ui.Button, ctx: discord.ApplicationContext) -> None:
 
         await self.music_player.queue_show(ctx)
@@ -287,4 +893,9 @@ class ButtonView(discord.ui.View):
 def setup(client: commands.Bot) -> None:
     """Setup the cog"""
 
-    client.add_cog(MusicPlayer(client))
+    music_player = MusicPlayer(client)
+    client.add_cog(music_player)
+
+    # Registered once, handles the buttons of every now playing message and survives restarts
+    music_player.button_view = ButtonView(client)
+    client.add_view(music_player.button_view)
@@ -0,0 +1,158 @@
+import asyncio
+import signal
+import time
+
+import discord
+from discord.ext import commands
+
+import wavelink
+
+from typing import Dict, List, Optional, Tuple
+
+# Dependencies first: MusicPlayer creates a CreateEmbed, MusicCommands calls MusicPlayer
+RELOAD_ORDER = ("cogs.CreateEmbed", "cogs.MusicPlayer", "cogs.MusicCommands")
+
+
+class Reload(commands.Cog):
+    """Reloads the music cogs without dropping voice connections or queues
+
+    Players, queues, the Lavalink pool and the stored messages live in the
+    utils modules, which are not reloaded, so only the cog code is swapped.
+    After a reload it checks that every player still plays the same track with
+    the same queue, and that the MusicPlayer cog and its persistent button view
+    were registered again.
+    """
+
+    def __init__(self, client: commands.Bot):
+        """Initiates the Reload Class"""
+
+        self.client = client
+        self._lock = asyncio.Lock()
+
+    @commands.Cog.listener()
+    async def on_ready(self) -> None:
+        """Reloads on SIGHUP where signals are supported"""
+
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP, lambda: asyncio.create_task(self.reload_cogs())
+            )
+        except (AttributeError, NotImplementedError):
+            pass
+
+        print("Reload.py is ready!")
+
+    def snapshot(self) -> Dict[int, Tuple[wavelink.Player, Optional[str], int]]:
+        """Returns each connected player with its current track and the length of its queue"""
+
+        return {
+            player.guild.id: (
+                player,
+                player.current.identifier if player.current else None,
+                len(player.queue)
+            )
+            for player in self.client.voice_clients
+            if player.connected
+        }
+
+    def unregistered(self, old_cog: Optional[commands.Cog]) -> List[str]:
+        """Returns the parts of the music player that were not registered again"""
+
+        cog = self.client.get_cog("MusicPlayer")
+        if cog is None or cog is old_cog:
+            return ["MusicPlayer"]
+
+        view = getattr(cog, "button_view", None)
+        if view is None or view not in self.client.persistent_views:
+            return ["ButtonView"]
+        return []
+
+    @staticmethod
+    def changes(before: Tuple, after: Optional[Tuple]) -> Optional[str]:
+        """Describes what a player lost in a reload, None when it was carried over"""
+
+        if after is None or after[0] is not before[0]:
+            return "disconnected"
+        if after[1] != before[1]:
+            return f"current track {before[1]} is now {after[1]}"
+        if after[2] != before[2]:
+            return f"queue of {before[2]} tracks is now {after[2]}"
+        return None
+
+    async def reload_cogs(self) -> Tuple[float, List[str], List[int]]:
+        """Reloads the music cogs in order, returns the time, failed cogs and lost players"""
+
+        async with self._lock:
+            start = time.perf_counter()
+            players = self.snapshot()
+            old_cog = self.client.get_cog("MusicPlayer")
+
+            failed = []
+            for name in RELOAD_ORDER:
+                try:
+                    self.client.reload_extension(name)
+                except Exception as e:
+                    failed.append(name)
+                    print(f"Exception occured when reloading {name}: {e}")
+            missing = self.unregistered(old_cog)
+
+            after = self.snapshot()
+            lost = {}
+            for guild_id, state in players.items():
+                change = self.changes(state, after.get(guild_id))
+                if change:
+                    lost[guild_id] = change
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"Reloaded {len(RELOAD_ORDER) - len(failed)}/{len(RELOAD_ORDER)} cogs in {elapsed * 1000:.0f} ms, "
+                f"{len(players) - len(lost)}/{len(players)} players carried over with their track and queue"
+            )
+            for name in missing:
+                print(f"{name} was not registered again")
+            for guild_id, change in lost.items():
+                print(f"Player in guild {guild_id} was not carried over: {change}")
+
+        try:
+            await self.client.sync_commands()
+        except Exception as e:
+            print(f"Exception occured when syncing commands after reload: {e}")
+
+        return elapsed, failed + missing, list(lost)
+
+    @discord.command(name="reload", description="Laddar om musikkoden utan att koppla bort spelarna.")
+    async def reload(self, ctx: discord.ApplicationContext) -> None:
+        """Reloads the music cogs, only for the owner of the bot"""
+
+        if not await self.client.is_owner(ctx.user):
+            return await ctx.respond(
+                embed=discord.Embed(
+                    title="Bara ägaren kan ladda om botten!",
+                    colour=discord.Colour.dark_purple()
+                ),
+                ephemeral=True
+            )
+
+        await ctx.defer(ephemeral=True)
+        elapsed, failed, lost = await self.reload_cogs()
+
+        description = f"Spelare kvar: {len(self.client.voice_clients)}"
+        if failed:
+            description += f"\nMisslyckades: {', '.join(failed)}"
+        if lost:
+            description += f"\nTappade spelare: {len(lost)}"
+
+        await ctx.respond(
+            embed=discord.Embed(
+                title=f"Omladdad på {elapsed * 1000:.0f} ms",
+                description=description,
+                colour=discord.Colour.dark_purple()
+            ),
+            ephemeral=True
+        )
+
+
+def setup(client: commands.Bot) -> None:
+    """Setup the cog"""
+
+    client.add_cog(Reload(client))
@@ -0,0 +1,163 @@
+import json
+import subprocess
+import sys
+import time
+
+from typing import Dict, List, Optional
+
+from utils.Shards import parse_shard_ids
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 1))
+SHARD_RANGE = os.getenv("SHARD_RANGE", f"0-{SHARD_COUNT - 1}")
+PROCESSES = int(os.getenv("PROCESSES", os.cpu_count() or 1))
+HEALTH_DIR = os.getenv("HEALTH_DIR", "./health")
+HEALTH_INTERVAL = float(os.getenv("HEALTH_INTERVAL", 10))
+HEALTH_TIMEOUT = float(os.getenv("HEALTH_TIMEOUT", 60))
+STARTUP_TIMEOUT = float(os.getenv("STARTUP_TIMEOUT", 300))
+METRICS_PORT = os.getenv("METRICS_PORT")
+WATCHDOG_LOG = os.getenv("WATCHDOG_LOG", "watchdog.log")
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+RECORD_FILE = os.getenv("RECORD_FILE")
+
+
+def worker_path(path: Optional[str], index: int) -> Optional[str]:
+    """Returns a file of one worker, "traces.jsonl" becomes "traces-1.jsonl" """
+
+    if not path:
+        return path
+
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition(".")
+    return os.path.join(directory, f"{stem}-{index}{dot}{extension}")
+
+
+class Worker:
+    """One bot process running a range of shards"""
+
+    def __init__(self, index: int, shard_ids: List[int]):
+        """Initiates the Worker Class"""
+
+        self.index = index
+        self.shard_ids = shard_ids
+        self.health_file = os.path.join(HEALTH_DIR, f"worker-{index}.json")
+        self.process: Optional[subprocess.Popen] = None
+        self.started = 0.0
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Starts main.py for the shards of this worker"""
+
+        env = dict(
+            os.environ,
+            SHARD_COUNT=str(SHARD_COUNT),
+            SHARD_IDS=",".join(str(shard_id) for shard_id in self.shard_ids),
+            HEALTH_FILE=self.health_file,
+            HEALTH_INTERVAL=str(HEALTH_INTERVAL),
+            # Each process writes its own files and serves metrics on its own port
+            WATCHDOG_LOG=worker_path(WATCHDOG_LOG, self.index),
+            TRACE_FILE=worker_path(TRACE_FILE, self.index),
+        )
+        if RECORD_FILE:
+            env["RECORD_FILE"] = worker_path(RECORD_FILE, self.index)
+        if METRICS_PORT:
+            env["METRICS_PORT"] = str(int(METRICS_PORT) + self.index)
+        if os.path.exists(self.health_file):
+            os.remove(self.health_file)
+
+        self.process = subprocess.Popen([sys.executable, "main.py"], env=env)
+        self.started = time.time()
+        print(f"Started worker {self.index} (pid {self.process.pid}) for shards {self.shard_ids}")
+
+    def stop(self) -> None:
+        """Stops the process of this worker"""
+
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def health(self) -> Optional[Dict]:
+        """Returns the last health report of this worker"""
+
+        try:
+            with open(self.health_file) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def is_healthy(self) -> bool:
+        """Checks that the worker is running and has reported recently"""
+
+        if self.process is None or self.process.poll() is not None:
+            return False
+
+        health = self.health()
+        if health is None:
+            return time.time() - self.started < STARTUP_TIMEOUT
+        return time.time() - health["time"] < HEALTH_TIMEOUT
+
+
+def split_shards(shard_ids: List[int], processes: int) -> List[List[int]]:
+    """Splits shard ids in contiguous ranges over the processes"""
+
+    processes = max(1, min(processes, len(shard_ids)))
+    size, rest = divmod(len(shard_ids), processes)
+
+    ranges = []
+    start = 0
+    for i in range(processes):
+        end = start + size + (1 if i < rest else 0)
+        ranges.append(shard_ids[start:end])
+        start = end
+    return ranges
+
+
+def supervise(workers: List[Worker]) -> None:
+    """Restarts dead or unresponsive workers and prints their health"""
+
+    while True:
+        time.sleep(HEALTH_INTERVAL)
+
+        for worker in workers:
+            if not worker.is_healthy():
+                print(f"Worker {worker.index} is not healthy, restarting")
+                worker.stop()
+                worker.restarts += 1
+                worker.start()
+                continue
+
+            health = worker.health()
+            if health:
+                print(
+                    f"Worker {worker.index}: shards {worker.shard_ids}, "
+                    f"guilds {health['guilds']}, voice {health['voice_clients']}, "
+                    f"latency {health['latency'] * 1000:.0f} ms, restarts {worker.restarts}"
+                )
+
+
+def main():
+    """Starts one worker per shard range and supervises them"""
+
+    shard_ids = parse_shard_ids(SHARD_RANGE)
+    os.makedirs(HEALTH_DIR, exist_ok=True)
+    workers = [
+        Worker(index, ids) for index, ids in enumerate(split_shards(shard_ids, PROCESSES))
+    ]
+    for worker in workers:
+        worker.start()
+
+    try:
+        supervise(workers)
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    main()
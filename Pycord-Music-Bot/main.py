@@ -1,33 +1,96 @@
+import time
+
+STARTED = time.perf_counter()
+
 import asyncio
+import json
 
 import discord
 from discord.ext import commands
 
+from utils.AudioService import AUDIO
+from utils.Resources import rss_mb
+from utils.Shards import parse_shard_ids
+from utils.Watchdog import WATCHDOG
+
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 GUILD = os.getenv("DISCORD_GUILD")
+SHARD_COUNT = os.getenv("SHARD_COUNT")
+SHARD_IDS = os.getenv("SHARD_IDS")
+HEALTH_FILE = os.getenv("HEALTH_FILE")
+HEALTH_INTERVAL = float(os.getenv("HEALTH_INTERVAL", 10))
+STARTUP_PROFILE = os.getenv("STARTUP_PROFILE", "full")
+
+
+def bot_options(profile: str) -> dict:
+    """Returns the intents and cache options for a startup profile"""
+
+    if profile == "minimal":
+        # Only what the music cogs read, slash commands need no intent
+        intents = discord.Intents.none()
+        intents.guilds = True
+        intents.voice_states = True
+
+        # Members in voice channels are still cached for channel.members
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+
+        return {
+            "intents": intents,
+            "member_cache_flags": member_cache_flags,
+            "chunk_guilds_at_startup": False,
+        }
+
+    return {"intents": discord.Intents.all()}
 
-client = commands.Bot(command_prefix="!", intents=discord.Intents.all())
+
+if SHARD_COUNT:
+    client = commands.AutoShardedBot(
+        command_prefix="!",
+        shard_count=int(SHARD_COUNT),
+        shard_ids=parse_shard_ids(SHARD_IDS),
+        **bot_options(STARTUP_PROFILE),
+    )
+else:
+    client = commands.Bot(command_prefix="!", **bot_options(STARTUP_PROFILE))
 discord.Intents.message_content = True
+startup_reported = False
 
 
 @client.event
 async def on_ready():
     """Prints user/guild names and ids and syncs all commands when bot is ready"""
 
-    for guild in client.guilds:
-        if guild.name == GUILD:
-            break
+    AUDIO.mark("gateway ready")
+
+    global startup_reported
+    if not startup_reported:
+        startup_reported = True
+        print(
+            f"Startup profile {STARTUP_PROFILE}: ready in "
+            f"{time.perf_counter() - STARTED:.2f} s, resident memory {rss_mb():.1f} MB, "
+            f"{len(client.guilds)} guilds, {len(client.users)} cached users"
+        )
+
+    guild = discord.utils.get(client.guilds, name=GUILD)
+    if guild is None:
+        print(
+            f"{client.user} is connected to {len(client.guilds)} guilds, "
+            f"shards: {getattr(client, 'shard_ids', None)}"
+        )
+        return
 
     print(
         f"{client.user} is connected to the following guild:\n"
         f"{guild.name}(id: {guild.id})"
     )
-    members = "\n - ".join([member.name for member in guild.members])
-    print(f"Guild Members:\n - {members}")
+    if STARTUP_PROFILE != "minimal":
+        members = "\n - ".join([member.name for member in guild.members])
+        print(f"Guild Members:\n - {members}")
 
 
 async def load():
@@ -38,12 +101,41 @@ async def load():
             client.load_extension(f"cogs.{filename[:-3]}")
 
 
+async def report_health():
+    """Writes shard health for the launcher to HEALTH_FILE periodically"""
+
+    await client.wait_until_ready()
+
+    while not client.is_closed():
+        health = {
+            "pid": os.getpid(),
+            "time": time.time(),
+            "shards": getattr(client, "shard_ids", None),
+            "guilds": len(client.guilds),
+            "voice_clients": len(client.voice_clients),
+            "latency": client.latency,
+        }
+        with open(HEALTH_FILE + ".tmp", "w") as file:
+            json.dump(health, file)
+        os.replace(HEALTH_FILE + ".tmp", HEALTH_FILE)
+
+        await asyncio.sleep(HEALTH_INTERVAL)
+
+
 async def main():
-    """Calls load and starts client"""
+    """Calls load, logs in and connects to Lavalink while connecting to the gateway"""
 
     async with client:
+        WATCHDOG.start()
         await load()
-        await client.start(TOKEN)
+        if HEALTH_FILE:
+            asyncio.create_task(report_health())
+
+        await client.login(TOKEN)
+        AUDIO.mark("login")
+        AUDIO.start(client, STARTED)
+        await client.connect()
 
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
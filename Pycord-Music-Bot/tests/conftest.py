@@ -0,0 +1,10 @@
+import os
+
+# The utils read their configuration when they are imported
+os.environ.setdefault("LAVALINK_KEY", "test")
+os.environ.setdefault("QUEUE_DB", ":memory:")
+os.environ.setdefault("HISTORY_DB", ":memory:")
+os.environ.setdefault("TRACE_SAMPLE_RATE", "0")
+os.environ.setdefault("RECORD_FILE", "")
+os.environ.setdefault("NODE_HEALTH_INTERVAL", "3600")
+os.environ.setdefault("OUTBOUND_COALESCE_WINDOW", "0")
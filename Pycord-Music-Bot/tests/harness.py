@@ -0,0 +1,54 @@
+import asyncio
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from benchmarks.fakes import FakeApi, FakeClient, FakeContext, FakeUser, FakeVoiceState
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("timed out")
+        await asyncio.sleep(0.01)
+
+
+class Harness:
+    """A MusicPlayer cog on one FakeLavalink node with one guild and one listener"""
+
+    async def start(self, monkeypatch) -> "Harness":
+        # The nodes of the pool are created when it is imported, which needs a running loop
+        from cogs import MusicPlayer as music_player
+        from utils.NodePool import NodePool
+
+        self.lavalink = FakeLavalink()
+        await self.lavalink.start()
+        self.pool = NodePool(self.lavalink.uri, "test", 3600)
+        monkeypatch.setattr(music_player, "NODE_POOL", self.pool)
+
+        self.client = FakeClient(FakeApi())
+        self.cog = music_player.MusicPlayer(self.client)
+        self.client.add_cog(self.cog)
+        await self.pool.connect(self.client)
+        await wait_for(lambda: self.pool.nodes[0].status is wavelink.NodeStatus.CONNECTED)
+
+        self.guild = self.client.add_guild()
+        self.user = FakeUser("Listener", self.guild)
+        self.user.voice = FakeVoiceState(self.guild.voice_channel)
+        self.guild.voice_channel.members.append(self.user)
+        return self
+
+    def ctx(self, command: str) -> FakeContext:
+        return FakeContext(self.client.api, self.guild, self.user, command)
+
+    async def settle(self) -> None:
+        await self.client.wait_for_events()
+        await asyncio.gather(*self.cog.now_playing_sends.values())
+        await self.client.wait_for_events()
+
+    async def stop(self) -> None:
+        # Ejected so the next test's searches do not go to a node of a closed loop
+        await self.pool.nodes[0].close(eject=True)
+        await self.client.wait_for_events()
+        await self.lavalink.stop()
@@ -0,0 +1,83 @@
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from utils import PrefixIndex as prefix_index
+from utils.Autocomplete import Autocomplete
+from utils.PrefixIndex import PrefixIndex
+
+LAVALINK = FakeLavalink()
+
+
+def test_search_matches_word_prefixes_newest_first():
+    index = PrefixIndex()
+    index.add("Blue Monday - New Order", "a")
+    index.add("Bluebird - Paul McCartney", "b")
+    index.add("Monday Morning - Fleetwood Mac", "c")
+
+    assert index.search("blu") == [("Bluebird - Paul McCartney", "b"), ("Blue Monday - New Order", "a")]
+    assert index.search("mon blue") == [("Blue Monday - New Order", "a")]
+    assert index.search("bluebrid") == [("Bluebird - Paul McCartney", "b")]
+
+
+def test_removed_entries_are_compacted_a_slice_at_a_time(monkeypatch):
+    monkeypatch.setattr(prefix_index, "COMPACT_STEP", 64)
+    index = PrefixIndex(100)
+    for i in range(5000):
+        index.add(f"song{i} common", str(i))
+
+    assert len(index) == 100
+    assert index.search("song4999") == [("song4999 common", "4999")]
+    assert index.search("song0") == []
+    assert [value for _, value in index.search("common", 3)] == ["4999", "4998", "4997"]
+
+    for i in range(5000, 20000):
+        index.add(f"song{i} common", str(i))
+    # Words of removed entries are dropped and the postings only keep recent entries
+    assert len(index._vocab) < 2000
+    assert len(index._postings["common"]) < 2000
+    assert all(word in index._postings for word in index._vocab)
+
+
+def test_replaced_entries_become_newest():
+    index = PrefixIndex()
+    index.add("First Song", "x")
+    index.add("Second Song", "y")
+    index.add("First Song", "x")
+
+    assert index.search("song") == [("First Song", "x"), ("Second Song", "y")]
+    assert len(index) == 2
+
+
+def test_playlist_queries_are_only_suggested_in_their_guild():
+    autocomplete = Autocomplete()
+    playlist = wavelink.Playlist({
+        "info": {"name": "Road Trip", "selectedTrack": -1},
+        "pluginInfo": {},
+        "tracks": [LAVALINK.make_track("playlist", i) for i in range(2)],
+    })
+    autocomplete.searched(1, "https://example.com/my-private-list?token=secret", playlist)
+
+    assert [choice.value for choice in autocomplete.suggest(1, "road")] == [
+        "https://example.com/my-private-list?token=secret"
+    ]
+    assert autocomplete.suggest(2, "road") == []
+
+
+def test_search_results_are_only_suggested_in_their_guild():
+    autocomplete = Autocomplete()
+    tracks = [wavelink.Playable(LAVALINK.make_track("road", i)) for i in range(8)]
+    autocomplete.searched(1, "road", tracks)
+
+    choices = autocomplete.suggest(1, "road")
+    assert [choice.value for choice in choices] == [track.uri for track in reversed(tracks[:5])]
+    assert autocomplete.suggest(2, "road") == []
+
+
+def test_played_tracks_are_suggested_before_search_results():
+    autocomplete = Autocomplete()
+    searched = wavelink.Playable(LAVALINK.make_track("road searched", 0))
+    played = wavelink.Playable(LAVALINK.make_track("road played", 0))
+    autocomplete.searched(1, "road", [searched])
+    autocomplete.played(1, played)
+
+    assert [choice.value for choice in autocomplete.suggest(1, "road")] == [played.uri, searched.uri]
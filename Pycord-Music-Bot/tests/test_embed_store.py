@@ -0,0 +1,175 @@
+import asyncio
+import gc
+import tracemalloc
+
+import discord
+
+from harness import Harness, wait_for
+from utils.EmbedStore import EmbedStore
+from utils.Resources import rss_mb
+
+
+def test_store_evicts_least_recently_used_over_cap():
+    store = EmbedStore(max_per_guild=3)
+    for key in "abc":
+        store.put(1, key, discord.Embed(title=key))
+
+    # Reading an embed keeps it over ones that were stored after it
+    assert store.get(1, "a").title == "a"
+    store.put(1, "d", discord.Embed(title="d"))
+
+    assert store.get(1, "b") is None
+    assert [store.get(1, key).title for key in "acd"] == ["a", "c", "d"]
+    assert len(store) == 3
+
+
+def test_store_caps_each_guild_separately():
+    store = EmbedStore(max_per_guild=2)
+    for guild_id in (1, 2):
+        for key in range(5):
+            store.put(guild_id, key, discord.Embed())
+
+    assert len(store) == 4
+    assert store.get(1, 4) is not None and store.get(2, 4) is not None
+    assert store.get(1, 0) is None
+
+
+def test_clear_releases_embeds_and_message():
+    store = EmbedStore()
+    store.put(1, "a", discord.Embed())
+    store.put(2, "a", discord.Embed())
+    store.set_message(1, 10, 20)
+
+    store.clear(1)
+
+    assert store.get(1, "a") is None and store.get_message(1) is None
+    assert store.get(2, "a") is not None
+
+
+async def playing(monkeypatch) -> Harness:
+    """Returns a harness whose guild has a now playing embed stored"""
+
+    from utils.EmbedStore import EMBEDS
+
+    harness = await Harness().start(monkeypatch)
+    await harness.cog.play(harness.ctx("play"), "song embeds")
+    await harness.cog.play(harness.ctx("play"), "song queued")
+    await harness.settle()
+    assert EMBEDS.get_message(harness.guild.id) is not None
+    return harness
+
+
+def released(guild_id: int) -> bool:
+    from utils.EmbedStore import EMBEDS
+
+    return guild_id not in EMBEDS._guilds and EMBEDS.get_message(guild_id) is None
+
+
+def test_queue_clear_releases_guild_embeds(monkeypatch):
+    async def run():
+        harness = await playing(monkeypatch)
+        await harness.cog.queue_clear(harness.ctx("queue_clear"))
+        assert released(harness.guild.id)
+        await harness.stop()
+
+    asyncio.run(run())
+
+
+def test_disconnect_releases_guild_embeds(monkeypatch):
+    async def run():
+        harness = await playing(monkeypatch)
+        await harness.cog.disconnect(harness.ctx("disconnect"))
+        assert released(harness.guild.id)
+        assert harness.guild.voice_client is None
+        await harness.stop()
+
+    asyncio.run(run())
+
+
+def test_inactive_player_releases_guild_embeds(monkeypatch):
+    async def run():
+        harness = await playing(monkeypatch)
+        await harness.cog.on_wavelink_inactive_player(harness.guild.voice_client)
+        assert released(harness.guild.id)
+        assert harness.guild.voice_client is None
+        await harness.stop()
+
+    asyncio.run(run())
+
+
+def test_queue_skip_cycles_do_not_grow_memory(monkeypatch):
+    async def cycles(harness: Harness, count: int) -> None:
+        from utils.HistoryStore import HISTORY
+
+        for i in range(count):
+            await harness.cog.play(harness.ctx("play"), f"song {i % 10}")
+            await harness.cog.play(harness.ctx("play"), f"song {(i + 1) % 10}")
+            await harness.cog.skip(harness.ctx("skip"))
+            await harness.cog.skip(harness.ctx("skip"))
+            await harness.settle()
+            await HISTORY.flush()
+
+    async def run():
+        from utils.EmbedStore import EMBEDS
+
+        harness = await Harness().start(monkeypatch)
+        # Fills the caches and the bounded histories before measuring
+        await cycles(harness, 100)
+
+        rss_before = rss_mb()
+        tracemalloc.start()
+        growth = []
+        for _ in range(2):
+            harness.client.event_latencies.clear()
+            gc.collect()
+            before = tracemalloc.get_traced_memory()[0]
+            await cycles(harness, 150)
+            harness.client.event_latencies.clear()
+            gc.collect()
+            growth.append(tracemalloc.get_traced_memory()[0] - before)
+        tracemalloc.stop()
+        print(
+            f"queue/skip cycles 100-250: {growth[0] / 1024:.1f} KiB, 250-400: {growth[1] / 1024:.1f} KiB traced, "
+            f"{rss_mb() - rss_before:.1f} MB rss"
+        )
+
+        # A track kept per cycle would be over 200 KiB per window
+        assert growth[1] < 96 * 1024
+        assert len(EMBEDS) <= EMBEDS.max_per_guild
+        await harness.stop()
+
+    asyncio.run(run())
+
+
+def test_now_playing_calls_and_live_views_are_counted(monkeypatch):
+    async def run():
+        from utils.EmbedStore import EMBEDS
+
+        harness = await Harness().start(monkeypatch)
+        tracks, calls = EMBEDS.tracks, EMBEDS.sent + EMBEDS.edited
+        for i in range(5):
+            await harness.cog.play(harness.ctx("play"), f"song {i}")
+        await harness.settle()
+        for _ in range(4):
+            await harness.cog.skip(harness.ctx("skip"))
+            await harness.settle()
+        # The last track start arrives from the node after the skip
+        await wait_for(lambda: EMBEDS.tracks - tracks == 5)
+        await harness.settle()
+
+        stats = EMBEDS.stats()
+        assert 1 <= stats["sent"] + stats["edited"] - calls <= 5
+        assert 0 < stats["api_calls_per_track"] <= 1
+
+        # Views count while they are alive, as the paginators of /queue show
+        gc.collect()
+        views = len(EMBEDS.views)
+        player = harness.guild.voice_client
+        paginators = [harness.cog.create_embed.queue_show(player, harness.user.id) for _ in range(3)]
+        assert EMBEDS.stats()["views"] == views + 3
+        del paginators
+        gc.collect()
+        assert EMBEDS.stats()["views"] == views
+        await harness.stop()
+
+    asyncio.run(run())
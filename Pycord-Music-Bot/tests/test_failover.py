@@ -0,0 +1,130 @@
+import asyncio
+
+from types import SimpleNamespace
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from benchmarks.fakes import FakeApi, FakeClient
+from harness import wait_for
+
+
+async def playing(monkeypatch) -> SimpleNamespace:
+    """Returns a pool of two nodes with a player on the first one, playing from 42 s with a queue"""
+
+    # The nodes of the pool are created when it is imported, which needs a running loop
+    from cogs import MusicPlayer as music_player
+    from utils.NodePool import NodePool
+
+    first, second = FakeLavalink(), FakeLavalink()
+    await first.start()
+    await second.start()
+
+    pool = NodePool(f"{first.uri},{second.uri}", "test", 3600)
+    monkeypatch.setattr(music_player, "NODE_POOL", pool)
+    client = FakeClient(FakeApi())
+    cog = music_player.MusicPlayer(client)
+    client.add_cog(cog)
+    await pool.connect(client)
+    await wait_for(lambda: all(node.status is wavelink.NodeStatus.CONNECTED for node in pool.nodes))
+
+    guild = client.add_guild()
+    player = await guild.voice_channel.connect(cls=pool.create_player)
+    player.home = guild.text_channel.id
+    assert player.node is pool.nodes[0]
+
+    tracks = [wavelink.Playable(first.make_track("failover", i)) for i in range(4)]
+    player.queue.put(tracks[1:])
+    await player.play(tracks[0], start=42_000, volume=40)
+    await wait_for(lambda: player.position >= 42_000)
+
+    return SimpleNamespace(
+        first=first, second=second, pool=pool, client=client, cog=cog, guild=guild, player=player, tracks=tracks
+    )
+
+
+async def stop(setup: SimpleNamespace) -> None:
+    # Ejected so the next test's searches do not go to a node of a closed loop
+    for node in setup.pool.nodes:
+        await node.close(eject=True)
+    await setup.client.wait_for_events()
+    await setup.first.stop()
+    await setup.second.stop()
+
+
+async def close_node(monkeypatch) -> None:
+    from utils.QueueStore import QUEUE_STORE
+
+    setup = await playing(monkeypatch)
+    first, second, pool, client, cog = setup.first, setup.second, setup.pool, setup.client, setup.cog
+    guild, player, tracks = setup.guild, setup.player, setup.tracks
+
+    # The state the store holds when the node goes away
+    QUEUE_STORE.mark(player)
+    await QUEUE_STORE.flush()
+
+    await pool.nodes[0].close()
+    await client.wait_for_events()
+    await asyncio.gather(*cog.now_playing_sends.values())
+
+    resumed = guild.voice_client
+    assert resumed is not None and resumed is not player
+    assert resumed.node is pool.nodes[1]
+    assert resumed.channel is guild.voice_channel
+    assert resumed.home == guild.text_channel.id
+    assert resumed.current.identifier == tracks[0].identifier
+    assert [record.identifier for record in resumed.queue] == [track.identifier for track in tracks[1:]]
+    assert resumed.volume == 40
+
+    stored = second.players[str(guild.id)]
+    assert stored["track"]["info"]["identifier"] == tracks[0].identifier
+    assert stored["state"]["position"] >= 42_000
+    assert str(guild.id) not in first.players
+
+    await stop(setup)
+
+
+def test_closed_node_players_resume_on_another_node(monkeypatch):
+    asyncio.run(close_node(monkeypatch))
+
+
+def test_unhealthy_node_players_move_in_their_guild_mailbox(monkeypatch):
+    async def run():
+        from utils.GuildExecutor import GUILD_EXECUTOR
+
+        setup = await playing(monkeypatch)
+        pool, player = setup.pool, setup.player
+
+        async def unreachable():
+            raise ConnectionError("unreachable")
+
+        monkeypatch.setattr(pool.nodes[0], "fetch_stats", unreachable)
+
+        # A command still running for the guild
+        release = asyncio.Event()
+        command = asyncio.create_task(GUILD_EXECUTOR.submit(setup.guild.id, "command", release.wait))
+        await asyncio.sleep(0)
+
+        await pool.check_health()
+        await asyncio.sleep(0.05)
+        assert pool.nodes[0].identifier in pool.unhealthy
+        assert player.node is pool.nodes[0]
+
+        release.set()
+        await command
+        await setup.client.wait_for_events()
+
+        # Switched live, the same player keeps its channel, track and position
+        assert setup.guild.voice_client is player
+        assert player.node is pool.nodes[1]
+        assert player.current.identifier == setup.tracks[0].identifier
+        assert len(player.queue) == 3
+        assert setup.second.players[str(setup.guild.id)]["state"]["position"] >= 42_000
+
+        # A later failed check finds nothing left to move
+        await pool.check_health()
+        await setup.client.wait_for_events()
+        assert player.node is pool.nodes[1]
+        await stop(setup)
+
+    asyncio.run(run())
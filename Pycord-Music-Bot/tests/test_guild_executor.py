@@ -0,0 +1,167 @@
+import asyncio
+
+from utils.GuildExecutor import MERGED, GuildBusy, GuildExecutor
+
+
+def recorder(ran: list, name: str, delay: float = 0.0):
+    async def job():
+        await asyncio.sleep(delay)
+        ran.append(name)
+        return name
+    return job
+
+
+def test_calls_of_a_guild_run_in_order():
+    async def run():
+        executor = GuildExecutor()
+        ran = []
+        results = await asyncio.gather(*(
+            executor.submit(1, "command", recorder(ran, i, 0.01 if i == 0 else 0.0)) for i in range(5)
+        ))
+
+        assert ran == list(range(5)) and results == list(range(5))
+        assert executor.stats()["guilds"] == 0
+
+    asyncio.run(run())
+
+
+def test_guilds_run_in_parallel():
+    async def run():
+        executor = GuildExecutor()
+        ran = []
+        await asyncio.gather(
+            executor.submit(1, "slow", recorder(ran, "slow", 0.05)),
+            executor.submit(2, "fast", recorder(ran, "fast")),
+        )
+
+        assert ran == ["fast", "slow"]
+
+    asyncio.run(run())
+
+
+def test_merges_into_the_last_pending_call():
+    async def run():
+        executor = GuildExecutor()
+        ran = []
+        results = await asyncio.gather(
+            executor.submit(1, "play", recorder(ran, "play", 0.01)),
+            executor.submit(1, "skip", recorder(ran, "skip#1"), merge=True),
+            executor.submit(1, "skip", recorder(ran, "skip#2"), merge=True),
+        )
+
+        assert ran == ["play", "skip#1"]
+        assert results[2] is MERGED and executor.merged == 1
+
+    asyncio.run(run())
+
+
+def test_does_not_merge_past_another_command():
+    async def run():
+        executor = GuildExecutor()
+        ran = []
+        results = await asyncio.gather(
+            executor.submit(1, "queue_clear", recorder(ran, "clear#1", 0.01), merge=True),
+            executor.submit(1, "queue_clear", recorder(ran, "clear#2"), merge=True),
+            executor.submit(1, "play", recorder(ran, "play X")),
+            executor.submit(1, "queue_clear", recorder(ran, "clear#3"), merge=True),
+        )
+
+        # The second clear joins the first, the last one must still run after the play
+        assert ran == ["clear#1", "play X", "clear#3"]
+        assert results[1] is MERGED and results[3] == "clear#3"
+
+    asyncio.run(run())
+
+
+def test_full_mailbox_rejects_unless_forced():
+    async def run():
+        executor = GuildExecutor(size=2)
+        ran = []
+        calls = [asyncio.create_task(executor.submit(1, "command", recorder(ran, 0, 0.05)))]
+        # Two calls wait behind the running one
+        await asyncio.sleep(0.01)
+        calls += [asyncio.create_task(executor.submit(1, "command", recorder(ran, i))) for i in (1, 2)]
+        await asyncio.sleep(0)
+
+        try:
+            await executor.submit(1, "command", recorder(ran, "rejected"))
+        except GuildBusy:
+            pass
+        else:
+            raise AssertionError("a full mailbox accepted a call")
+
+        forced = await executor.submit(1, "event", recorder(ran, "forced"), force=True)
+        await asyncio.gather(*calls)
+
+        assert forced == "forced" and "rejected" not in ran
+        assert executor.rejected == 1
+
+    asyncio.run(run())
+
+
+def test_failing_call_does_not_stop_the_guild():
+    async def run():
+        executor = GuildExecutor()
+        ran = []
+
+        async def broken():
+            raise RuntimeError("broken")
+
+        results = await asyncio.gather(
+            executor.submit(1, "broken", broken),
+            executor.submit(1, "command", recorder(ran, "after")),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[0], RuntimeError) and results[1] == "after"
+
+    asyncio.run(run())
+
+
+def test_cancelled_call_does_not_hang_the_guild():
+    async def run():
+        executor = GuildExecutor()
+        ran = []
+
+        async def cancelled():
+            raise asyncio.CancelledError()
+
+        results = await asyncio.wait_for(asyncio.gather(
+            executor.submit(1, "cancelled", cancelled),
+            executor.submit(1, "command", recorder(ran, "after")),
+            return_exceptions=True,
+        ), 1)
+
+        assert isinstance(results[0], asyncio.CancelledError) and results[1] == "after"
+        assert executor.pending(1) == 0
+
+    asyncio.run(run())
+
+
+def cancelled_worker(started: bool):
+    async def run():
+        executor = GuildExecutor()
+        ran = []
+        calls = [
+            asyncio.create_task(executor.submit(1, "slow", recorder(ran, "slow", 1))),
+            asyncio.create_task(executor.submit(1, "command", recorder(ran, "queued"))),
+        ]
+        await asyncio.sleep(0.01 if started else 0)
+
+        executor._mailboxes[1].worker.cancel()
+        results = await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 1)
+
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+        assert executor.pending(1) == 0
+        # The guild takes calls again
+        assert await asyncio.wait_for(executor.submit(1, "command", recorder(ran, "later")), 1) == "later"
+
+    asyncio.run(run())
+
+
+def test_cancelled_worker_cancels_pending_calls():
+    cancelled_worker(started=True)
+
+
+def test_worker_cancelled_before_it_started_cancels_pending_calls():
+    cancelled_worker(started=False)
@@ -0,0 +1,25 @@
+import os
+
+from launcher import split_shards, worker_path
+from utils.Shards import parse_shard_ids
+
+
+def test_parse_shard_ids():
+    assert parse_shard_ids("0-3") == [0, 1, 2, 3]
+    assert parse_shard_ids("0,2,5-6") == [0, 2, 5, 6]
+    assert parse_shard_ids("") is None
+
+
+def test_split_shards_covers_every_shard_once():
+    ranges = split_shards(list(range(10)), 3)
+
+    assert ranges == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert split_shards([0, 1], 8) == [[0], [1]]
+
+
+def test_worker_path_is_unique_per_worker():
+    assert worker_path("traces.jsonl", 1) == "traces-1.jsonl"
+    assert worker_path("watchdog.log", 0) == "watchdog-0.log"
+    assert worker_path(os.path.join("logs", "recording.jsonl.gz"), 2) == os.path.join("logs", "recording-2.jsonl.gz")
+    assert worker_path("", 1) == ""
+    assert worker_path(None, 1) is None
@@ -0,0 +1,155 @@
+import asyncio
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from utils.MusicQueue import HISTORY_SIZE, MusicQueue, QueuedTrack
+
+LAVALINK = FakeLavalink()
+
+
+def playable(index: int, requester_id: int = None) -> wavelink.Playable:
+    track = wavelink.Playable(LAVALINK.make_track("test", index))
+    if requester_id is not None:
+        track.extras = {"requester_id": requester_id}
+    return track
+
+
+def playlist(size: int) -> wavelink.Playlist:
+    return wavelink.Playlist({
+        "info": {"name": "Test", "selectedTrack": -1},
+        "pluginInfo": {},
+        "tracks": [LAVALINK.make_track("playlist", i) for i in range(size)],
+    })
+
+
+def test_put_record():
+    queue = MusicQueue()
+    record = QueuedTrack.from_playable(playable(0))
+
+    assert queue.put(record) == 1
+    assert queue.get().identifier == record.identifier
+
+
+def test_put_track_is_stored_as_record():
+    queue = MusicQueue()
+    queue.put(playable(0, requester_id=7))
+
+    assert isinstance(queue[0], QueuedTrack)
+    track = queue.get()
+    assert isinstance(track, wavelink.Playable)
+    assert track.identifier == playable(0).identifier
+    assert track.extras.requester_id == 7
+
+
+def test_put_list():
+    queue = MusicQueue()
+    assert queue.put([playable(i) for i in range(3)]) == 3
+    assert all(isinstance(record, QueuedTrack) for record in queue)
+
+
+def test_put_playlist():
+    queue = MusicQueue()
+    assert queue.put(playlist(5)) == 5
+    assert [queue.get().title for _ in range(5)] == [f"playlist - track {i}" for i in range(5)]
+
+
+def test_put_wait():
+    queue = MusicQueue()
+    asyncio.run(queue.put_wait(playable(0)))
+    asyncio.run(queue.put_wait(playlist(2)))
+    assert len(queue) == 3
+
+
+def test_put_rejects_other_objects():
+    queue = MusicQueue()
+    try:
+        queue.put("not a track")
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("a string was accepted")
+    assert len(queue) == 0
+
+
+def test_history_keeps_latest_tracks():
+    queue = MusicQueue()
+    for i in range(HISTORY_SIZE + 10):
+        queue.history.put(playable(i))
+
+    assert len(queue.history) == HISTORY_SIZE
+    assert queue.history[0].identifier == playable(10).identifier
+    assert queue.history[-1].identifier == playable(HISTORY_SIZE + 9).identifier
+
+
+def identifiers(queue: MusicQueue) -> list:
+    return [record.identifier for record in queue]
+
+
+def numbered(size: int, requesters: int = 3) -> MusicQueue:
+    queue = MusicQueue()
+    queue.put([playable(i, requester_id=i % requesters) for i in range(size)])
+    return queue
+
+
+def test_remove_range():
+    queue = numbered(10)
+    expected = identifiers(queue)
+
+    assert queue.remove_range(2, 5) == 3
+    del expected[2:5]
+    assert identifiers(queue) == expected
+
+
+def test_remove_range_clamps_to_queue():
+    queue = numbered(5)
+
+    assert queue.remove_range(3, 100) == 2
+    assert queue.remove_range(-4, 1) == 1
+    assert queue.remove_range(2, 2) == 0
+    assert queue.remove_range(7, 9) == 0
+    assert len(queue) == 2
+
+
+def test_move():
+    queue = numbered(5)
+    expected = identifiers(queue)
+
+    moved = queue.move(0, 4)
+    assert moved.identifier == expected[0]
+    assert identifiers(queue) == expected[1:] + expected[:1]
+
+    queue.move(4, 1)
+    assert identifiers(queue) == [expected[1], expected[0], *expected[2:]]
+
+
+def test_move_out_of_range_keeps_queue():
+    queue = numbered(3)
+    expected = identifiers(queue)
+
+    try:
+        queue.move(5, 0)
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("moved a track that is not queued")
+    assert identifiers(queue) == expected
+
+
+def test_dedupe_keeps_first_of_each_track():
+    queue = MusicQueue()
+    queue.put([playable(i) for i in (0, 1, 0, 2, 1, 1, 3)])
+
+    assert queue.dedupe() == 3
+    assert identifiers(queue) == [playable(i).identifier for i in (0, 1, 2, 3)]
+    assert queue.dedupe() == 0
+
+
+def test_remove_requester():
+    queue = numbered(9)
+    queue.put(playable(20))
+
+    assert queue.remove_requester(1) == 3
+    assert all(record.requester_id != 1 for record in queue)
+    assert len(queue) == 7
+    assert queue.remove_requester(1) == 0
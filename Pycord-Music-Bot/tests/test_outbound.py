@@ -0,0 +1,163 @@
+import asyncio
+
+from benchmarks.fakes import FakeApi, FakeClient
+from utils.Outbound import INFO, INTERACTION, NOW_PLAYING, OutboundScheduler
+
+
+def test_higher_priority_calls_are_sent_first():
+    async def run():
+        scheduler = OutboundScheduler(coalesce_window=0)
+        sent = []
+        gate = asyncio.Event()
+
+        async def call(name: str) -> str:
+            if name == "first":
+                await gate.wait()
+            sent.append(name)
+            return name
+
+        first = asyncio.create_task(scheduler.send(1, lambda: call("first"), INFO))
+        await asyncio.sleep(0)
+
+        # Queued while the first call is being sent
+        queued = [
+            asyncio.create_task(scheduler.send(1, lambda name=name: call(name), priority))
+            for name, priority in (("info", INFO), ("now_playing", NOW_PLAYING), ("reply", INTERACTION))
+        ]
+        await asyncio.sleep(0)
+        gate.set()
+
+        assert await first == "first"
+        assert [await task for task in queued] == ["info", "now_playing", "reply"]
+        # The reply does not wait for the channel
+        assert sent == ["reply", "first", "now_playing", "info"]
+        assert scheduler.stats()["queue_depth"] == 0
+
+    asyncio.run(run())
+
+
+def test_interaction_reply_does_not_wait_behind_a_slow_post():
+    async def run():
+        scheduler = OutboundScheduler(coalesce_window=0)
+        gate = asyncio.Event()
+        replied = asyncio.Event()
+
+        async def slow_post():
+            await gate.wait()
+
+        async def defer():
+            replied.set()
+
+        post = asyncio.create_task(scheduler.send(1, slow_post, INFO))
+        await asyncio.sleep(0)
+        await asyncio.wait_for(scheduler.send(1, defer, INTERACTION), 0.1)
+
+        assert replied.is_set() and not post.done()
+        gate.set()
+        await post
+        assert scheduler.sent == 2
+
+    asyncio.run(run())
+
+
+def test_keyed_calls_within_the_window_are_merged():
+    async def run():
+        scheduler = OutboundScheduler(coalesce_window=0.05)
+        api = FakeApi()
+        channel = FakeClient(api).add_guild().text_channel
+        contents = []
+
+        async def post(content: int):
+            contents.append(content)
+            return await channel.send(content=content)
+
+        results = await asyncio.gather(*(
+            scheduler.send(channel.id, lambda i=i: post(i), NOW_PLAYING, key="now_playing")
+            for i in range(5)
+        ))
+
+        assert contents == [4]
+        assert api.calls["channel_send"] == 1
+        assert all(result is results[0] for result in results)
+        assert scheduler.merged == 4 and scheduler.sent == 1
+
+    asyncio.run(run())
+
+
+def test_unkeyed_calls_are_not_merged():
+    async def run():
+        scheduler = OutboundScheduler(coalesce_window=0.05)
+        api = FakeApi()
+        channel = FakeClient(api).add_guild().text_channel
+
+        await asyncio.gather(*(scheduler.send(channel.id, lambda: channel.send(), INFO) for _ in range(3)))
+
+        assert api.calls["channel_send"] == 3
+        assert scheduler.merged == 0
+
+    asyncio.run(run())
+
+
+def test_rate_limited_call_is_retried_after_retry_after():
+    async def run():
+        scheduler = OutboundScheduler(coalesce_window=0)
+        api = FakeApi(limit=1, per=0.1)
+        channel = FakeClient(api).add_guild().text_channel
+
+        start = asyncio.get_running_loop().time()
+        await asyncio.gather(*(scheduler.send(channel.id, lambda: channel.send(), INFO) for _ in range(2)))
+        elapsed = asyncio.get_running_loop().time() - start
+
+        assert api.rate_limited["channel_send"] == 1
+        assert api.calls["channel_send"] == 2
+        assert scheduler.rate_limited == 1 and scheduler.failed == 0 and scheduler.sent == 2
+        # The retry waited for the window instead of the default second
+        assert 0.05 < elapsed < 0.5
+
+    asyncio.run(run())
+
+
+def test_rate_limited_channel_does_not_hold_up_other_channels():
+    async def run():
+        scheduler = OutboundScheduler(coalesce_window=0)
+        api = FakeApi(limit=1, per=0.2)
+        client = FakeClient(api)
+        limited = client.add_guild().text_channel
+        await limited.send()
+
+        retried = asyncio.create_task(scheduler.send(limited.id, lambda: limited.send(), INFO))
+        await asyncio.sleep(0.01)
+
+        start = asyncio.get_running_loop().time()
+        await scheduler.send(2, lambda: asyncio.sleep(0), INFO)
+        await scheduler.send(limited.id, lambda: asyncio.sleep(0), INTERACTION)
+        assert asyncio.get_running_loop().time() - start < 0.05
+        assert not retried.done()
+
+        await retried
+        assert scheduler.rate_limited == 1 and scheduler.failed == 0
+
+    asyncio.run(run())
+
+
+def test_call_rate_limited_twice_fails():
+    async def run():
+        scheduler = OutboundScheduler(coalesce_window=0)
+        api = FakeApi(limit=1, per=0.1)
+        channel = FakeClient(api).add_guild().text_channel
+
+        async def post_twice():
+            # The retry is rate limited again
+            await channel.send()
+            await channel.send()
+
+        await channel.send()
+        try:
+            await scheduler.send(channel.id, post_twice, INFO)
+        except Exception as e:
+            assert e.status == 429
+        else:
+            raise AssertionError("the second rate limit was not raised")
+        assert scheduler.rate_limited == 1 and scheduler.failed == 1
+
+    asyncio.run(run())
@@ -0,0 +1,65 @@
+import asyncio
+
+from harness import Harness
+
+
+def playlist(harness: Harness, size: int) -> str:
+    return f"https://benchmark.local/playlist-{size}-{harness.guild.id}"
+
+
+def test_playlist_starts_playing_and_is_queued_in_order(monkeypatch):
+    async def run():
+        harness = await Harness().start(monkeypatch)
+        await harness.cog.play(harness.ctx("play"), playlist(harness, 450))
+        player = harness.guild.voice_client
+
+        # The first track plays before the rest of the playlist is queued
+        assert player.current.title.endswith("track 0")
+        await player.ingest
+        await harness.settle()
+
+        assert [record.title.rsplit(" ", 1)[1] for record in player.queue] == [str(i) for i in range(1, 450)]
+        assert harness.client.api.calls["followup_send"] == 1
+        await harness.stop()
+
+    asyncio.run(run())
+
+
+def test_failed_ingest_is_logged_and_answered(monkeypatch, capsys):
+    async def run():
+        harness = await Harness().start(monkeypatch)
+
+        async def broken(*args, **kwargs):
+            raise RuntimeError("broken embed")
+
+        monkeypatch.setattr(harness.cog.create_embed, "list_added", broken)
+        await harness.cog.play(harness.ctx("play"), playlist(harness, 3))
+        player = harness.guild.voice_client
+        await asyncio.wait([player.ingest])
+        await harness.settle()
+
+        assert player.ingest.exception() is None
+        assert "Exception occured when adding playlist" in capsys.readouterr().out
+        # The defer is followed up with the error instead of being left unanswered
+        assert harness.client.api.calls["followup_send"] == 1
+        await harness.stop()
+
+    asyncio.run(run())
+
+
+def test_queued_track_is_not_started_after_disconnect(monkeypatch):
+    async def run():
+        harness = await Harness().start(monkeypatch)
+        await harness.cog.play(harness.ctx("play"), playlist(harness, 3))
+        player = harness.guild.voice_client
+        await player.ingest
+        await harness.cog.disconnect(harness.ctx("disconnect"))
+        requests = harness.lavalink.requests
+
+        await harness.cog.play_queued(player)
+
+        assert harness.lavalink.requests == requests
+        assert harness.guild.voice_client is None
+        await harness.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,64 @@
+import asyncio
+
+from types import SimpleNamespace
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from cogs.CreateEmbed import CreateEmbed, QueuePaginator
+from utils.MusicQueue import MusicQueue
+
+LAVALINK = FakeLavalink()
+
+
+class Recorder:
+    """Stands in for the response and message the paginator answers with"""
+
+    def __init__(self):
+        self.sent = []
+        self.edited = []
+
+    async def send_message(self, **kwargs) -> None:
+        self.sent.append(kwargs)
+
+    async def edit(self, **kwargs) -> None:
+        self.edited.append(kwargs)
+
+
+def paginator(size: int = 30) -> QueuePaginator:
+    queue = MusicQueue()
+    queue.put([wavelink.Playable(LAVALINK.make_track("page", i)) for i in range(size)])
+    return QueuePaginator(CreateEmbed(None), SimpleNamespace(queue=queue, current=None), user_id=1)
+
+
+def interaction(user_id: int) -> SimpleNamespace:
+    return SimpleNamespace(user=SimpleNamespace(id=user_id), response=Recorder())
+
+
+def test_only_the_invoking_user_turns_pages():
+    async def check():
+        view = paginator()
+        own, other = interaction(1), interaction(2)
+
+        assert await view.interaction_check(own)
+        assert not own.response.sent
+
+        assert not await view.interaction_check(other)
+        assert other.response.sent[0]["ephemeral"] is True
+
+    asyncio.run(check())
+
+
+def test_timeout_disables_the_buttons():
+    async def timeout():
+        view = paginator()
+        view.render()
+        message = Recorder()
+        view.message = message
+
+        await view.on_timeout()
+
+        assert all(item.disabled for item in view.children)
+        assert message.edited == [{"view": view}]
+
+    asyncio.run(timeout())
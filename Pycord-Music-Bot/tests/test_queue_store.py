@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+import time
+
+from types import SimpleNamespace
+
+import wavelink
+
+from utils.MusicQueue import MusicQueue, QueuedTrack
+from utils.QueueStore import QueueStore
+
+
+def record(i: int) -> QueuedTrack:
+    return QueuedTrack(f"encoded-{i}", f"id-{i}", f"Track {i}", "Artist", f"https://example.com/{i}", 180_000, 7)
+
+
+def player(guild_id: int, size: int) -> SimpleNamespace:
+    """Stands in for a connected player with a queue of records"""
+
+    queue = MusicQueue()
+    queue.put([record(i) for i in range(size)])
+    return SimpleNamespace(
+        guild=SimpleNamespace(id=guild_id),
+        channel=SimpleNamespace(id=guild_id + 1),
+        home=guild_id + 2,
+        current=None,
+        position=0,
+        volume=30,
+        autoplay=wavelink.AutoPlayMode.partial,
+        queue=queue,
+        connected=True,
+        playing=False,
+    )
+
+
+def test_flush_stores_queue_and_restores_records():
+    async def run():
+        store = QueueStore(":memory:")
+        store.mark(player(1, 3))
+        await store.flush()
+
+        (row,) = store.load()
+        assert (row["guild_id"], row["channel_id"], row["home_id"]) == (1, 2, 3)
+        restored = [store.decode_track(data) for data in json.loads(row["queue"])]
+        assert [track.dump() for track in restored] == [record(i).dump() for i in range(3)]
+
+    asyncio.run(run())
+
+
+def test_flush_serializes_queue_in_the_thread(monkeypatch):
+    async def run():
+        store = QueueStore(":memory:")
+        stored = player(1, 5)
+        store.mark(stored)
+
+        threads = set()
+        dumps = json.dumps
+
+        def traced_dumps(*args, **kwargs):
+            threads.add(threading.get_ident())
+            # Gives the loop time to change the queue while it is written
+            time.sleep(0.01)
+            return dumps(*args, **kwargs)
+
+        monkeypatch.setattr(json, "dumps", traced_dumps)
+        flush = asyncio.create_task(store.flush())
+        await asyncio.sleep(0)
+        stored.queue.clear()
+        await flush
+        monkeypatch.undo()
+
+        assert threading.get_ident() not in threads
+        # The queue is stored as it was when the flush started
+        (row,) = store.load()
+        assert len(json.loads(row["queue"])) == 5
+
+    asyncio.run(run())
@@ -0,0 +1,70 @@
+import asyncio
+
+from cogs.Reload import Reload
+from harness import Harness
+
+
+async def reloadable(monkeypatch, register_view: bool = True) -> Harness:
+    """Returns a harness playing a track with a queue, whose client can reload the music cogs"""
+
+    from cogs import MusicPlayer as music_player
+
+    harness = await Harness().start(monkeypatch)
+    client = harness.client
+    client.persistent_views = []
+
+    def add_view(view, message_id: int = None) -> None:
+        if register_view:
+            client.persistent_views.append(view)
+
+    def reload_extension(name: str) -> None:
+        if name == "cogs.MusicPlayer":
+            music_player.setup(client)
+
+    async def sync_commands() -> None:
+        pass
+
+    client.add_view = add_view
+    client.reload_extension = reload_extension
+    client.sync_commands = sync_commands
+
+    for i in range(3):
+        await harness.cog.play(harness.ctx("play"), f"reload {i}")
+    await harness.settle()
+    return harness
+
+
+def test_reload_carries_players_over(monkeypatch, capsys):
+    async def run():
+        harness = await reloadable(monkeypatch)
+        old_cog = harness.cog
+
+        elapsed, failed, lost = await Reload(harness.client).reload_cogs()
+
+        assert failed == [] and lost == []
+        assert harness.client.get_cog("MusicPlayer") is not old_cog
+        assert "1/1 players carried over" in capsys.readouterr().out
+        await harness.stop()
+
+    asyncio.run(run())
+
+
+def test_reload_reports_what_was_not_carried_over(monkeypatch, capsys):
+    async def run():
+        harness = await reloadable(monkeypatch, register_view=False)
+        reload = Reload(harness.client)
+        reload_extension = harness.client.reload_extension
+
+        def clearing(name: str) -> None:
+            reload_extension(name)
+            harness.guild.voice_client.queue.clear()
+
+        harness.client.reload_extension = clearing
+        elapsed, failed, lost = await reload.reload_cogs()
+
+        assert failed == ["ButtonView"]
+        assert lost == [harness.guild.id]
+        assert "queue of 2 tracks is now 0" in capsys.readouterr().out
+        await harness.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,39 @@
+import asyncio
+
+from harness import Harness, wait_for
+
+
+def test_restored_player_history_is_seeded_from_the_history_store(monkeypatch):
+    async def run():
+        from utils.HistoryStore import HISTORY
+        from utils.QueueStore import QUEUE_STORE
+
+        harness = await Harness().start(monkeypatch)
+        for i in range(3):
+            await harness.cog.play(harness.ctx("play"), f"song {i}")
+        await harness.settle()
+        player = harness.guild.voice_client
+        for _ in range(2):
+            await harness.cog.skip(harness.ctx("skip"))
+            await harness.settle()
+        # The start of the last track is recorded in the history
+        await wait_for(lambda: player.current and player.current.title.startswith("ytmsearch:song 2"))
+        await wait_for(lambda: any(row[1] == player.current.identifier for row in HISTORY._pending))
+
+        # The bot restarts: the stored state is restored into a new player
+        await QUEUE_STORE.flush()
+        (state,) = [state for state in QUEUE_STORE.load() if state["guild_id"] == harness.guild.id]
+        await player.disconnect()
+        played = [record.identifier for _, record in reversed(await HISTORY.recent(harness.guild.id))]
+
+        assert await harness.cog.restore_player(state)
+        restored = harness.guild.voice_client
+        assert restored is not player
+        history = [track.identifier for track in restored.queue.history]
+        # Oldest first with the resumed track last, as autoplay reads them
+        assert len(played) == 3 and history[:3] == played
+        assert played[-1] == restored.current.identifier
+        assert history[-1] == restored.current.identifier
+        await harness.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,91 @@
+import asyncio
+
+import wavelink
+
+from benchmarks.fake_lavalink import FakeLavalink
+from utils.SearchCache import SearchCache
+
+LAVALINK = FakeLavalink()
+
+
+def playlist(size: int) -> wavelink.Playlist:
+    return wavelink.Playlist({
+        "info": {"name": "Test", "selectedTrack": -1},
+        "pluginInfo": {},
+        "tracks": [LAVALINK.make_track("cached", i) for i in range(size)],
+    })
+
+
+def loader(monkeypatch) -> list:
+    loaded = []
+
+    async def search(query: str, **kwargs):
+        loaded.append(query)
+        await asyncio.sleep(0)
+        return playlist(3)
+
+    monkeypatch.setattr(wavelink.Playable, "search", search)
+    return loaded
+
+
+def test_extras_of_one_caller_are_not_shared(monkeypatch):
+    loaded = loader(monkeypatch)
+    cache = SearchCache()
+
+    async def searches():
+        first = await cache.search("https://test.local/list")
+        for track in first:
+            track.extras = {"requester_id": 1}
+
+        second = await cache.search("https://test.local/list")
+        return first, second
+
+    first, second = asyncio.run(searches())
+
+    assert loaded == ["https://test.local/list"]
+    assert cache.stats()["hits"] == 1
+    assert [track.identifier for track in second] == [track.identifier for track in first]
+    assert all(dict(track.extras) == {} for track in second)
+    assert all(a is not b for a, b in zip(first, second))
+
+
+def test_coalesced_callers_get_their_own_tracks(monkeypatch):
+    loaded = loader(monkeypatch)
+    cache = SearchCache()
+
+    async def searches():
+        return await asyncio.gather(*(cache.search("https://test.local/list") for _ in range(3)))
+
+    results = asyncio.run(searches())
+
+    assert len(loaded) == 1 and cache.stats()["coalesced"] == 2
+    tracks = [track for result in results for track in result]
+    assert len({id(track) for track in tracks}) == 9
+
+
+def test_followers_do_not_hang_when_the_leader_is_cancelled(monkeypatch):
+    started = []
+
+    async def search(query: str, **kwargs):
+        started.append(query)
+        await asyncio.sleep(0.01)
+        return playlist(3)
+
+    monkeypatch.setattr(wavelink.Playable, "search", search)
+    cache = SearchCache()
+
+    async def searches():
+        leader = asyncio.create_task(cache.search("https://test.local/list"))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.search("https://test.local/list"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        return await asyncio.wait_for(asyncio.gather(leader, follower, return_exceptions=True), 0.5)
+
+    leader, follower = asyncio.run(searches())
+
+    assert isinstance(leader, asyncio.CancelledError)
+    # The follower searched again on its own
+    assert len(follower.tracks) == 3 and len(started) == 2
+    assert cache.stats()["in_flight"] == 0
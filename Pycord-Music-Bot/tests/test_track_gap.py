@@ -0,0 +1,31 @@
+import time
+
+from types import SimpleNamespace
+
+from utils.TrackGap import TrackGaps
+
+
+def player(guild_id: int) -> SimpleNamespace:
+    return SimpleNamespace(guild=SimpleNamespace(id=guild_id))
+
+
+def test_gap_is_measured_after_a_finished_track():
+    gaps = TrackGaps()
+    gaps.ended(1, "finished")
+    time.sleep(0.01)
+    gaps.started(player(1))
+
+    assert gaps.gap.count == 1
+    assert 0.01 <= gaps.gap.sum < 0.5
+
+
+def test_skips_and_first_tracks_are_not_gaps():
+    gaps = TrackGaps()
+    gaps.started(player(1))
+    gaps.ended(1, "replaced")
+    gaps.started(player(1))
+    gaps.ended(2, "finished")
+    gaps.forget(2)
+    gaps.started(player(2))
+
+    assert gaps.gap.count == 0
@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+from discord.ext import commands
+
+from typing import Dict, List, Optional, Tuple
+
+from utils.NodePool import NODE_POOL
+from utils.Occupancy import OCCUPANCY
+
+
+class AudioService:
+    """Starts the bot's Lavalink connection once, shared by every cog and view
+
+    It is started by main right after login, so Lavalink connects while the
+    gateway connects. The steps until the first track plays are recorded as a
+    startup timeline.
+    """
+
+    def __init__(self):
+        """Initiates the AudioService Class"""
+
+        self.client: Optional[commands.Bot] = None
+        self.started = time.perf_counter()
+        self.timeline: List[Tuple[str, float]] = []
+        self._marked: Dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, client: commands.Bot, started: float = None) -> asyncio.Task:
+        """Starts connecting to the Lavalink nodes in the background"""
+
+        if self._task is None:
+            self.client = client
+            if started is not None:
+                self.started = started
+            self._task = asyncio.create_task(self._connect())
+        return self._task
+
+    async def _connect(self) -> None:
+        """Connects the node pool and starts the timers"""
+
+        OCCUPANCY.start(self.client)
+        try:
+            await NODE_POOL.connect(self.client)
+            self.mark("lavalink connected")
+        except Exception as e:
+            print(f"Exception occured when trying to connect to lavalink: {e}")
+
+    async def connected(self) -> None:
+        """Waits until the first connection attempt to Lavalink has finished"""
+
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    def mark(self, step: str) -> None:
+        """Records the first time a startup step is reached"""
+
+        if step in self._marked:
+            return
+
+        elapsed = time.perf_counter() - self.started
+        self._marked[step] = elapsed
+        self.timeline.append((step, elapsed))
+
+        # Playable once both the gateway and Lavalink are up
+        if step in ("gateway ready", "lavalink connected") and {
+            "gateway ready", "lavalink connected"
+        } <= self._marked.keys():
+            self.mark("playable")
+
+        if step == "first track":
+            self.report()
+
+    def report(self) -> None:
+        """Prints the startup timeline"""
+
+        steps = ", ".join(f"{step} {elapsed:.2f} s" for step, elapsed in self.timeline)
+        print(f"Startup timeline: {steps}")
+
+
+AUDIO = AudioService()
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import discord
+import wavelink
+
+from typing import Dict, List, Tuple, Union
+
+from utils.Metrics import Histogram
+from utils.PrefixIndex import PrefixIndex
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+AUTOCOMPLETE_PER_GUILD = int(os.getenv("AUTOCOMPLETE_PER_GUILD", 2000))
+AUTOCOMPLETE_SEARCHES = int(os.getenv("AUTOCOMPLETE_SEARCHES", 500))
+
+# Discord shows at most 25 choices of at most 100 characters
+MAX_CHOICES = 25
+MAX_CHOICE_LENGTH = 100
+
+
+class Autocomplete:
+    """Suggests /play queries from each guild's played tracks and its recent search results"""
+
+    def __init__(self, per_guild: int = AUTOCOMPLETE_PER_GUILD, searches: int = AUTOCOMPLETE_SEARCHES):
+        """Initiates the Autocomplete Class"""
+
+        self.per_guild = per_guild
+        self.searches_per_guild = searches
+        self.latency = Histogram()
+        self._guilds: Dict[int, PrefixIndex] = {}
+        self._searches: Dict[int, PrefixIndex] = {}
+
+    @staticmethod
+    def describe(track) -> Tuple[str, str]:
+        """Returns the choice name of a track and the query that plays it"""
+
+        text = f"{track.title} - {track.author}"[:MAX_CHOICE_LENGTH]
+        value = track.uri if track.uri and len(track.uri) <= MAX_CHOICE_LENGTH else text
+        return text, value
+
+    def guild(self, guild_id: int) -> PrefixIndex:
+        """Returns the index of a guild's own suggestions"""
+
+        index = self._guilds.get(guild_id)
+        if index is None:
+            index = self._guilds[guild_id] = PrefixIndex(self.per_guild)
+        return index
+
+    def searches(self, guild_id: int) -> PrefixIndex:
+        """Returns the index of a guild's recent search results"""
+
+        index = self._searches.get(guild_id)
+        if index is None:
+            index = self._searches[guild_id] = PrefixIndex(self.searches_per_guild)
+        return index
+
+    def played(self, guild_id: int, track) -> None:
+        """Adds a track a guild played"""
+
+        self.guild(guild_id).add(*self.describe(track))
+
+    def searched(
+        self, guild_id: int, query: str, result: Union[wavelink.Playlist, List[wavelink.Playable]]
+    ) -> None:
+        """Adds the playlist or the top results of a search to the guild's suggestions"""
+
+        # What a guild searched for, the query or the tracks it found, is only suggested in that guild
+        if isinstance(result, wavelink.Playlist):
+            if len(query) <= MAX_CHOICE_LENGTH:
+                self.guild(guild_id).add(result.name[:MAX_CHOICE_LENGTH], query)
+            return
+
+        searches = self.searches(guild_id)
+        for track in result[:5]:
+            searches.add(*self.describe(track))
+
+    async def load(self, rows: List[Tuple[int, object]]) -> None:
+        """Adds stored played tracks, oldest first, yielding to the event loop in between"""
+
+        for i, (guild_id, track) in enumerate(rows):
+            self.played(guild_id, track)
+            if i % 1000 == 999:
+                await asyncio.sleep(0)
+
+    def suggest(self, guild_id: int, query: str) -> List[discord.OptionChoice]:
+        """Returns the choices for a partial query, the guild's played tracks first"""
+
+        start = time.perf_counter()
+
+        index = self._guilds.get(guild_id)
+        results = index.search(query, MAX_CHOICES) if index else []
+        searches = self._searches.get(guild_id)
+        if searches and len(results) < MAX_CHOICES:
+            seen = {value for _, value in results}
+            results.extend(
+                (text, value) for text, value in searches.search(query, MAX_CHOICES)
+                if value not in seen
+            )
+
+        self.latency.observe(time.perf_counter() - start)
+        return [discord.OptionChoice(name=text, value=value) for text, value in results[:MAX_CHOICES]]
+
+
+AUTOCOMPLETE = Autocomplete()
@@ -0,0 +1,84 @@
+import discord
+import weakref
+
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+EMBED_STORE_SIZE = int(os.getenv("EMBED_STORE_SIZE", 50))
+
+
+class EmbedStore:
+    """Per-guild store for now playing embeds with a size cap and LRU eviction"""
+
+    def __init__(self, max_per_guild: int = EMBED_STORE_SIZE):
+        """Initiates the EmbedStore Class"""
+
+        self.max_per_guild = max_per_guild
+        self._guilds: Dict[int, OrderedDict] = {}
+        self._messages: Dict[int, Tuple[int, int]] = {}
+        self.tracks = 0
+        self.sent = 0
+        self.edited = 0
+        # Every live view of the cogs, to see that they do not pile up
+        self.views: "weakref.WeakSet[discord.ui.View]" = weakref.WeakSet()
+
+    def __len__(self) -> int:
+        """Returns the amount of embeds stored over all guilds"""
+
+        return sum(len(embeds) for embeds in self._guilds.values())
+
+    def get(self, guild_id: int, key: Hashable) -> Optional[discord.Embed]:
+        """Returns a stored embed and marks it as recently used"""
+
+        embeds = self._guilds.get(guild_id)
+        if not embeds or key not in embeds:
+            return None
+
+        embeds.move_to_end(key)
+        return embeds[key]
+
+    def put(self, guild_id: int, key: Hashable, embed: discord.Embed) -> None:
+        """Stores an embed for a guild, evicts the least recently used one when full"""
+
+        embeds = self._guilds.setdefault(guild_id, OrderedDict())
+        embeds[key] = embed
+        embeds.move_to_end(key)
+
+        while len(embeds) > self.max_per_guild:
+            embeds.popitem(last=False)
+
+    def get_message(self, guild_id: int) -> Optional[Tuple[int, int]]:
+        """Returns the channel and message id of a guild's now playing message"""
+
+        return self._messages.get(guild_id)
+
+    def set_message(self, guild_id: int, channel_id: int, message_id: int) -> None:
+        """Stores the now playing message of a guild"""
+
+        self._messages[guild_id] = (channel_id, message_id)
+
+    def clear(self, guild_id: int) -> None:
+        """Removes all embeds and the now playing message stored for a guild"""
+
+        self._guilds.pop(guild_id, None)
+        self._messages.pop(guild_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the live objects of the store and the now playing api calls per started track"""
+
+        return {
+            "embeds": len(self),
+            "messages": len(self._messages),
+            "views": len(self.views),
+            "tracks": self.tracks,
+            "sent": self.sent,
+            "edited": self.edited,
+            "api_calls_per_track": (self.sent + self.edited) / self.tracks if self.tracks else 0.0,
+        }
+
+
+EMBEDS = EmbedStore()
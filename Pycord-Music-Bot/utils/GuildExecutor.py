@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from utils.Metrics import Histogram
+from utils.Watchdog import WATCHDOG
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+GUILD_MAILBOX_SIZE = int(os.getenv("GUILD_MAILBOX_SIZE", 20))
+
+# Returned to a call that was merged into an identical pending call
+MERGED = object()
+
+
+class GuildBusy(Exception):
+    """Raised when the mailbox of a guild is full"""
+
+
+class GuildJob:
+    """One queued command or event of a guild"""
+
+    __slots__ = ("name", "factory", "future", "merge", "enqueued")
+
+    def __init__(self, name: str, factory: Callable[[], Awaitable], merge: bool):
+        self.name = name
+        self.factory = factory
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.merge = merge
+        self.enqueued = time.monotonic()
+
+
+class GuildMailbox:
+    """Pending commands and events of one guild, run one at a time"""
+
+    def __init__(self):
+        self.jobs: Deque[GuildJob] = deque()
+        self.worker: Optional[asyncio.Task] = None
+
+
+class GuildExecutor:
+    """Runs the commands and events of each guild in order, guilds run in parallel"""
+
+    def __init__(self, size: int = GUILD_MAILBOX_SIZE):
+        """Initiates the GuildExecutor Class"""
+
+        self.size = size
+        self.wait: Dict[str, Histogram] = {}
+        self.merged = 0
+        self.rejected = 0
+        self._mailboxes: Dict[int, GuildMailbox] = {}
+
+    def pending(self, guild_id: int) -> int:
+        """Returns the amount of calls a new call of the guild waits for"""
+
+        mailbox = self._mailboxes.get(guild_id)
+        if mailbox is None:
+            return 0
+        return len(mailbox.jobs) + (mailbox.worker is not None)
+
+    async def submit(
+        self,
+        guild_id: int,
+        name: str,
+        factory: Callable[[], Awaitable],
+        merge: bool = False,
+        force: bool = False
+    ) -> Any:
+        """Runs a call after the earlier calls of the guild and returns its result
+
+        With merge, a call is merged into the last pending call when that has
+        the same name, and returns MERGED once that call has run. A call that
+        waits behind another command is never merged, that would run it before
+        the command. A full mailbox raises GuildBusy unless force is set, which
+        is used for events that must not be lost.
+        """
+
+        mailbox = self._mailboxes.get(guild_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[guild_id] = GuildMailbox()
+
+        pending = mailbox.jobs[-1] if merge and mailbox.jobs else None
+        if pending is not None and pending.merge and pending.name == name:
+            self.merged += 1
+            await asyncio.wait([pending.future])
+            return MERGED
+
+        if len(mailbox.jobs) >= self.size and not force:
+            self.rejected += 1
+            raise GuildBusy(guild_id)
+
+        job = GuildJob(name, factory, merge)
+        mailbox.jobs.append(job)
+
+        if mailbox.worker is None:
+            mailbox.worker = asyncio.create_task(self._work(guild_id, mailbox))
+            # A worker cancelled before it started never reaches its own cleanup
+            mailbox.worker.add_done_callback(lambda worker: self._close(guild_id, mailbox, worker))
+
+        return await asyncio.shield(job.future)
+
+    async def _work(self, guild_id: int, mailbox: GuildMailbox) -> None:
+        """Runs the calls of a mailbox until it is empty"""
+
+        try:
+            while mailbox.jobs:
+                job = mailbox.jobs.popleft()
+
+                histogram = self.wait.get(job.name)
+                if histogram is None:
+                    histogram = self.wait[job.name] = Histogram()
+                histogram.observe(time.monotonic() - job.enqueued)
+
+                WATCHDOG.label(f"{job.name} guild={guild_id}")
+                try:
+                    result = await job.factory()
+                except asyncio.CancelledError:
+                    job.future.cancel()
+                    # A call that was cancelled on its own does not stop the guild's later calls
+                    if asyncio.current_task().cancelling():
+                        raise
+                except Exception as e:
+                    job.future.set_exception(e)
+                    job.future.exception()
+                except BaseException:
+                    job.future.cancel()
+                    raise
+                else:
+                    job.future.set_result(result)
+        finally:
+            self._close(guild_id, mailbox, asyncio.current_task())
+
+    def _close(self, guild_id: int, mailbox: GuildMailbox, worker: asyncio.Task) -> None:
+        """Removes a mailbox whose worker stopped, calls left behind are cancelled so no caller waits forever"""
+
+        if mailbox.worker is not worker:
+            return
+
+        for job in mailbox.jobs:
+            job.future.cancel()
+        mailbox.jobs.clear()
+        mailbox.worker = None
+        if self._mailboxes.get(guild_id) is mailbox:
+            del self._mailboxes[guild_id]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns mailbox depth and counters"""
+
+        return {
+            "guilds": len(self._mailboxes),
+            "queue_depth": sum(len(mailbox.jobs) for mailbox in self._mailboxes.values()),
+            "merged": self.merged,
+            "rejected": self.rejected,
+        }
+
+
+GUILD_EXECUTOR = GuildExecutor()
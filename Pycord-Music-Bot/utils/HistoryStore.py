@@ -0,0 +1,148 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+from typing import List, Optional, Set, Tuple
+
+import wavelink
+
+from utils.MusicQueue import QueuedTrack
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+HISTORY_DB = os.getenv("HISTORY_DB", "history.sqlite3")
+HISTORY_FLUSH_INTERVAL = float(os.getenv("HISTORY_FLUSH_INTERVAL", 10))
+HISTORY_RETENTION_DAYS = float(os.getenv("HISTORY_RETENTION_DAYS", 30))
+HISTORY_PER_GUILD = int(os.getenv("HISTORY_PER_GUILD", 500))
+
+
+class HistoryStore:
+    """Keeps the played tracks of every guild in SQLite, written in batches"""
+
+    def __init__(
+        self,
+        path: str = HISTORY_DB,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        retention_days: float = HISTORY_RETENTION_DAYS,
+        per_guild: int = HISTORY_PER_GUILD
+    ):
+        """Initiates the HistoryStore Class"""
+
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retention = retention_days * 24 * 60 * 60
+        self.per_guild = per_guild
+        self._pending: List[tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                guild_id INTEGER NOT NULL,
+                identifier TEXT NOT NULL,
+                played_at REAL NOT NULL,
+                track TEXT NOT NULL
+            )"""
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS history_guild ON history (guild_id, identifier, played_at)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS history_time ON history (played_at)")
+        self._db.commit()
+
+    @property
+    def started(self) -> bool:
+        """Returns if the flush loop is running"""
+
+        return self._flush_task is not None
+
+    def start(self) -> None:
+        """Starts flushing played tracks periodically"""
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def record(self, guild_id: int, track: wavelink.Playable) -> None:
+        """Remembers a played track, written on the next flush"""
+
+        record = QueuedTrack.from_playable(track)
+        self._pending.append(
+            (guild_id, record.identifier, time.time(), json.dumps(record.dump()))
+        )
+
+    async def recent(self, guild_id: int, limit: int = 10) -> List[Tuple[float, QueuedTrack]]:
+        """Returns the latest played tracks of a guild, newest first, one entry per track"""
+
+        await self.flush()
+        rows = await asyncio.to_thread(self._recent, guild_id, limit)
+        return [(played_at, QueuedTrack(*json.loads(track))) for played_at, track in rows]
+
+    def _recent(self, guild_id: int, limit: int) -> List[tuple]:
+        """Reads the latest played tracks of a guild"""
+
+        return self._db.execute(
+            """SELECT MAX(played_at), track FROM history
+               WHERE guild_id = ?
+               GROUP BY identifier
+               ORDER BY MAX(played_at) DESC
+               LIMIT ?""",
+            (guild_id, limit)
+        ).fetchall()
+
+    async def played(self) -> List[Tuple[int, QueuedTrack]]:
+        """Returns the stored played tracks of all guilds, oldest first"""
+
+        rows = await asyncio.to_thread(
+            lambda: self._db.execute(
+                "SELECT guild_id, track FROM history ORDER BY played_at"
+            ).fetchall()
+        )
+        return [(guild_id, QueuedTrack(*json.loads(track))) for guild_id, track in rows]
+
+    async def flush(self) -> None:
+        """Writes all played tracks since the last flush in one transaction"""
+
+        if not self._pending:
+            return
+
+        rows = self._pending
+        self._pending = []
+        await asyncio.to_thread(self._write, rows)
+
+    def _write(self, rows: List[tuple]) -> None:
+        """Writes a batch of played tracks and drops what is past the retention"""
+
+        guilds: Set[int] = {row[0] for row in rows}
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO history (guild_id, identifier, played_at, track) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._db.execute(
+                "DELETE FROM history WHERE played_at < ?", (time.time() - self.retention,)
+            )
+            self._db.executemany(
+                """DELETE FROM history WHERE guild_id = ? AND id <= (
+                       SELECT id FROM history WHERE guild_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+                   )""",
+                [(guild_id, guild_id, self.per_guild) for guild_id in guilds]
+            )
+
+    async def _flush_loop(self) -> None:
+        """Flushes played tracks periodically"""
+
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Exception occured when saving history: {e}")
+
+
+HISTORY = HistoryStore()
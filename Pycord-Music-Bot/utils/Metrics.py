@@ -0,0 +1,113 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (0, 1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000, 10000)
+
+
+class Histogram:
+    """Prometheus style histogram with fixed buckets"""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """Initiates the Histogram Class"""
+
+        self.buckets = sorted(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Adds a value to the histogram"""
+
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: Dict[str, str] = None) -> List[str]:
+        """Returns the exposition lines of the histogram"""
+
+        labels = labels or {}
+        lines = []
+        cumulative = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{format_labels(dict(labels, le=str(bucket)))} {cumulative}")
+        lines.append(f"{name}_bucket{format_labels(dict(labels, le='+Inf'))} {self.count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {self.sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {self.count}")
+        return lines
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    """Formats labels as {key="value",...}"""
+
+    if not labels:
+        return ""
+
+    escaped = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class MetricsWriter:
+    """Builds a Prometheus text exposition"""
+
+    def __init__(self):
+        """Initiates the MetricsWriter Class"""
+
+        self.lines: List[str] = []
+
+    def header(self, name: str, kind: str, help_text: str) -> None:
+        """Adds the HELP and TYPE lines of a metric"""
+
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def gauge(self, name: str, value: float, help_text: str, labels: Dict[str, str] = None) -> None:
+        """Adds a single gauge"""
+
+        self.header(name, "gauge", help_text)
+        self.lines.append(f"{name}{format_labels(labels or {})} {value}")
+
+    def counter(self, name: str, value: float, help_text: str) -> None:
+        """Adds a single counter"""
+
+        self.header(name, "counter", help_text)
+        self.lines.append(f"{name} {value}")
+
+    def labelled_gauge(self, name: str, values: Dict[str, float], label: str, help_text: str) -> None:
+        """Adds a gauge with one sample per label value"""
+
+        self.header(name, "gauge", help_text)
+        for key, value in values.items():
+            self.lines.append(f"{name}{format_labels({label: key})} {value}")
+
+    def histograms(self, name: str, histograms: Dict[str, Histogram], label: str, help_text: str) -> None:
+        """Adds histograms with one series per label value"""
+
+        self.header(name, "histogram", help_text)
+        for key, histogram in histograms.items():
+            self.lines.extend(histogram.render(name, {label: key}))
+
+    def histogram(self, name: str, histogram: Histogram, help_text: str) -> None:
+        """Adds a histogram without labels"""
+
+        self.header(name, "histogram", help_text)
+        self.lines.extend(histogram.render(name))
+
+    def distribution(self, name: str, values: Iterable[float], buckets: Sequence[float], help_text: str) -> None:
+        """Adds a histogram of the current values, such as queue lengths right now"""
+
+        histogram = Histogram(buckets)
+        for value in values:
+            histogram.observe(value)
+        self.histogram(name, histogram, help_text)
+
+    def render(self) -> str:
+        """Returns the exposition text"""
+
+        return "\n".join(self.lines) + "\n"
@@ -0,0 +1,209 @@
+import sys
+
+import wavelink
+
+from typing import Any, List, Optional
+
+# Lavalink reports the length of streams as the largest long
+STREAM_LENGTH = 2 ** 63 - 1
+
+# Played tracks kept in the queue history, wavelink's autoplay reads the latest 40
+HISTORY_SIZE = 50
+
+
+class QueuedTrack:
+    """Compact record of a queued track, made into a Playable when it is played"""
+
+    __slots__ = ("encoded", "identifier", "title", "author", "uri", "length", "requester_id", "source")
+
+    def __init__(
+        self,
+        encoded: str,
+        identifier: str,
+        title: str,
+        author: str,
+        uri: Optional[str],
+        length: int,
+        requester_id: Optional[int] = None,
+        source: str = "unknown"
+    ):
+        self.encoded = encoded
+        self.identifier = identifier
+        self.title = title
+        self.author = author
+        self.uri = uri
+        self.length = length
+        self.requester_id = requester_id
+        self.source = sys.intern(source)
+
+    @classmethod
+    def from_playable(cls, track: wavelink.Playable) -> "QueuedTrack":
+        """Creates a record from the fields of a track"""
+
+        return cls(
+            track.encoded,
+            track.identifier,
+            track.title,
+            track.author,
+            track.uri,
+            track.length,
+            getattr(track.extras, "requester_id", None),
+            track.source
+        )
+
+    def playable(self) -> wavelink.Playable:
+        """Creates the track to play from the record"""
+
+        stream = self.length >= STREAM_LENGTH
+        return wavelink.Playable({
+            "encoded": self.encoded,
+            "info": {
+                "identifier": self.identifier,
+                "isSeekable": not stream,
+                "author": self.author,
+                "length": self.length,
+                "isStream": stream,
+                "position": 0,
+                "title": self.title,
+                "uri": self.uri,
+                "artworkUrl": None,
+                "isrc": None,
+                "sourceName": self.source,
+            },
+            "pluginInfo": {},
+            "userData": {"requester_id": self.requester_id} if self.requester_id is not None else {},
+        })
+
+    def dump(self) -> List:
+        """Returns the fields of the record, restored with QueuedTrack(*fields)"""
+
+        return [
+            self.encoded,
+            self.identifier,
+            self.title,
+            self.author,
+            self.uri,
+            self.length,
+            self.requester_id,
+            self.source,
+        ]
+
+
+class TrackHistory(wavelink.Queue):
+    """History of played tracks that keeps only the latest ones"""
+
+    def __init__(self, size: int = HISTORY_SIZE):
+        """Initiates the TrackHistory Class"""
+
+        super().__init__(history=False)
+        self.size = size
+
+    def put(self, item: Any, /, **kwargs) -> int:
+        """Adds played tracks and drops the oldest ones over the size"""
+
+        added = super().put(item, **kwargs)
+        if len(self._items) > self.size:
+            del self._items[:len(self._items) - self.size]
+        return added
+
+
+class MusicQueue(wavelink.Queue):
+    """Queue of compact track records, with bulk operations that rebuild the queue in one pass
+
+    Tracks put in the queue are stored as QueuedTrack and only made into a
+    Playable again when they are taken out to be played.
+    """
+
+    def __init__(self):
+        """Initiates the MusicQueue Class"""
+
+        super().__init__()
+        self._history = TrackHistory()
+
+    @staticmethod
+    def _check_compatibility(item: Any) -> bool:
+        """Accepts records and tracks, tracks are made into records when put"""
+
+        if not isinstance(item, (QueuedTrack, wavelink.Playable)):
+            raise TypeError("This queue is restricted to QueuedTrack and Playable objects.")
+        return True
+
+    @staticmethod
+    def compact(item: Any) -> Any:
+        """Returns the tracks of item as records"""
+
+        if isinstance(item, wavelink.Playable):
+            return QueuedTrack.from_playable(item)
+        if isinstance(item, (list, wavelink.Playlist)):
+            return [
+                QueuedTrack.from_playable(track) if isinstance(track, wavelink.Playable) else track
+                for track in item
+            ]
+        return item
+
+    @staticmethod
+    def expand(item: Any) -> Any:
+        """Returns the Playable of a record"""
+
+        return item.playable() if isinstance(item, QueuedTrack) else item
+
+    def put(self, item: Any, /, **kwargs) -> int:
+        """Puts a track, a list of tracks or a playlist as records"""
+
+        return super().put(self.compact(item), **kwargs)
+
+    async def put_wait(self, item: Any, /, **kwargs) -> int:
+        """Puts a track, a list of tracks or a playlist as records"""
+
+        return await super().put_wait(self.compact(item), **kwargs)
+
+    def get(self) -> wavelink.Playable:
+        """Returns the next track to play"""
+
+        return self.expand(super().get())
+
+    async def get_wait(self) -> wavelink.Playable:
+        """Waits for and returns the next track to play"""
+
+        return self.expand(await super().get_wait())
+
+    def remove_range(self, start: int, end: int) -> int:
+        """Removes the tracks from index start up to end, returns the amount removed"""
+
+        start = max(0, start)
+        end = min(len(self._items), end)
+        if start >= end:
+            return 0
+
+        del self._items[start:end]
+        return end - start
+
+    def move(self, index: int, to: int) -> QueuedTrack:
+        """Moves the track at index to another index"""
+
+        track = self._items.pop(index)
+        self._items.insert(to, track)
+        return track
+
+    def dedupe(self) -> int:
+        """Removes every repeated track identifier, returns the amount removed"""
+
+        seen = set()
+        items = []
+        for track in self._items:
+            if track.identifier not in seen:
+                seen.add(track.identifier)
+                items.append(track)
+
+        removed = len(self._items) - len(items)
+        self._items[:] = items
+        return removed
+
+    def remove_requester(self, requester_id: int) -> int:
+        """Removes every track requested by a user, returns the amount removed"""
+
+        items = [track for track in self._items if track.requester_id != requester_id]
+
+        removed = len(self._items) - len(items)
+        self._items[:] = items
+        return removed
@@ -0,0 +1,136 @@
+import asyncio
+
+import discord
+
+from typing import Dict, List, Optional, Set
+
+import wavelink
+
+from utils.MusicQueue import MusicQueue
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+LAVALINK_KEY = os.getenv("LAVALINK_KEY")
+LAVALINK_NODES = os.getenv("LAVALINK_NODES", "http://localhost:2333")
+NODE_HEALTH_INTERVAL = float(os.getenv("NODE_HEALTH_INTERVAL", 15))
+
+
+class NodePool:
+    """Connects to the configured lavalink nodes, places players and reports the players of failed nodes"""
+
+    def __init__(
+        self,
+        uris: str = LAVALINK_NODES,
+        password: str = LAVALINK_KEY,
+        health_interval: float = NODE_HEALTH_INTERVAL
+    ):
+        """Initiates the NodePool Class"""
+
+        self.nodes: List[wavelink.Node] = [
+            wavelink.Node(
+                identifier=uri.strip(),
+                uri=uri.strip(),
+                password=password,
+                # Inactive players are left through the shared timer wheel instead
+                inactive_player_timeout=None
+            )
+            for uri in uris.split(",") if uri.strip()
+        ]
+        self.health_interval = health_interval
+        self.penalties: Dict[str, float] = {}
+        self.unhealthy: Set[str] = set()
+        self.client: Optional[discord.Client] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def connect(self, client: discord.Client) -> None:
+        """Connects all nodes and starts the health checks"""
+
+        if self._health_task is not None:
+            return
+
+        self.client = client
+        await wavelink.Pool.connect(client=client, nodes=self.nodes)
+        self._health_task = asyncio.create_task(self._health_loop())
+
+    def create_player(self, client: discord.Client, channel: discord.VoiceChannel) -> wavelink.Player:
+        """Creates a player on the least loaded node, used as cls for channel.connect"""
+
+        try:
+            nodes = [self.best_node()]
+        except wavelink.InvalidNodeException:
+            nodes = None
+        player = wavelink.Player(client, channel, nodes=nodes)
+        player.queue = MusicQueue()
+        return player
+
+    def best_node(self, exclude: wavelink.Node = None) -> wavelink.Node:
+        """Returns the connected and healthy node with the lowest load"""
+
+        candidates = [
+            node for node in self.nodes
+            if node is not exclude
+            and node.status is wavelink.NodeStatus.CONNECTED
+            and node.identifier not in self.unhealthy
+        ]
+        if not candidates:
+            raise wavelink.InvalidNodeException("No healthy Lavalink node available")
+
+        return min(
+            candidates,
+            key=lambda node: self.penalties.get(node.identifier, 0) + len(node.players)
+        )
+
+    @staticmethod
+    def penalty(stats: wavelink.StatsResponsePayload) -> float:
+        """Calculates the load of a node from its playing players, cpu and frame stats"""
+
+        cpu = 1.05 ** (100 * stats.cpu.system_load) * 10 - 10
+
+        frames = 0.0
+        if stats.frames:
+            deficit = 1.03 ** (500 * (stats.frames.deficit / 3000)) * 600 - 600
+            nulled = (1.03 ** (500 * (stats.frames.nulled / 3000)) * 300 - 300) * 2
+            frames = deficit + nulled
+
+        return stats.playing + cpu + frames
+
+    async def check_health(self) -> None:
+        """Updates the load of every node and fails over the players of dead nodes"""
+
+        for node in self.nodes:
+            try:
+                stats = await asyncio.wait_for(node.fetch_stats(), timeout=self.health_interval)
+            except Exception as e:
+                if node.identifier not in self.unhealthy:
+                    print(f"Lavalink node {node.identifier} failed its health check: {e}")
+                self.unhealthy.add(node.identifier)
+                await self.fail_over(node)
+                continue
+
+            self.unhealthy.discard(node.identifier)
+            self.penalties[node.identifier] = self.penalty(stats)
+
+    async def fail_over(self, node: wavelink.Node) -> None:
+        """Marks a node unhealthy and dispatches node_unhealthy with its players, which the music cog moves"""
+
+        self.unhealthy.add(node.identifier)
+
+        # Moved by the cog through each guild's mailbox, so a move never runs during a command
+        players = list(node.players.values())
+        if players and self.client is not None:
+            self.client.dispatch("node_unhealthy", node, players)
+
+    async def _health_loop(self) -> None:
+        """Runs the health checks periodically"""
+
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                print(f"Exception occured during Lavalink health check: {e}")
+
+
+NODE_POOL = NodePool()
@@ -0,0 +1,131 @@
+import discord
+from discord.ext import commands
+
+from typing import Dict, Optional
+
+from utils.TimerWheel import TIMERS, TimerWheel
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+EMPTY_CHANNEL_TIMEOUT = float(os.getenv("EMPTY_CHANNEL_TIMEOUT", 10))
+INACTIVE_PLAYER_TIMEOUT = float(os.getenv("INACTIVE_PLAYER_TIMEOUT", 300))
+
+
+class Occupancy:
+    """Counts the people in the bot's voice channel of each guild and schedules leaving
+
+    The counts are kept up to date from voice state updates. When a channel
+    becomes empty or a player stops playing a timer is scheduled on the timer
+    wheel, which dispatches voice_channel_empty or wavelink_inactive_player.
+    """
+
+    def __init__(self, timers: TimerWheel = TIMERS):
+        """Initiates the Occupancy Class"""
+
+        self.timers = timers
+        self.client: Optional[commands.Bot] = None
+        self._channels: Dict[int, int] = {}
+        self._humans: Dict[int, int] = {}
+
+    def start(self, client: commands.Bot) -> None:
+        """Starts the timer wheel"""
+
+        self.client = client
+        self.timers.start()
+
+    def humans(self, guild_id: int) -> int:
+        """Returns the amount of people in the bot's voice channel"""
+
+        return self._humans.get(guild_id, 0)
+
+    def update(
+        self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState
+    ) -> None:
+        """Updates the count of a guild from a voice state update"""
+
+        guild_id = member.guild.id
+
+        if member.id == self.client.user.id:
+            if after.channel is None:
+                self.untrack(guild_id)
+            elif before.channel != after.channel:
+                self.track(after.channel)
+            return
+
+        channel_id = self._channels.get(guild_id)
+        if member.bot or channel_id is None:
+            return
+
+        left = before.channel is not None and before.channel.id == channel_id
+        joined = after.channel is not None and after.channel.id == channel_id
+        if left == joined:
+            return
+
+        self._humans[guild_id] += 1 if joined else -1
+        self._check(guild_id)
+
+    def track(self, channel: discord.VoiceChannel) -> None:
+        """Starts counting the channel the bot joined"""
+
+        guild_id = channel.guild.id
+        self._channels[guild_id] = channel.id
+        self._humans[guild_id] = sum(not member.bot for member in channel.members)
+        self._check(guild_id)
+        self.idle(guild_id)
+
+    def untrack(self, guild_id: int) -> None:
+        """Stops counting a guild the bot left"""
+
+        self._channels.pop(guild_id, None)
+        self._humans.pop(guild_id, None)
+        self.timers.cancel(("empty", guild_id))
+        self.timers.cancel(("inactive", guild_id))
+
+    def active(self, guild_id: int) -> None:
+        """Cancels the inactivity timer of a guild that started playing"""
+
+        self.timers.cancel(("inactive", guild_id))
+
+    def idle(self, guild_id: int) -> None:
+        """Schedules leaving a guild that stopped playing"""
+
+        if guild_id in self._channels:
+            self.timers.schedule(
+                ("inactive", guild_id),
+                INACTIVE_PLAYER_TIMEOUT,
+                lambda: self._expire(guild_id, "wavelink_inactive_player")
+            )
+
+    def _check(self, guild_id: int) -> None:
+        """Schedules leaving an empty channel, cancels it when someone is there"""
+
+        if self._humans[guild_id] > 0:
+            self.timers.cancel(("empty", guild_id))
+        else:
+            self.timers.schedule(
+                ("empty", guild_id),
+                EMPTY_CHANNEL_TIMEOUT,
+                lambda: self._expire(guild_id, "voice_channel_empty")
+            )
+
+    def _expire(self, guild_id: int, event: str) -> None:
+        """Dispatches the event of an expired timer with the guild's player"""
+
+        guild = self.client.get_guild(guild_id)
+        if guild and guild.voice_client:
+            self.client.dispatch(event, guild.voice_client)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns tracked channels and timer counts"""
+
+        return {
+            "channels": len(self._channels),
+            "empty": sum(count == 0 for count in self._humans.values()),
+            "timers": len(self.timers),
+            "fired": self.timers.fired,
+        }
+
+
+OCCUPANCY = Occupancy()
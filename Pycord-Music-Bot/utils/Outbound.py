@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import time
+
+import discord
+
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+OUTBOUND_COALESCE_WINDOW = float(os.getenv("OUTBOUND_COALESCE_WINDOW", 1.0))
+
+# Interaction replies are sent right away, they are not limited per channel
+INTERACTION = 0
+# Lower values are sent first within a channel
+NOW_PLAYING = 1
+INFO = 2
+
+
+class OutboundJob:
+    """One queued call to discord"""
+
+    __slots__ = ("factory", "future", "key", "priority", "order", "enqueued", "not_before", "attempts")
+
+    def __init__(
+        self,
+        factory: Callable[[], Awaitable],
+        key: Optional[Hashable],
+        priority: int,
+        order: int,
+        delay: float
+    ):
+        self.factory = factory
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.key = key
+        self.priority = priority
+        self.order = order
+        self.enqueued = time.monotonic()
+        self.not_before = self.enqueued + delay
+        self.attempts = 0
+
+
+class OutboundBucket:
+    """Pending calls for one channel, sent one at a time"""
+
+    def __init__(self):
+        self.heap: List[tuple] = []
+        self.keys: Dict[Hashable, OutboundJob] = {}
+        self.wakeup = asyncio.Event()
+        self.worker: Optional[asyncio.Task] = None
+
+
+class OutboundScheduler:
+    """Sends posts through per-channel buckets in priority order, interaction replies right away"""
+
+    def __init__(self, coalesce_window: float = OUTBOUND_COALESCE_WINDOW):
+        """Initiates the OutboundScheduler Class"""
+
+        self.coalesce_window = coalesce_window
+        self.sent = 0
+        self.merged = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.latencies: Deque[float] = deque(maxlen=1000)
+        self._buckets: Dict[int, OutboundBucket] = {}
+        self._counter = itertools.count()
+
+    async def send(
+        self,
+        channel_id: int,
+        factory: Callable[[], Awaitable],
+        priority: int = INFO,
+        key: Hashable = None
+    ) -> Any:
+        """Queues a call for a channel and returns its result once sent
+
+        Calls with a key are held for the coalesce window, a newer call with the
+        same key replaces the pending one and both callers get the newer result.
+        Interaction replies skip the channel's queue, a defer must not wait
+        behind posts to the channel past the interaction's deadline.
+        """
+
+        if priority == INTERACTION:
+            return await self._send_now(factory)
+
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = OutboundBucket()
+
+        pending = bucket.keys.get(key) if key is not None else None
+        if pending is not None:
+            pending.factory = factory
+            self.merged += 1
+            return await asyncio.shield(pending.future)
+
+        job = OutboundJob(
+            factory, key, priority, next(self._counter), self.coalesce_window if key is not None else 0
+        )
+        if key is not None:
+            bucket.keys[key] = job
+        self._push(bucket, job)
+
+        if bucket.worker is None:
+            bucket.worker = asyncio.create_task(self._work(channel_id, bucket))
+
+        return await asyncio.shield(job.future)
+
+    async def _work(self, channel_id: int, bucket: OutboundBucket) -> None:
+        """Sends the calls of a bucket until it is empty"""
+
+        while bucket.heap:
+            job: OutboundJob = bucket.heap[0][2]
+
+            delay = job.not_before - time.monotonic()
+            if delay > 0:
+                # Wakes up early when a call with a higher priority arrives
+                bucket.wakeup.clear()
+                try:
+                    await asyncio.wait_for(bucket.wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(bucket.heap)
+            if job.key is not None and bucket.keys.get(job.key) is job:
+                del bucket.keys[job.key]
+
+            await self._run(bucket, job)
+
+        del self._buckets[channel_id]
+
+    @staticmethod
+    def _push(bucket: OutboundBucket, job: OutboundJob) -> None:
+        """Queues a call in its place by priority and arrival and wakes the bucket's worker"""
+
+        heapq.heappush(bucket.heap, (job.priority, job.order, job))
+        bucket.wakeup.set()
+
+    async def _run(self, bucket: OutboundBucket, job: OutboundJob) -> None:
+        """Runs a call, a rate limited call is queued again for after its retry_after once"""
+
+        try:
+            result = await job.factory()
+        except discord.HTTPException as e:
+            if e.status == 429 and job.attempts == 0:
+                # Other channels and interaction replies keep going while this one waits
+                self.rate_limited += 1
+                job.attempts += 1
+                job.not_before = time.monotonic() + (getattr(e, "retry_after", None) or 1.0)
+                self._push(bucket, job)
+                return
+
+            self.failed += 1
+            job.future.set_exception(e)
+            job.future.exception()
+            return
+        except Exception as e:
+            self.failed += 1
+            job.future.set_exception(e)
+            job.future.exception()
+            return
+
+        self.sent += 1
+        self.latencies.append(time.monotonic() - job.enqueued)
+        job.future.set_result(result)
+
+    async def _send_now(self, factory: Callable[[], Awaitable]) -> Any:
+        """Sends an interaction reply outside the channel buckets, pycord waits out its rate limits"""
+
+        start = time.monotonic()
+        try:
+            result = await factory()
+        except Exception:
+            self.failed += 1
+            raise
+
+        self.sent += 1
+        self.latencies.append(time.monotonic() - start)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Returns queue depth, counters and send latency percentiles"""
+
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))] if latencies else 0.0
+
+        return {
+            "queue_depth": sum(len(bucket.heap) for bucket in self._buckets.values()),
+            "channels": len(self._buckets),
+            "sent": self.sent,
+            "merged": self.merged,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "latency_p50": percentile(0.5),
+            "latency_p99": percentile(0.99),
+        }
+
+
+OUTBOUND = OutboundScheduler()
@@ -0,0 +1,215 @@
+import heapq
+import re
+
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from itertools import islice
+from typing import Dict, Iterator, List, Set, Tuple
+
+WORD = re.compile(r"\w+")
+
+# Limits that keep a lookup within a few milliseconds on short, common prefixes
+MAX_SCAN = 4096
+MAX_EXPANSION = 32
+MAX_CANDIDATES = 2000
+MAX_SIMILAR = 8
+
+# Postings checked for removed entries per add while the index is compacted
+COMPACT_STEP = 512
+
+
+def words(text: str) -> List[str]:
+    """Returns the lowercase words of a text"""
+
+    return WORD.findall(text.casefold())
+
+
+def trigrams(word: str) -> Set[str]:
+    """Returns the three letter sequences of a word"""
+
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class PrefixIndex:
+    """Word prefix index over track titles, newest entries first
+
+    Every word of the query matches words of a title that start with it. The
+    vocabulary is a sorted list searched with bisect, each word keeps an array
+    of the entries containing it. Words that match nothing are looked up by
+    shared trigrams instead, so misspelled words still find their track.
+    Removed entries are dropped from the postings a slice at a time by the
+    adds that follow, so no single add rebuilds the index.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        """Initiates the PrefixIndex Class"""
+
+        self.max_entries = max_entries
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empties the index"""
+
+        self._entries: Dict[int, Tuple[str, str]] = {}
+        self._ids: Dict[str, int] = {}
+        self._vocab: List[str] = []
+        self._postings: Dict[str, array] = {}
+        self._trigrams: Dict[str, List[str]] = {}
+        self._next_id = 0
+        self._oldest = 0
+        self._dead = 0
+        self._sweep: List[str] = []
+        self._sweep_at = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, text: str, value: str) -> None:
+        """Adds an entry, an entry with the same value is replaced and becomes the newest"""
+
+        old = self._ids.get(value)
+        if old is not None:
+            self._remove(old)
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (text, value)
+        self._ids[value] = entry_id
+
+        for word in set(words(text)):
+            postings = self._postings.get(word)
+            if postings is None:
+                postings = self._postings[word] = array("I")
+                insort(self._vocab, word)
+                for trigram in trigrams(word):
+                    self._trigrams.setdefault(trigram, []).append(word)
+            postings.append(entry_id)
+
+        while len(self._ids) > self.max_entries:
+            while self._oldest not in self._entries:
+                self._oldest += 1
+            self._remove(self._oldest)
+
+        if not self._sweep and self._dead > len(self._ids) and self._dead > 1000:
+            # The entries removed so far are gone from every posting once the sweep ends
+            self._sweep = self._vocab[::-1]
+            self._sweep_at = 0
+            self._dead = 0
+        if self._sweep:
+            self._compact(COMPACT_STEP)
+
+    def _remove(self, entry_id: int) -> None:
+        """Removes an entry, its postings are dropped by a later compaction"""
+
+        del self._ids[self._entries.pop(entry_id)[1]]
+        self._dead += 1
+
+    def _compact(self, budget: int) -> None:
+        """Drops removed entries from the postings of the words left in the sweep, checking up to budget ids"""
+
+        while budget > 0 and self._sweep:
+            word = self._sweep[-1]
+            postings = self._postings.get(word)
+            if postings is not None:
+                start = self._sweep_at
+                chunk = postings[start:start + budget]
+                kept = array("I", (entry_id for entry_id in chunk if entry_id in self._entries))
+                postings[start:start + len(chunk)] = kept
+                budget -= len(chunk)
+                self._sweep_at += len(kept)
+                if self._sweep_at < len(postings):
+                    continue
+                if not postings:
+                    self._drop(word)
+
+            self._sweep.pop()
+            self._sweep_at = 0
+
+    def _drop(self, word: str) -> None:
+        """Removes a word no entry contains anymore"""
+
+        del self._postings[word]
+        del self._vocab[bisect_left(self._vocab, word)]
+        for trigram in trigrams(word):
+            similar = self._trigrams[trigram]
+            similar.remove(word)
+            if not similar:
+                del self._trigrams[trigram]
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Returns the most used words that start with prefix, or similar words when there are none"""
+
+        start = bisect_left(self._vocab, prefix)
+        matches = []
+        for word in self._vocab[start:start + MAX_SCAN]:
+            if not word.startswith(prefix):
+                break
+            matches.append(word)
+
+        if len(matches) > MAX_EXPANSION:
+            matches = heapq.nlargest(MAX_EXPANSION, matches, key=lambda word: len(self._postings[word]))
+        return matches or self._similar(prefix)
+
+    def _similar(self, word: str) -> List[str]:
+        """Returns the words sharing most trigrams with a word"""
+
+        grams = trigrams(word)
+        if not grams:
+            return []
+
+        scores = Counter()
+        for trigram in grams:
+            scores.update(self._trigrams.get(trigram, ()))
+
+        needed = max(1, len(grams) // 2)
+        return [match for match, score in scores.most_common(MAX_SIMILAR) if score >= needed]
+
+    def _newest(self, tokens: List[str]) -> Iterator[int]:
+        """Yields the entries containing any of the words, newest first"""
+
+        postings = [reversed(self._postings[token]) for token in tokens]
+        previous = None
+        for entry_id in heapq.merge(*postings, reverse=True):
+            if entry_id != previous:
+                previous = entry_id
+                yield entry_id
+
+    def search(self, query: str, limit: int = 25) -> List[Tuple[str, str]]:
+        """Returns up to limit (text, value) entries matching every word of the query"""
+
+        query_words = words(query)
+        if not query_words:
+            return self._latest(limit)
+
+        expansions = []
+        for word in query_words:
+            tokens = self._expand(word)
+            if not tokens:
+                return []
+            expansions.append(tokens)
+
+        # The rarest word gives the candidates, the other words are checked on them
+        expansions.sort(key=lambda tokens: sum(len(self._postings[token]) for token in tokens))
+        driver, others = expansions[0], [set(tokens) for tokens in expansions[1:]]
+
+        results = []
+        for checked, entry_id in enumerate(self._newest(driver)):
+            if checked >= MAX_CANDIDATES or len(results) >= limit:
+                break
+
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                continue
+            if others:
+                entry_words = set(words(entry[0]))
+                if not all(entry_words & tokens for tokens in others):
+                    continue
+            results.append(entry)
+
+        return results
+
+    def _latest(self, limit: int) -> List[Tuple[str, str]]:
+        """Returns the newest entries"""
+
+        return list(islice(reversed(self._entries.values()), limit))
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+from typing import Dict, List, Optional, Set, Union
+
+import wavelink
+
+from utils.MusicQueue import QueuedTrack
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+QUEUE_DB = os.getenv("QUEUE_DB", "queues.sqlite3")
+QUEUE_FLUSH_INTERVAL = float(os.getenv("QUEUE_FLUSH_INTERVAL", 5))
+
+
+class QueueStore:
+    """Journals every guild's player state to SQLite with batched, coalesced writes"""
+
+    def __init__(self, path: str = QUEUE_DB, flush_interval: float = QUEUE_FLUSH_INTERVAL):
+        """Initiates the QueueStore Class"""
+
+        self.path = path
+        self.flush_interval = flush_interval
+        self._players: Dict[int, wavelink.Player] = {}
+        self._dirty: Set[int] = set()
+        self._deleted: Set[int] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS players (
+                guild_id INTEGER PRIMARY KEY,
+                channel_id INTEGER NOT NULL,
+                home_id INTEGER,
+                current TEXT,
+                position INTEGER NOT NULL DEFAULT 0,
+                volume INTEGER NOT NULL DEFAULT 30,
+                autoplay INTEGER NOT NULL,
+                queue TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._db.commit()
+
+    @property
+    def started(self) -> bool:
+        """Returns if the flush loop is running"""
+
+        return self._flush_task is not None
+
+    def start(self) -> None:
+        """Starts flushing changes periodically"""
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def mark(self, player: wavelink.Player) -> None:
+        """Marks the state of a player as changed, written on the next flush"""
+
+        guild_id = player.guild.id
+        self._players[guild_id] = player
+        self._dirty.add(guild_id)
+        self._deleted.discard(guild_id)
+
+    def forget(self, guild_id: int) -> None:
+        """Removes the stored state of a guild on the next flush"""
+
+        self._players.pop(guild_id, None)
+        self._dirty.discard(guild_id)
+        self._deleted.add(guild_id)
+
+    def load(self) -> List[sqlite3.Row]:
+        """Returns the stored state of all guilds"""
+
+        return self._db.execute("SELECT * FROM players").fetchall()
+
+    @staticmethod
+    def encode_track(track: Union[wavelink.Playable, QueuedTrack]) -> Union[Dict, List]:
+        """Returns the lavalink data of a track or the fields of a queued record, restored without a new search"""
+
+        if isinstance(track, QueuedTrack):
+            return track.dump()
+        return dict(track.raw_data, userData=dict(track.extras))
+
+    @staticmethod
+    def decode_track(data: Union[Dict, List]) -> Union[wavelink.Playable, QueuedTrack]:
+        """Creates a track from stored lavalink data or a record from stored fields"""
+
+        if isinstance(data, list):
+            return QueuedTrack(*data)
+        return wavelink.Playable(data)
+
+    def _snapshot(self, player: wavelink.Player) -> tuple:
+        """Returns the row for the state of a player, with the queue records still to be serialized"""
+
+        current = player.current
+        return (
+            player.guild.id,
+            player.channel.id,
+            getattr(player, "home", None),
+            self.encode_track(current) if current else None,
+            player.position if current else 0,
+            player.volume,
+            player.autoplay.value,
+            # Only the list is copied on the loop, the records are serialized in the thread
+            list(player.queue),
+            time.time(),
+        )
+
+    def _row(self, snapshot: tuple) -> tuple:
+        """Serializes the current track and the queue of a snapshot"""
+
+        guild_id, channel_id, home_id, current, position, volume, autoplay, queue, updated_at = snapshot
+        return (
+            guild_id,
+            channel_id,
+            home_id,
+            json.dumps(current) if current else None,
+            position,
+            volume,
+            autoplay,
+            json.dumps([self.encode_track(track) for track in queue]),
+            updated_at,
+        )
+
+    async def flush(self) -> None:
+        """Writes all changes since the last flush in one transaction"""
+
+        for guild_id, player in list(self._players.items()):
+            if player.connected:
+                continue
+            if player.node.status is wavelink.NodeStatus.CONNECTED:
+                self.forget(guild_id)
+            else:
+                # Disconnected by its node closing, the stored state is resumed from
+                self._players.pop(guild_id)
+                self._dirty.discard(guild_id)
+
+        snapshots = [self._snapshot(self._players[guild_id]) for guild_id in self._dirty]
+        positions = [
+            (player.position, time.time(), guild_id)
+            for guild_id, player in self._players.items()
+            if guild_id not in self._dirty and player.playing
+        ]
+        deleted = [(guild_id,) for guild_id in self._deleted]
+
+        self._dirty.clear()
+        self._deleted.clear()
+
+        if snapshots or positions or deleted:
+            await asyncio.to_thread(self._write, snapshots, positions, deleted)
+
+    def _write(self, snapshots: List[tuple], positions: List[tuple], deleted: List[tuple]) -> None:
+        """Serializes and writes a batch of changes"""
+
+        rows = [self._row(snapshot) for snapshot in snapshots]
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.executemany(
+                "UPDATE players SET position = ?, updated_at = ? WHERE guild_id = ?", positions
+            )
+            self._db.executemany("DELETE FROM players WHERE guild_id = ?", deleted)
+
+    async def _flush_loop(self) -> None:
+        """Flushes changes periodically"""
+
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Exception occured when saving queues: {e}")
+
+
+QUEUE_STORE = QueueStore()
@@ -0,0 +1,176 @@
+"""Redacted recording of the interactions and events the music cogs receive
+
+Every record is a JSON array [milliseconds, kind, guild, ...] appended to the
+gzip file RECORD_FILE. Guild, user and channel ids are replaced by small
+numbers and queries by salted hashes, the salt is never written, so a
+recording holds the timing and shape of the traffic but none of its content.
+Replay a recording against local stand-ins with:
+
+    python -m benchmarks.replay recording.jsonl.gz --speed 10
+"""
+
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import secrets
+import time
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+RECORD_FILE = os.getenv("RECORD_FILE")
+RECORD_FLUSH_INTERVAL = float(os.getenv("RECORD_FLUSH_INTERVAL", 5))
+
+# Option types of discord application commands for subcommands and for user ids
+SUBCOMMAND_OPTIONS = (1, 2)
+USER_OPTIONS = (6, 9)
+
+
+class Recorder:
+    """Records interactions, voice state updates and wavelink events with their timing"""
+
+    def __init__(self, path: Optional[str] = RECORD_FILE, flush_interval: float = RECORD_FLUSH_INTERVAL):
+        """Initiates the Recorder Class"""
+
+        self.path = path
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self._records: List[List] = []
+        self._ids: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._salt = secrets.token_bytes(16)
+        self._start: Optional[float] = None
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts recording when RECORD_FILE is set"""
+
+        if self.path and self._start is None:
+            self._start = time.monotonic()
+            self._records.append([0, "start"])
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def _id(self, kind: str, value: Optional[int]) -> Optional[int]:
+        """Returns the small number that stands in for an id in this recording"""
+
+        if value is None:
+            return None
+        ids = self._ids[kind]
+        return ids.setdefault(value, len(ids))
+
+    def redact(self, text: str) -> str:
+        """Returns a token that is the same for the same text within a recording"""
+
+        return hmac.new(self._salt, text.encode(), hashlib.sha256).hexdigest()[:10]
+
+    def add(self, kind: str, guild_id: int, *fields) -> None:
+        """Adds a record, does nothing when not recording"""
+
+        if self._start is None:
+            return
+
+        self._records.append([
+            round((time.monotonic() - self._start) * 1000), kind, self._id("guild", guild_id), *fields
+        ])
+        self.recorded += 1
+
+    def command(self, name: str, guild_id: int, user_id: int, options: List[Dict] = ()) -> None:
+        """Records a slash command or button press by the MusicPlayer method it calls"""
+
+        if self._start is None:
+            return
+
+        # The options of a subcommand such as /queue remove are nested in it
+        options = list(options)
+        while options and options[0].get("type") in SUBCOMMAND_OPTIONS:
+            options = options[0].get("options", [])
+
+        redacted = {}
+        for option in options:
+            value = option.get("value")
+            if option.get("type") in USER_OPTIONS:
+                value = {"user": self._id("user", int(value))}
+            elif isinstance(value, str):
+                value = self.redact(value)
+            redacted[option["name"]] = value
+
+        self.add("command", guild_id, self._id("user", user_id), name, redacted)
+
+    def autocomplete(self, guild_id: int, value: str) -> None:
+        """Records the length of a partial query sent for autocomplete"""
+
+        self.add("autocomplete", guild_id, len(value))
+
+    def loaded(self, guild_id: int, query: str, tracks) -> None:
+        """Records what a query loaded: the playlist size, -1 for search results or 0 for nothing"""
+
+        if self._start is None:
+            return
+
+        size = len(tracks.tracks) if hasattr(tracks, "tracks") else -1 if tracks else 0
+        self.add("loaded", guild_id, self.redact(query), size)
+
+    def voice(self, member, before, after) -> None:
+        """Records a person joining, leaving or moving between voice channels"""
+
+        if member.bot or before.channel == after.channel:
+            return
+
+        self.add(
+            "voice",
+            member.guild.id,
+            self._id("user", member.id),
+            self._id("channel", after.channel.id if after.channel else None)
+        )
+
+    async def flush(self) -> None:
+        """Appends the records since the last flush to the recording"""
+
+        if not self._records:
+            return
+
+        records = self._records
+        self._records = []
+        await asyncio.to_thread(self._write, records)
+
+    def _write(self, records: List[List]) -> None:
+        """Writes records as a gzip member of compact JSON lines"""
+
+        with gzip.open(self.path, "at") as file:
+            file.writelines(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+
+    async def _flush_loop(self) -> None:
+        """Writes records periodically"""
+
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Exception occured when writing the recording: {e}")
+
+
+def read(path: str) -> List[List]:
+    """Returns the records of a recording, the restarts of the bot placed one after another"""
+
+    records = []
+    offset = 0
+    last = 0
+    with gzip.open(path, "rt") as file:
+        for line in file:
+            record = json.loads(line)
+            if record[1] == "start":
+                offset = last
+                continue
+            record[0] += offset
+            last = record[0]
+            records.append(record)
+    return records
+
+
+RECORDER = Recorder()
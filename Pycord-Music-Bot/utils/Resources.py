@@ -0,0 +1,22 @@
+import sys
+
+
+def rss_mb() -> float:
+    """Returns the resident memory of the process in MB"""
+
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+
+    # ru_maxrss is the peak resident memory, in bytes on macOS and KB elsewhere
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
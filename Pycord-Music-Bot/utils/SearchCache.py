@@ -0,0 +1,136 @@
+import asyncio
+import copy
+import time
+
+from collections import OrderedDict
+from typing import Dict
+
+import wavelink
+
+from utils.Metrics import Histogram
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", 1000))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 600))
+
+
+class SearchCache:
+    """Shared TTL/LRU cache with single-flight deduplication for wavelink searches"""
+
+    def __init__(self, max_size: int = SEARCH_CACHE_SIZE, ttl: float = SEARCH_CACHE_TTL):
+        """Initiates the SearchCache Class"""
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.latency = Histogram()
+        self._entries: OrderedDict = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        """Returns the amount of cached searches"""
+
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalizes a query, urls keep their case since paths are case sensitive"""
+
+        query = query.strip()
+        if query.startswith(("http://", "https://")):
+            return query
+        return " ".join(query.lower().split())
+
+    async def search(self, query: str) -> wavelink.Search:
+        """Returns the search result for a query from the cache or from lavalink"""
+
+        key = self.normalize(query)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires, result = entry
+            if expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(result)
+            del self._entries[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            try:
+                return self._copy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                # Only the caller that started the search was cancelled, this one searches again
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            return await self.search(query)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        start = time.perf_counter()
+        try:
+            result = await wavelink.Playable.search(query)
+        except asyncio.CancelledError:
+            # The callers that joined this search are cancelled with it instead of waiting forever
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Marks the exception as retrieved when no one else is waiting
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+            self.latency.observe(time.perf_counter() - start)
+
+        future.set_result(result)
+        if result:
+            self._store(key, result)
+        # Copies are made from the raw data, so extras the first caller sets are not handed on
+        return result
+
+    def _store(self, key: str, result: wavelink.Search) -> None:
+        """Stores a result, evicts the least recently used entries when full"""
+
+        self._entries[key] = (time.monotonic() + self.ttl, result)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _copy(result: wavelink.Search) -> wavelink.Search:
+        """Copies the tracks of a result from their raw data so extras set by one guild are not shared"""
+
+        if not result:
+            return result
+
+        if isinstance(result, wavelink.Playlist):
+            playlist = copy.copy(result)
+            playlist.tracks = [
+                wavelink.Playable(track.raw_data, playlist=track.playlist) for track in result
+            ]
+            return playlist
+
+        return [wavelink.Playable(track.raw_data, playlist=track.playlist) for track in result]
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit/miss counters of the cache"""
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "size": len(self._entries),
+            "in_flight": len(self._in_flight),
+        }
+
+
+SEARCH_CACHE = SearchCache()
@@ -0,0 +1,17 @@
+from typing import List, Optional
+
+
+def parse_shard_ids(shard_ids: str) -> Optional[List[int]]:
+    """Parses shard ids given as a range "0-7" or a list "0,1,2" """
+
+    if not shard_ids:
+        return None
+
+    ids = []
+    for part in shard_ids.split(","):
+        if "-" in part:
+            start, end = part.split("-")
+            ids.extend(range(int(start), int(end) + 1))
+        else:
+            ids.append(int(part))
+    return ids
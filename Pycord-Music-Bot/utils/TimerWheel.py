@@ -0,0 +1,107 @@
+import asyncio
+import math
+import time
+
+from typing import Callable, Dict, Hashable, List, Optional
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+TIMER_TICK = float(os.getenv("TIMER_TICK", 1.0))
+TIMER_SLOTS = int(os.getenv("TIMER_SLOTS", 512))
+
+
+class Timer:
+    """One scheduled callback"""
+
+    __slots__ = ("key", "callback", "rounds", "slot")
+
+    def __init__(self, key: Hashable, callback: Callable[[], None], rounds: int, slot: int):
+        self.key = key
+        self.callback = callback
+        self.rounds = rounds
+        self.slot = slot
+
+
+class TimerWheel:
+    """Hashed timing wheel, one task fires the timers of every guild
+
+    Scheduling and cancelling are O(1), each tick only looks at the timers in
+    one slot. Timers fire at most one tick late.
+    """
+
+    def __init__(self, tick: float = TIMER_TICK, slots: int = TIMER_SLOTS):
+        """Initiates the TimerWheel Class"""
+
+        self.tick = tick
+        self.fired = 0
+        self._slots: List[Dict[Hashable, Timer]] = [{} for _ in range(slots)]
+        self._timers: Dict[Hashable, Timer] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def start(self) -> None:
+        """Starts turning the wheel"""
+
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def schedule(self, key: Hashable, delay: float, callback: Callable[[], None]) -> None:
+        """Calls callback after delay seconds, replaces an earlier timer with the same key"""
+
+        self.cancel(key)
+
+        ticks = max(1, math.ceil(delay / self.tick))
+        slot = (self._cursor + ticks) % len(self._slots)
+        timer = Timer(key, callback, (ticks - 1) // len(self._slots), slot)
+
+        self._slots[slot][key] = timer
+        self._timers[key] = timer
+
+    def cancel(self, key: Hashable) -> bool:
+        """Removes a timer, returns if there was one"""
+
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+
+        del self._slots[timer.slot][key]
+        return True
+
+    async def _run(self) -> None:
+        """Advances the wheel once per tick"""
+
+        next_tick = time.monotonic()
+        while True:
+            next_tick += self.tick
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            self._advance()
+
+    def _advance(self) -> None:
+        """Moves to the next slot and fires its due timers"""
+
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        slot = self._slots[self._cursor]
+
+        due = []
+        for timer in slot.values():
+            if timer.rounds:
+                timer.rounds -= 1
+            else:
+                due.append(timer)
+
+        for timer in due:
+            del slot[timer.key]
+            del self._timers[timer.key]
+            self.fired += 1
+            try:
+                timer.callback()
+            except Exception as e:
+                print(f"Exception occured in timer {timer.key}: {e}")
+
+
+TIMERS = TimerWheel()
@@ -0,0 +1,226 @@
+"""Sampled tracing of slash commands from invocation to track start
+
+Spans are written as JSON lines to TRACE_FILE. Print the latency of every
+stage from the Pycord-Music-Bot directory with:
+
+    python -m utils.Tracing traces.jsonl
+"""
+
+import asyncio
+import functools
+import json
+import random
+import sys
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Dict, List, Optional
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0.05))
+TRACE_FLUSH_INTERVAL = float(os.getenv("TRACE_FLUSH_INTERVAL", 5))
+
+
+class Trace:
+    """One sampled command, identified by its interaction id"""
+
+    __slots__ = ("id", "command", "guild_id", "start", "played")
+
+    def __init__(self, trace_id: int, command: str, guild_id: int):
+        self.id = trace_id
+        self.command = command
+        self.guild_id = guild_id
+        self.start = time.perf_counter()
+        self.played: Optional[float] = None
+
+
+CURRENT: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+class Tracer:
+    """Records spans of sampled commands and writes them in batches"""
+
+    def __init__(
+        self,
+        path: str = TRACE_FILE,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        flush_interval: float = TRACE_FLUSH_INTERVAL
+    ):
+        """Initiates the Tracer Class"""
+
+        self.path = path
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self._spans: List[Dict] = []
+        self._pending: Dict[int, Trace] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Starts writing spans periodically"""
+
+        if self._flush_task is None and self.sample_rate > 0:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    def begin(self, trace_id: int, command: str, guild_id: int) -> Optional[Trace]:
+        """Starts a trace in the current task if the command is sampled"""
+
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+
+        trace = Trace(trace_id, command, guild_id)
+        CURRENT.set(trace)
+        return trace
+
+    def end(self, trace_id: int) -> None:
+        """Records the total time of the command of the current trace"""
+
+        trace = CURRENT.get()
+        if trace is not None and trace.id == trace_id:
+            self.add(trace, "total", trace.start, time.perf_counter())
+
+    @staticmethod
+    def current() -> Optional[Trace]:
+        """Returns the trace of the current task"""
+
+        return CURRENT.get()
+
+    @contextmanager
+    def span(self, name: str):
+        """Records the time spent in the block, does nothing when not sampled"""
+
+        trace = CURRENT.get()
+        if trace is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(trace, name, start, time.perf_counter())
+
+    def traced(self, name: str):
+        """Records every call of a coroutine function as a span"""
+
+        def decorator(function):
+            @functools.wraps(function)
+            async def wrapper(*args, **kwargs):
+                if CURRENT.get() is None:
+                    return await function(*args, **kwargs)
+                with self.span(name):
+                    return await function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    async def run(
+        self,
+        trace: Optional[Trace],
+        coroutine: Awaitable,
+        enqueued: Optional[float] = None,
+        name: str = "queue_wait"
+    ):
+        """Runs a coroutine in another task under a trace, such as a guild executor job"""
+
+        if trace is None:
+            return await coroutine
+
+        token = CURRENT.set(trace)
+        try:
+            if enqueued is not None:
+                self.add(trace, name, enqueued, time.perf_counter())
+            return await coroutine
+        finally:
+            CURRENT.reset(token)
+
+    def expect_track_start(self, guild_id: int) -> None:
+        """Remembers that the current trace asked the guild's player to play"""
+
+        trace = CURRENT.get()
+        if trace is not None:
+            trace.played = time.perf_counter()
+            self._pending[guild_id] = trace
+
+    def track_started(self, guild_id: int) -> Optional[Trace]:
+        """Records the wait for a track start that a trace asked for, returns the trace"""
+
+        trace = self._pending.pop(guild_id, None)
+        if trace is not None:
+            self.add(trace, "track_start", trace.played, time.perf_counter())
+        return trace
+
+    def add(self, trace: Trace, name: str, start: float, end: float) -> None:
+        """Adds a finished span"""
+
+        self._spans.append({
+            "trace": trace.id,
+            "command": trace.command,
+            "guild": trace.guild_id,
+            "span": name,
+            "offset_ms": round((start - trace.start) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+        })
+
+    async def flush(self) -> None:
+        """Appends the spans recorded since the last flush to the trace file"""
+
+        if not self._spans:
+            return
+
+        spans = self._spans
+        self._spans = []
+        await asyncio.to_thread(self._write, spans)
+
+    def _write(self, spans: List[Dict]) -> None:
+        """Writes spans as JSON lines"""
+
+        with open(self.path, "a") as file:
+            file.writelines(json.dumps(span) + "\n" for span in spans)
+
+    async def _flush_loop(self) -> None:
+        """Writes spans periodically"""
+
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Exception occured when writing traces: {e}")
+
+
+def analyze(path: str) -> None:
+    """Prints the latency of each stage per command from a trace file"""
+
+    durations: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    traces: Dict[str, set] = defaultdict(set)
+    with open(path) as file:
+        for line in file:
+            span = json.loads(line)
+            durations[span["command"]][span["span"]].append(span["duration_ms"])
+            traces[span["command"]].add(span["trace"])
+
+    def percentile(samples: List[float], p: float) -> float:
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    for command, spans in sorted(durations.items()):
+        print(f"/{command} ({len(traces[command])} traces)")
+        print(f"  {'stage':28} {'count':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, samples in sorted(spans.items(), key=lambda item: -sum(item[1])):
+            samples.sort()
+            print(
+                f"  {name:28} {len(samples):6} {percentile(samples, 0.5):9.2f} "
+                f"{percentile(samples, 0.9):9.2f} {percentile(samples, 0.99):9.2f} {samples[-1]:9.2f}"
+            )
+        print()
+
+
+TRACER = Tracer()
+
+
+if __name__ == "__main__":
+    analyze(sys.argv[1] if len(sys.argv) > 1 else TRACE_FILE)
@@ -0,0 +1,43 @@
+import time
+
+import wavelink
+
+from typing import Dict
+
+from utils.Metrics import Histogram
+
+
+class TrackGaps:
+    """Measures the gaps between a track playing to its end and the next track starting
+
+    Queued records already carry Lavalink's encoded track and Lavalink opens
+    the stream only when it is told to play, so there is nothing to resolve
+    ahead of time. The gaps show what the time between tracks is.
+    """
+
+    def __init__(self):
+        """Initiates the TrackGaps Class"""
+
+        self.gap = Histogram()
+        self._ended: Dict[int, float] = {}
+
+    def started(self, player: wavelink.Player) -> None:
+        """Measures the gap before the track a player started"""
+
+        ended = self._ended.pop(player.guild.id, None)
+        if ended is not None:
+            self.gap.observe(time.perf_counter() - ended)
+
+    def ended(self, guild_id: int, reason: str) -> None:
+        """Starts the gap of a track that played to the end"""
+
+        if reason == "finished":
+            self._ended[guild_id] = time.perf_counter()
+
+    def forget(self, guild_id: int) -> None:
+        """Drops the gap of a guild the bot left"""
+
+        self._ended.pop(guild_id, None)
+
+
+TRACK_GAPS = TrackGaps()
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+from logging.handlers import RotatingFileHandler
+from typing import Optional
+
+from utils.Metrics import Histogram
+
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+WATCHDOG_INTERVAL = float(os.getenv("WATCHDOG_INTERVAL", 0.1))
+WATCHDOG_THRESHOLD = float(os.getenv("WATCHDOG_THRESHOLD", 0.25))
+WATCHDOG_LOG = os.getenv("WATCHDOG_LOG", "watchdog.log")
+
+
+class Watchdog:
+    """Measures event loop lag and logs the stack of callbacks that block the loop
+
+    A task on the loop updates a heartbeat, a daemon thread checks it. When the
+    heartbeat is older than the threshold the loop thread's current stack and the
+    label of the running task (the command or event it handles) are logged.
+    """
+
+    def __init__(
+        self,
+        interval: float = WATCHDOG_INTERVAL,
+        threshold: float = WATCHDOG_THRESHOLD,
+        path: str = WATCHDOG_LOG
+    ):
+        """Initiates the Watchdog Class"""
+
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = Histogram()
+        self.last_lag = 0.0
+        self.stalls = 0
+        self._beat = time.monotonic()
+        self._labels = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+
+        self.logger = logging.getLogger("musicbot.watchdog")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.WARNING)
+        self._path = path
+
+    def start(self) -> None:
+        """Starts the heartbeat on the running loop and the watching thread"""
+
+        if self._loop is not None:
+            return
+
+        handler = RotatingFileHandler(self._path, maxBytes=1024 * 1024, backupCount=5)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        self.logger.addHandler(handler)
+
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+
+        self._loop.create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="watchdog", daemon=True).start()
+
+    def label(self, text: str) -> None:
+        """Names what the current task is doing, shown when it blocks the loop"""
+
+        task = asyncio.current_task()
+        if task is not None:
+            self._labels[task] = text
+
+    async def _heartbeat(self) -> None:
+        """Measures how late the loop wakes up and updates the heartbeat"""
+
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.lag.observe(self.last_lag)
+            self._beat = time.monotonic()
+
+    def _watch(self) -> None:
+        """Checks the heartbeat and reports each stall once"""
+
+        reported = None
+        while True:
+            time.sleep(self.interval)
+
+            beat = self._beat
+            stalled = time.monotonic() - beat - self.interval
+            if stalled < self.threshold or beat == reported:
+                continue
+
+            reported = beat
+            self.stalls += 1
+            self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        """Logs the stack of the loop thread and the task it is running"""
+
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = "".join(traceback.format_stack(frame)) if frame else "no stack available\n"
+
+        task = asyncio.current_task(self._loop)
+        name = task.get_name() if task else "no task, callback or loop internals"
+        label = self._labels.get(task, "unlabelled") if task else "unlabelled"
+
+        self.logger.warning(
+            "Event loop blocked for at least %.3f s in %s (%s)\n%s", stalled, name, label, stack
+        )
+
+
+WATCHDOG = Watchdog()